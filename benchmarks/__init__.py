@@ -0,0 +1,8 @@
+"""
+Performance benchmarks for Draco.
+
+Every ``bench_*`` module in this package can be run on its own,
+for example via :code:`python -m benchmarks.bench_prepared`. The
+:code:`suite` module times the whole API and compares the timings against a
+stored baseline, see :code:`python -m benchmarks.suite --help`.
+"""
@@ -0,0 +1,79 @@
+"""
+Compares the throughput of :code:`Draco.check_specs`, which grounds many
+specifications at once, against calling :code:`Draco.check_spec` in a loop.
+
+The loop is measured on at most :code:`--loop-limit` specifications
+and its throughput is extrapolated to the full corpus size.
+"""
+
+import argparse
+import time
+
+from draco import Draco
+
+from .utils import format_table, spec_corpus
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=lambda s: [int(n) for n in s.split(",")],
+        default=[10, 1_000, 100_000],
+        help="Comma-separated corpus sizes. Defaults to 10,1000,100000.",
+    )
+    parser.add_argument(
+        "--loop-limit",
+        type=int,
+        default=1_000,
+        help="Maximum number of specs to check one by one. Defaults to 1000.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1_000,
+        help="Number of specs to ground at once. Defaults to 1000.",
+    )
+    return parser
+
+
+def main():
+    args = argument_parser().parse_args()
+    draco = Draco()
+    # parse the knowledge base before measuring
+    draco.check_specs([""])
+
+    rows = []
+    for size in args.sizes:
+        specs = spec_corpus(size)
+
+        looped = specs[: args.loop_limit]
+        start = time.perf_counter()
+        expected = list(map(draco.check_spec, looped))
+        loop_throughput = len(looped) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        result = draco.check_specs(specs, chunk_size=args.chunk_size)
+        batch_throughput = size / (time.perf_counter() - start)
+
+        assert result[: len(looped)] == expected, "Batched results differ"
+
+        rows.append(
+            (
+                size,
+                sum(result) / size,
+                loop_throughput,
+                batch_throughput,
+                batch_throughput / loop_throughput,
+            )
+        )
+
+    print(
+        format_table(
+            ["specs", "valid", "loop (specs/s)", "batch (specs/s)", "speedup"], rows
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Compares the throughput of :code:`Draco.count_preferences_batch`, which grounds
+many specifications at once, against calling :code:`Draco.count_preferences`
+in a loop and filling a matrix from the returned dicts.
+
+The loop is measured on at most :code:`--loop-limit` specifications
+and its throughput is extrapolated to the full corpus size.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from draco import Draco
+
+from .utils import format_table, spec_corpus
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=lambda s: [int(n) for n in s.split(",")],
+        default=[10, 1_000, 10_000],
+        help="Comma-separated corpus sizes. Defaults to 10,1000,10000.",
+    )
+    parser.add_argument(
+        "--loop-limit",
+        type=int,
+        default=1_000,
+        help="Maximum number of specs to count one by one. Defaults to 1000.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1_000,
+        help="Number of specs to ground at once. Defaults to 1000.",
+    )
+    return parser
+
+
+def count_loop(draco: Draco, specs: list[str]) -> np.ndarray:
+    columns = {name: j for j, name in enumerate(draco.soft_constraint_names)}
+    counts = np.zeros((len(specs), len(columns)), dtype=np.int64)
+    for i, spec in enumerate(specs):
+        for name, count in (draco.count_preferences(spec) or {}).items():
+            counts[i, columns[name]] = count
+    return counts
+
+
+def main():
+    args = argument_parser().parse_args()
+    draco = Draco()
+    # parse the knowledge base before measuring
+    draco.count_preferences_batch([""])
+
+    rows = []
+    for size in args.sizes:
+        specs = spec_corpus(size)
+
+        looped = specs[: args.loop_limit]
+        start = time.perf_counter()
+        expected = count_loop(draco, looped)
+        loop_throughput = len(looped) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        counts, unsatisfiable = draco.count_preferences_batch(
+            specs, chunk_size=args.chunk_size
+        )
+        batch_throughput = size / (time.perf_counter() - start)
+
+        assert (counts[: len(looped)] == expected).all(), "Batched results differ"
+
+        rows.append(
+            (
+                size,
+                1 - unsatisfiable.mean(),
+                loop_throughput,
+                batch_throughput,
+                batch_throughput / loop_throughput,
+            )
+        )
+
+    print(
+        format_table(
+            ["specs", "satisfiable", "loop (specs/s)", "batch (specs/s)", "speedup"],
+            rows,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
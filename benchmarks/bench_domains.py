@@ -0,0 +1,118 @@
+"""
+Compares completing partial specs of wide schemas with and without the facts
+of :code:`restrict_domains`, which exclude the attribute values that are
+invalid for the encoded fields from the choices of the generator, and reports
+the size of the ground program and the time spent grounding and solving.
+"""
+
+import argparse
+import random
+
+from draco import Draco, dict_to_facts, profile, restrict_domains, schema_from_dataframe
+
+from .suite import dataframe
+from .utils import format_table
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--fields",
+        type=int,
+        nargs="+",
+        default=[16, 64, 128],
+        help="Numbers of fields of the schemas. Defaults to 16 64 128.",
+    )
+    parser.add_argument(
+        "--encodings",
+        type=int,
+        default=8,
+        help="Number of fields the partial specs encode. Defaults to 8.",
+    )
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=3,
+        help="Number of completions per measurement, the best is reported. "
+        "Defaults to 3.",
+    )
+    return parser
+
+
+def main():
+    args = argument_parser().parse_args()
+    draco = Draco()
+
+    rows = []
+    for fields in args.fields:
+        schema = schema_from_dataframe(dataframe(fields, 1_000))
+        encoded = random.Random(0).sample(range(fields), args.encodings)
+        spec = dict_to_facts(
+            schema
+            | {
+                "view": [
+                    {"mark": [{"encoding": [{"field": f"f{i}"} for i in encoded]}]}
+                ]
+            }
+        )
+        facts = restrict_domains(spec)
+
+        measurements = []
+        for program in (spec, spec + facts):
+            with profile() as result:
+                for _ in range(args.number):
+                    list(draco.complete_spec(program))
+            calls = result.calls
+            measurements.append(
+                (
+                    calls[0].rules,
+                    calls[0].atoms,
+                    min(call.timings["ground"] for call in calls),
+                    min(call.timings["solve"] for call in calls),
+                    calls[0].choices,
+                )
+            )
+
+        (rules, atoms, ground, solve, choices), restricted = measurements
+        rows.append(
+            (
+                fields,
+                len(facts),
+                rules,
+                restricted[0],
+                (1 - restricted[0] / rules) * 100,
+                atoms,
+                restricted[1],
+                ground * 1e3,
+                restricted[2] * 1e3,
+                solve * 1e3,
+                restricted[3] * 1e3,
+                choices,
+                restricted[4],
+            )
+        )
+
+    print(
+        format_table(
+            [
+                "fields",
+                "facts",
+                "rules",
+                "restricted",
+                "fewer (%)",
+                "atoms",
+                "restricted",
+                "ground (ms)",
+                "restricted",
+                "solve (ms)",
+                "restricted",
+                "choices",
+                "restricted",
+            ],
+            rows,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Measures the encodings of responses with answer sets for growing numbers of
+models: the time to encode the models of :code:`/draco/complete-spec` once they
+are solved, the size of the responses, and the latency of the requests. The
+baseline validates the typed symbols against the response model before
+serializing them, as the endpoint did before the encodings were negotiated.
+"""
+
+import argparse
+import json
+import random
+from functools import partial
+
+from draco.run import Model
+from draco.server import DracoAPI
+from draco.server.encoding import (
+    COMPACT_JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    encoded_response,
+    msgpack,
+    negotiate,
+)
+from draco.server.models.draco import CompleteSpecDTO, CompleteSpecReturn
+from draco.server.services.draco import DracoService
+from draco.server.utils import ModelEncoder, model_to_jsonable_model
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from draco import Draco
+
+from .utils import format_table, measure, partial_spec
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--models",
+        type=int,
+        nargs="+",
+        default=[1, 10, 100],
+        help="Numbers of models to request. Defaults to 1 10 100.",
+    )
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=3,
+        help="Number of requests per measurement. Defaults to 3.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of measurements, the best is reported. Defaults to 3.",
+    )
+    return parser
+
+
+def client() -> TestClient:
+    draco = Draco()
+    app = FastAPI()
+    service = DracoService(draco)
+
+    @app.post("/baseline")
+    async def baseline(dto: CompleteSpecDTO) -> CompleteSpecReturn:
+        return await service.complete_spec_async(dto.spec, dto.models)  # type: ignore
+
+    # responses are not cached, so that every request encodes
+    DracoAPI(draco, app=app, cache_responses=False, collect_metrics=False)
+    return TestClient(app)
+
+
+def validated(models: list) -> bytes:
+    # what FastAPI does with the return value of an endpoint
+    content = [model_to_jsonable_model(model) for model in models]
+    value = ADAPTER.validate_python(content)
+    data = ADAPTER.dump_python(value, mode="json")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def encoded(models: list, accept: str) -> bytes:
+    encoding = negotiate(accept)
+    content = list(map(ModelEncoder(encoding.form), models))
+    return bytes(encoded_response(content, encoding).body)
+
+
+ADAPTER: TypeAdapter = TypeAdapter(CompleteSpecReturn)
+
+
+def main():
+    args = argument_parser().parse_args()
+    spec = partial_spec(random.Random(0)).splitlines()
+    test_client = client()
+
+    accepts = {
+        "json": "application/json",
+        "compact facts": COMPACT_JSON_MEDIA_TYPE,
+        "compact spec": f"{COMPACT_JSON_MEDIA_TYPE}; answer-set=spec",
+    }
+    if msgpack is not None:
+        accepts["msgpack facts"] = MSGPACK_MEDIA_TYPE
+
+    encoding_rows = []
+    request_rows = []
+    for number_models in args.models:
+        solved = list(Draco().complete_spec(spec, number_models))
+        body = {"spec": spec, "models": number_models}
+
+        variants = [("validated json", "/baseline", "application/json", validated)]
+        for name, accept in accepts.items():
+            encoder = partial(encoded, accept=accept)
+            variants.append((name, "/draco/complete-spec", accept, encoder))
+
+        encoding_baseline = request_baseline = 0.0
+        for name, route, accept, encoder in variants:
+
+            def encode():
+                # fresh models, whose answer sets are not decoded yet
+                return encoder([Model(m.answer_set, m.cost, m.number) for m in solved])
+
+            size = len(encode())
+            seconds = measure(encode, number=args.number, repeat=args.repeat)
+            encoding_baseline = encoding_baseline or seconds
+            encoding_rows.append(
+                (
+                    number_models,
+                    name,
+                    seconds * 1e3,
+                    encoding_baseline / seconds,
+                    size / 1024,
+                )
+            )
+
+            headers = {"Accept": accept}
+            # parse the knowledge bases before measuring
+            test_client.post(route, json=body, headers=headers)
+            seconds = measure(
+                lambda: test_client.post(route, json=body, headers=headers),
+                number=args.number,
+                repeat=args.repeat,
+            )
+            request_baseline = request_baseline or seconds
+            request_rows.append(
+                (number_models, name, seconds * 1e3, request_baseline / seconds)
+            )
+
+    print("encoding the solved models")
+    print(
+        format_table(
+            ["models", "encoding", "ms", "speedup", "KiB"],
+            encoding_rows,
+        )
+    )
+    print("\nrequests, including the solve")
+    print(format_table(["models", "encoding", "ms", "speedup"], request_rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Reports how many specs of real corpora are duplicates by their fingerprint,
+which :code:`Draco.count_preferences_batch` only counts once, and compares
+the batch with deduplication against counting every spec.
+
+The corpora are the specs of the Kim et al. 2018 and Saket et al. 2018
+studies in the documentation, the example specs, and a random corpus.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+from draco.batch import count_batch
+from draco.canonical import fingerprint
+
+from draco import Draco
+
+from .utils import example_specs, format_table, spec_corpus
+
+data_path = Path(__file__).parent.parent / "docs" / "applications" / "data"
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--random",
+        type=int,
+        default=1_000,
+        help="Size of the random corpus. Defaults to 1000.",
+    )
+    return parser
+
+
+def study_specs(name: str) -> list[str]:
+    pairs = json.loads((data_path / name).read_text())
+    return [
+        "\n".join(pair[side]) for pair in pairs for side in ("negative", "positive")
+    ]
+
+
+def count_all(draco: Draco, specs: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    # the batch before deduplication, counting every spec
+    program = draco._batch_knowledge_base(
+        draco.define, draco.constraints, draco.helpers, draco.soft
+    )
+    return count_batch(
+        program, specs, draco.soft_constraint_names, draco.count_preferences
+    )
+
+
+def main():
+    args = argument_parser().parse_args()
+    draco = Draco()
+    # parse the knowledge base before measuring
+    draco.count_preferences_batch([""])
+
+    corpora = {
+        "kim2018": study_specs("kim2018_draco2.json"),
+        "saket2018": study_specs("saket2018_draco2.json"),
+        "examples": list(example_specs().values()),
+        "random": spec_corpus(args.random),
+    }
+
+    rows = []
+    for name, specs in corpora.items():
+        start = time.perf_counter()
+        fingerprints = [fingerprint(spec) for spec in specs]
+        fingerprint_time = (time.perf_counter() - start) / len(specs)
+
+        start = time.perf_counter()
+        expected = count_all(draco, specs)
+        all_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        counts = draco.count_preferences_batch(specs)
+        dedup_time = time.perf_counter() - start
+
+        if not all((a == b).all() for a, b in zip(counts, expected)):
+            raise AssertionError(f"Deduplicated counts of {name} differ")
+
+        unique = len(set(fingerprints))
+        rows.append(
+            (
+                name,
+                len(specs),
+                len(set(specs)),
+                unique,
+                1 - unique / len(specs),
+                fingerprint_time * 1e6,
+                all_time,
+                dedup_time,
+                all_time / dedup_time,
+            )
+        )
+
+    print(
+        format_table(
+            [
+                "corpus",
+                "specs",
+                "unique texts",
+                "unique fingerprints",
+                "dedup rate",
+                "fingerprint (µs/spec)",
+                "all (s)",
+                "dedup (s)",
+                "speedup",
+            ],
+            rows,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
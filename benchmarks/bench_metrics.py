@@ -0,0 +1,108 @@
+"""
+Measures the overhead of recording the metrics of the server, by comparing the
+latency of requests to a :code:`DracoAPI` with and without metrics, and the
+time to render the metrics for :code:`/metrics`.
+"""
+
+import argparse
+
+from draco.profiling import Statistics
+from draco.server import DracoAPI
+from draco.server.metrics import Metrics
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from draco import Draco
+
+from .utils import format_table, measure, spec_corpus
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=20,
+        help="Number of requests per measurement. Defaults to 20.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=10,
+        help="Number of measurements, the best is reported. Defaults to 10.",
+    )
+    return parser
+
+
+def client(collect_metrics: bool) -> TestClient:
+    # responses are not cached, so that every request solves
+    draco_api = DracoAPI(
+        Draco(),
+        app=FastAPI(),
+        cache_responses=False,
+        collect_metrics=collect_metrics,
+    )
+    return TestClient(draco_api.app)
+
+
+def main():
+    args = argument_parser().parse_args()
+    spec = spec_corpus(1)[0].splitlines()
+    requests = {
+        "/draco/check-spec": {"spec": spec},
+        "/draco/count-preferences": {"spec": spec},
+        "/utility/dict-to-facts": {"data": {"mark": [{"type": "point"}]}},
+    }
+    clients = {"disabled": client(False), "enabled": client(True)}
+
+    rows = []
+    for route, json in requests.items():
+        times = {}
+        for name, test_client in clients.items():
+            # parse the knowledge bases before measuring
+            test_client.post(route, json=json)
+            times[name] = measure(
+                lambda: test_client.post(route, json=json),
+                number=args.number,
+                repeat=args.repeat,
+            )
+        disabled, enabled = times["disabled"], times["enabled"]
+        rows.append(
+            (
+                route,
+                disabled * 1e3,
+                enabled * 1e3,
+                (enabled - disabled) * 1e6,
+                (enabled / disabled - 1) * 100,
+            )
+        )
+
+    print(
+        format_table(
+            ["route", "disabled (ms)", "enabled (ms)", "overhead (µs)", "overhead (%)"],
+            rows,
+        )
+    )
+
+    # the time to record a request with a solver call on its own, which the
+    # noise of the requests may hide
+    metrics = Metrics()
+    statistics = Statistics("check_spec", {"ground": 0.01, "solve": 0.001})
+
+    def record():
+        metrics.observe_request("POST", "/draco/check-spec", 200, 0.01)
+        metrics.observe_solver("/draco/check-spec", statistics)
+
+    recording = measure(record, number=10_000)
+    print(f"\nrecording a request: {recording * 1e6:.2f} µs")
+
+    render = measure(
+        lambda: clients["enabled"].get("/metrics"),
+        number=args.number,
+        repeat=args.repeat,
+    )
+    print(f"GET /metrics: {render * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compares the memory and time of keeping the models of a large top K run as
+:code:`run.Model` objects, which store compact symbol handles and decode them
+lazily, against eagerly copying every answer set into a list of symbols.
+
+The time includes the solve, and the decode column measures counting the
+preferences of every model twice, which the lazy model caches.
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable
+
+import clingo
+
+from draco import Draco, run_clingo
+
+from .utils import example_specs, format_table
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--models",
+        type=int,
+        default=300,
+        help="Number of models of the top K run. Defaults to 300.",
+    )
+    parser.add_argument(
+        "--example",
+        default="scatter",
+        help="Example spec to complete. Defaults to scatter.",
+    )
+    return parser
+
+
+def eager_models(program, models: int, arguments: list[str]) -> list[list[Any]]:
+    # the answer sets as lists of symbols, as callers used to hold them
+    return [
+        list(model.answer_set) for model in run_clingo(program, models, True, arguments)
+    ]
+
+
+def count_eager(answer_set: list[clingo.Symbol]) -> Counter:
+    return Counter(s.arguments[0].name for s in answer_set if s.name == "preference")
+
+
+def measure_run(solve: Callable[[], list], count: Callable[[Any], Any]):
+    tracemalloc.start()
+    start = time.perf_counter()
+    models = solve()
+    solve_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(2):
+        for model in models:
+            count(model)
+    decode_time = time.perf_counter() - start
+
+    return len(models), memory / 2**20, solve_time, decode_time
+
+
+def main():
+    args = argument_parser().parse_args()
+    draco = Draco(prepare=False)
+    spec = "\n".join(
+        line
+        for line in example_specs()[args.example].splitlines()
+        if not line.startswith("#show")
+    )
+    program = draco._complete_program(spec)
+    arguments = draco._weight_arguments()
+
+    rows = [
+        (
+            "eager symbols",
+            *measure_run(
+                lambda: eager_models(program, args.models, arguments), count_eager
+            ),
+        ),
+        (
+            "lazy model",
+            *measure_run(
+                lambda: list(run_clingo(program, args.models, True, arguments)),
+                lambda model: model.preference_counts,
+            ),
+        ),
+    ]
+
+    print(
+        format_table(
+            ["representation", "models", "memory (MiB)", "solve (s)", "decode (s)"],
+            rows,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
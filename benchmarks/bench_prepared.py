@@ -0,0 +1,44 @@
+"""
+Compares the per-call latency of the core :code:`Draco` methods
+when the knowledge base is parsed once and reused (:code:`prepare=True`)
+against parsing the complete program text on every call (:code:`prepare=False`).
+"""
+
+from draco import Draco
+
+from .utils import example_specs, format_table, measure
+
+METHODS = {
+    "check_spec": lambda d, spec: d.check_spec(spec),
+    "count_preferences": lambda d, spec: d.count_preferences(spec),
+    "get_violations": lambda d, spec: d.get_violations(spec),
+    "complete_spec": lambda d, spec: next(d.complete_spec(spec)),
+}
+
+
+def main():
+    unprepared = Draco(prepare=False)
+    prepared = Draco(prepare=True)
+
+    rows = []
+    for spec_name, spec in example_specs().items():
+        for method_name, method in METHODS.items():
+            # warm up, so that the one-off parsing is not part of the measurement
+            method(prepared, spec)
+
+            number = 2 if method_name == "complete_spec" else 20
+            before = measure(lambda: method(unprepared, spec), number=number)
+            after = measure(lambda: method(prepared, spec), number=number)
+            rows.append(
+                (spec_name, method_name, before * 1e3, after * 1e3, before / after)
+            )
+
+    print(
+        format_table(
+            ["spec", "method", "unprepared (ms)", "prepared (ms)", "speedup"], rows
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
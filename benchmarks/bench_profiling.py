@@ -0,0 +1,88 @@
+"""
+Measures the overhead of collecting statistics on the calls of :code:`Draco`,
+with profiling disabled, inside a :code:`draco.profile` block, and with a
+callback registered, and reports where the profiled calls spent their time.
+"""
+
+import argparse
+import random
+
+from draco.profiling import PHASES, add_callback, remove_callback
+
+from draco import Draco, profile
+
+from .utils import format_table, measure, partial_spec, spec_corpus
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=20,
+        help="Number of calls per measurement. Defaults to 20.",
+    )
+    return parser
+
+
+def ignore(statistics):
+    pass
+
+
+def main():
+    args = argument_parser().parse_args()
+    draco = Draco()
+    spec = spec_corpus(1)[0]
+    partial = partial_spec(random.Random(0), number_encodings=2)
+
+    calls = {
+        "check_spec": lambda: draco.check_spec(spec),
+        "count_preferences": lambda: draco.count_preferences(spec),
+        "get_violations": lambda: draco.get_violations(spec),
+        "complete_spec": lambda: list(draco.complete_spec(partial)),
+    }
+    for call in calls.values():
+        # parse the knowledge bases before measuring
+        call()
+
+    rows = []
+    for name, call in calls.items():
+        disabled = measure(call, number=args.number)
+        with profile() as result:
+            profiled = measure(call, number=args.number)
+        add_callback(ignore)
+        try:
+            callback = measure(call, number=args.number)
+        finally:
+            remove_callback(ignore)
+
+        timings = result.timings
+        shares = [timings.get(phase, 0.0) / result.total * 100 for phase in PHASES]
+        rows.append(
+            (
+                name,
+                disabled * 1e3,
+                profiled * 1e3,
+                callback * 1e3,
+                (profiled / disabled - 1) * 100,
+                *shares,
+            )
+        )
+
+    print(
+        format_table(
+            [
+                "method",
+                "disabled (ms)",
+                "profiled (ms)",
+                "callback (ms)",
+                "overhead (%)",
+                *(f"{phase} (%)" for phase in PHASES),
+            ],
+            rows,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
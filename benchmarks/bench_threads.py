@@ -0,0 +1,81 @@
+"""
+Measures how the time to complete hard partial specifications with
+:code:`Draco.complete_spec` scales with the number of solver threads.
+
+Every configuration must find completions of the same costs as a single
+thread, the speedup is relative to the single-threaded solve. Note that
+clasp warns about oversubscription if there are more threads than cores.
+"""
+
+import argparse
+import random
+import time
+
+from draco import Draco
+
+from .utils import format_table, partial_spec
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--threads",
+        type=lambda s: [int(n) for n in s.split(",")],
+        default=[1, 2, 4, 8],
+        help="Comma-separated thread counts. Defaults to 1,2,4,8.",
+    )
+    parser.add_argument(
+        "--modes",
+        type=lambda s: s.split(","),
+        default=["compete", "split"],
+        help="Comma-separated parallel modes. Defaults to compete,split.",
+    )
+    parser.add_argument(
+        "--specs",
+        type=int,
+        default=5,
+        help="Number of partial specs to complete. Defaults to 5.",
+    )
+    parser.add_argument(
+        "--encodings",
+        type=int,
+        default=4,
+        help="Number of encodings of each partial spec. Defaults to 4.",
+    )
+    parser.add_argument(
+        "--models",
+        type=int,
+        default=1,
+        help="Number of completions per spec. Defaults to 1.",
+    )
+    return parser
+
+
+def complete_all(draco: Draco, specs: list[str], models: int):
+    start = time.perf_counter()
+    costs = [[m.cost for m in draco.complete_spec(spec, models)] for spec in specs]
+    return costs, (time.perf_counter() - start) / len(specs)
+
+
+def main():
+    args = argument_parser().parse_args()
+    rng = random.Random(0)
+    specs = [
+        partial_spec(rng, number_encodings=args.encodings) for _ in range(args.specs)
+    ]
+
+    expected, baseline = complete_all(Draco(), specs, args.models)
+
+    rows = []
+    for mode in args.modes:
+        for threads in args.threads:
+            draco = Draco(solver_threads=threads, parallel_mode=mode)
+            costs, seconds = complete_all(draco, specs, args.models)
+            assert costs == expected, "Completions differ from a single thread"
+            rows.append((mode, threads, seconds, baseline / seconds))
+
+    print(format_table(["mode", "threads", "time (s)", "speedup"], rows))
+
+
+if __name__ == "__main__":
+    main()
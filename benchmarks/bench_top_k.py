@@ -0,0 +1,124 @@
+"""
+Compares the top K engine of :code:`run_clingo` against the loop it replaced,
+which re-optimized from scratch for every cost level, on completions of
+partial specs for K from 1 to 100.
+
+Both engines run on the same ground program and must return the same costs.
+The times include grounding.
+"""
+
+import argparse
+import random
+import time
+from typing import Any
+
+from draco.run import _exclude_cost, _ground
+
+from draco import Draco, run_clingo
+
+from .utils import format_table, partial_spec
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--models",
+        type=int,
+        nargs="+",
+        default=[1, 10, 50, 100],
+        help="Values of K to run. Defaults to 1 10 50 100.",
+    )
+    parser.add_argument(
+        "--specs",
+        type=int,
+        default=3,
+        help="Number of partial specs per number of encodings. Defaults to 3.",
+    )
+    parser.add_argument(
+        "--encodings",
+        type=int,
+        nargs="+",
+        default=[2, 3, 4],
+        help="Numbers of encodings of the partial specs. Defaults to 2 3 4.",
+    )
+    return parser
+
+
+def legacy_top_k(program, models: int, arguments: list[str]) -> list[list[int]]:
+    # one optimization per cost level, excluding the returned costs in between
+    ctl, obs = _ground(program, models, True, arguments)
+    assert obs is not None
+    config: Any = ctl.configuration
+    costs = []
+    while models > 0:
+        cost = 0
+        config.solve.models = str(models)
+        with ctl.solve(yield_=True) as handle:
+            for model in handle:
+                if model.optimality_proven:
+                    cost = model.cost[0]
+                    costs.append(model.cost)
+                    models -= 1
+            if handle.get().unsatisfiable:
+                break
+        if models > 0:
+            _exclude_cost(ctl, obs, cost)
+    return costs
+
+
+def top_k(program, models: int, arguments: list[str]) -> list[list[int]]:
+    return [model.cost for model in run_clingo(program, models, True, arguments)]
+
+
+def timed(engine, *args) -> tuple[float, list[list[int]]]:
+    start = time.perf_counter()
+    costs = engine(*args)
+    return time.perf_counter() - start, costs
+
+
+def main():
+    args = argument_parser().parse_args()
+    draco = Draco()
+    arguments = draco._weight_arguments()
+
+    rng = random.Random(0)
+    programs = {
+        encodings: [
+            draco._complete_program(partial_spec(rng, number_encodings=encodings))
+            for _ in range(args.specs)
+        ]
+        for encodings in args.encodings
+    }
+
+    rows = []
+    for encodings, specs in programs.items():
+        for models in args.models:
+            legacy_time = engine_time = 0.0
+            for program in specs:
+                elapsed, expected = timed(legacy_top_k, program, models, arguments)
+                legacy_time += elapsed
+                elapsed, costs = timed(top_k, program, models, arguments)
+                engine_time += elapsed
+                if costs != expected:
+                    raise AssertionError(
+                        f"The engines disagree for K={models}: {costs} != {expected}"
+                    )
+            rows.append(
+                (
+                    encodings,
+                    models,
+                    legacy_time / len(specs),
+                    engine_time / len(specs),
+                    legacy_time / engine_time,
+                )
+            )
+
+    print(
+        format_table(
+            ["encodings", "K", "legacy (s)", "top K engine (s)", "speedup"], rows
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+"""
+Times the core Draco API over a grid of problem sizes, stores the results as
+JSON, and compares them against a stored baseline to flag regressions.
+
+Run the suite and store the results, then store them as the baseline:
+
+    python -m benchmarks.suite run --output .benchmarks/baseline.json
+
+After a change, run the suite again and compare it against the baseline:
+
+    python -m benchmarks.suite run
+    python -m benchmarks.suite compare
+
+Every benchmark takes the parameters of the grid that affect it, such as the
+number of fields of the schema, the number of rows of the data, or the
+:code:`max_encs` and :code:`max_marks` constants of the generator, and is timed
+once per combination of their values.
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import re
+import sys
+import time
+import timeit
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+import clingo
+import numpy as np
+import pandas as pd
+from draco.renderer import AltairRenderer
+
+from draco import (
+    Draco,
+    __version__,
+    answer_set_to_dict,
+    dict_to_facts,
+    programs,
+    schema_from_dataframe,
+)
+
+from .utils import format_table, measure
+
+results_path = Path(".benchmarks")
+
+# the values of the grid that are timed by default
+FIELDS = (4, 16)
+ROWS = (100, 10_000)
+MAX_ENCS = (2, 4)
+MAX_MARKS = (1, 2)
+# the number of completions that `complete_spec` is timed with
+K = (1, 10, 50)
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """Class for a benchmark of the suite.
+
+    Attributes:
+        :name: The name of the benchmark.
+        :parameters: The names of the parameters of the grid that the
+            benchmark takes.
+        :setup: Prepares the inputs for the given parameter values and returns
+            the call to time.
+    """
+
+    name: str
+    parameters: tuple[str, ...]
+    setup: Callable[..., Callable[[], Any]]
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, *parameters: str):
+    """Register a setup function as a benchmark of the suite."""
+
+    def register(setup: Callable[..., Callable[[], Any]]):
+        BENCHMARKS[name] = Benchmark(name, parameters, setup)
+        return setup
+
+    return register
+
+
+def dataframe(fields: int, rows: int) -> pd.DataFrame:
+    """A reproducible dataframe with alternating numeric, categorical and
+    temporal columns."""
+    rng = np.random.default_rng(0)
+    columns: dict[str, Any] = {}
+    for i in range(fields):
+        if i % 3 == 0:
+            columns[f"f{i}"] = rng.normal(50, 20, rows)
+        elif i % 3 == 1:
+            columns[f"f{i}"] = rng.choice(["a", "b", "c", "d", "e"], rows)
+        else:
+            columns[f"f{i}"] = pd.date_range("2020-01-01", periods=rows, freq="h")
+    return pd.DataFrame(columns)
+
+
+def schema(fields: int, rows: int = 100) -> dict:
+    return schema_from_dataframe(dataframe(fields, rows))
+
+
+def complete(fields: int, rows: int = 100) -> dict:
+    """A complete spec of a point chart of the first two fields."""
+    return schema(fields, rows) | {
+        "view": [
+            {
+                "coordinates": "cartesian",
+                "mark": [
+                    {
+                        "type": "point",
+                        "encoding": [
+                            {"channel": "x", "field": "f0"},
+                            {"channel": "y", "field": "f1"},
+                        ],
+                    }
+                ],
+                "scale": [
+                    {"channel": "x", "type": "linear", "zero": True},
+                    {"channel": "y", "type": "ordinal"},
+                ],
+            }
+        ],
+    }
+
+
+def partial(fields: int, max_encs: int) -> list[str]:
+    """A partial spec that leaves the marks, channels and scales of up to
+    :code:`max_encs` fields to the solver."""
+    encoded = random.Random(0).sample(range(fields), min(fields, max_encs))
+    spec = schema(fields) | {
+        "view": [{"mark": [{"encoding": [{"field": f"f{i}"} for i in encoded]}]}]
+    }
+    return dict_to_facts(spec)
+
+
+def generator(max_encs: int, max_marks: int) -> Draco:
+    """A Draco instance whose generator uses the given constants."""
+    program = programs.generate.program
+    for name, value in (("max_encs", max_encs), ("max_marks", max_marks)):
+        program = re.sub(
+            rf"#const {name} = \d+\.", f"#const {name} = {value}.", program
+        )
+    return Draco(generate=program)
+
+
+draco = Draco()
+
+
+@benchmark("check_spec", "fields")
+def time_check_spec(fields: int):
+    spec = dict_to_facts(complete(fields))
+    return lambda: draco.check_spec(spec)
+
+
+@benchmark("count_preferences", "fields")
+def time_count_preferences(fields: int):
+    spec = dict_to_facts(complete(fields))
+    return lambda: draco.count_preferences(spec)
+
+
+@benchmark("get_violations", "fields")
+def time_get_violations(fields: int):
+    spec = dict_to_facts(complete(fields))
+    return lambda: draco.get_violations(spec)
+
+
+@benchmark("complete_spec", "k", "fields", "max_encs", "max_marks")
+def time_complete_spec(k: int, fields: int, max_encs: int, max_marks: int):
+    completing = generator(max_encs, max_marks)
+    spec = partial(fields, max_encs)
+    return lambda: list(completing.complete_spec(spec, k))
+
+
+@benchmark("schema_from_dataframe", "fields", "rows")
+def time_schema_from_dataframe(fields: int, rows: int):
+    df = dataframe(fields, rows)
+    return lambda: schema_from_dataframe(df)
+
+
+@benchmark("dict_to_facts", "fields")
+def time_dict_to_facts(fields: int):
+    spec = complete(fields)
+    return lambda: dict_to_facts(spec)
+
+
+@benchmark("answer_set_to_dict", "fields")
+def time_answer_set_to_dict(fields: int):
+    symbols = [clingo.parse_term(fact[:-1]) for fact in dict_to_facts(complete(fields))]
+    return lambda: answer_set_to_dict(symbols)
+
+
+@benchmark("render", "fields", "rows")
+def time_render(fields: int, rows: int):
+    renderer = AltairRenderer()
+    spec = complete(fields, rows)
+    df = dataframe(fields, rows)
+    return lambda: renderer.render(spec, df)
+
+
+def key(name: str, params: dict[str, int]) -> str:
+    """The key of a benchmark run, such as ``check_spec[fields=4]``."""
+    values = ",".join(f"{param}={value}" for param, value in params.items())
+    return f"{name}[{values}]"
+
+
+def time_call(call: Callable[[], Any], repeat: int, min_time: float) -> float:
+    """Time a call like ``measure``, calling it often enough per measurement
+    to take at least :code:`min_time` seconds."""
+    number = 1
+    while timeit.timeit(call, number=number) < min_time:
+        number *= 2
+    return measure(call, number=number, repeat=repeat)
+
+
+def run_suite(
+    grid: dict[str, Sequence[int]],
+    pattern: str = "",
+    repeat: int = 3,
+    min_time: float = 0.1,
+) -> dict[str, float]:
+    """
+    Time the benchmarks over the grid of parameters.
+
+    :param grid: the values of every parameter.
+    :param pattern: a regular expression the keys of the timed runs match.
+    :param repeat: how many measurements to take of every run.
+    :param min_time: the minimum seconds of one measurement.
+    :return: a dict mapping the keys of the runs to the best mean time per call
+        in seconds.
+    """
+    results = {}
+    for bench in BENCHMARKS.values():
+        values = [grid[param] for param in bench.parameters]
+        for combination in itertools.product(*values):
+            params = dict(zip(bench.parameters, combination))
+            name = key(bench.name, params)
+            if not re.search(pattern, name):
+                continue
+            call = bench.setup(**params)
+            # warm up the parsing of the knowledge base and the imports
+            call()
+            results[name] = time_call(call, repeat, min_time)
+            print(f"{name}: {results[name] * 1e3:.3f} ms", file=sys.stderr)
+    return results
+
+
+def save_results(results: dict[str, float], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "draco": __version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n")
+
+
+def load_results(path: Path) -> dict[str, float]:
+    return json.loads(path.read_text())["results"]
+
+
+def compare(
+    baseline: dict[str, float], results: dict[str, float], threshold: float
+) -> tuple[list[tuple], int]:
+    """
+    Compare results against a baseline.
+
+    :param baseline: the results of the baseline.
+    :param results: the results to compare.
+    :param threshold: the relative slowdown that is flagged as a regression.
+    :return: the rows of the comparison table and the number of regressions.
+    """
+    rows = []
+    regressions = 0
+    for name in list(baseline) + [name for name in results if name not in baseline]:
+        before, after = baseline.get(name), results.get(name)
+        if before is None or after is None:
+            status = "new" if before is None else "missing"
+            times = ["" if t is None else t * 1e3 for t in (before, after)]
+            rows.append((name, *times, "", status))
+            continue
+        ratio = after / before
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+            regressions += 1
+        elif ratio < 1 / (1 + threshold):
+            status = "improved"
+        else:
+            status = ""
+        rows.append((name, before * 1e3, after * 1e3, ratio, status))
+    return rows, regressions
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Time the benchmarks.")
+    run_parser.add_argument("--fields", type=int, nargs="+", default=FIELDS)
+    run_parser.add_argument("--rows", type=int, nargs="+", default=ROWS)
+    run_parser.add_argument("--max-encs", type=int, nargs="+", default=MAX_ENCS)
+    run_parser.add_argument("--max-marks", type=int, nargs="+", default=MAX_MARKS)
+    run_parser.add_argument("--k", type=int, nargs="+", default=K)
+    run_parser.add_argument(
+        "--filter",
+        default="",
+        help="Only time the runs whose key matches this regular expression, "
+        "for example 'complete_spec.*k=1,'.",
+    )
+    run_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of measurements per run. Defaults to 3.",
+    )
+    run_parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.1,
+        help="Minimum seconds of a measurement. Defaults to 0.1.",
+    )
+    run_parser.add_argument(
+        "--output",
+        type=Path,
+        default=results_path / "results.json",
+        help="Where to store the results. Defaults to .benchmarks/results.json.",
+    )
+
+    compare_parser = commands.add_parser(
+        "compare", help="Compare results against a baseline."
+    )
+    compare_parser.add_argument(
+        "baseline",
+        type=Path,
+        nargs="?",
+        default=results_path / "baseline.json",
+        help="Defaults to .benchmarks/baseline.json.",
+    )
+    compare_parser.add_argument(
+        "results",
+        type=Path,
+        nargs="?",
+        default=results_path / "results.json",
+        help="Defaults to .benchmarks/results.json.",
+    )
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative slowdown that is a regression. Defaults to 0.2.",
+    )
+    return parser
+
+
+def main(args: Sequence[str] | None = None) -> int:
+    options = argument_parser().parse_args(args)
+
+    if options.command == "run":
+        grid = {
+            "fields": options.fields,
+            "rows": options.rows,
+            "max_encs": options.max_encs,
+            "max_marks": options.max_marks,
+            "k": options.k,
+        }
+        start = time.perf_counter()
+        results = run_suite(grid, options.filter, options.repeat, options.min_time)
+        save_results(results, options.output)
+        print(
+            format_table(
+                ["benchmark", "time (ms)"],
+                [(name, seconds * 1e3) for name, seconds in results.items()],
+            )
+        )
+        print(
+            f"\nTimed {len(results)} runs in {time.perf_counter() - start:.0f} s, "
+            f"wrote {options.output}"
+        )
+        return 0
+
+    rows, regressions = compare(
+        load_results(options.baseline),
+        load_results(options.results),
+        options.threshold,
+    )
+    print(
+        format_table(
+            ["benchmark", "baseline (ms)", "current (ms)", "ratio", ""],
+            rows,
+        )
+    )
+    print(f"\n{regressions} regressions with a threshold of {options.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
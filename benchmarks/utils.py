@@ -0,0 +1,148 @@
+import random
+import timeit
+from typing import Any, Callable, Sequence
+
+from draco.fact_utils import dict_to_facts
+from draco.programs import asp_path
+
+examples_path = asp_path / "examples"
+
+
+def example_specs() -> dict[str, str]:
+    """
+    Reads the example specifications shipped with Draco.
+
+    :return: a dict mapping the example names to their ASP programs.
+    """
+    return {path.stem: path.read_text() for path in sorted(examples_path.glob("*.lp"))}
+
+
+def random_spec(rng: random.Random, number_fields: int = 4) -> str:
+    """
+    Generates a complete specification with random choices for marks,
+    encodings and scales. Some of the generated specifications violate
+    hard constraints, which is intended to mimic generated corpora.
+
+    :param rng: the random number generator to draw choices from.
+    :param number_fields: the number of fields in the schema.
+    :return: the specification as an ASP program.
+    """
+    fields = []
+    for i in range(number_fields):
+        field: dict = {"name": f"f{i}", "unique": rng.randint(2, 100)}
+        if rng.random() < 0.6:
+            field |= {"type": "number", "min": rng.randint(-5, 50), "max": 100}
+        else:
+            field |= {"type": "string", "freq": rng.randint(1, 20)}
+        fields.append(field)
+
+    channels = ["x", "y"][: rng.randint(1, 2)]
+    channels += rng.sample(["color", "size", "shape"], rng.randint(0, 1))
+    encodings = []
+    scales = []
+    for channel in channels:
+        field = rng.choice(fields)
+        encodings.append({"channel": channel, "field": field["name"]})
+        if field["type"] == "number":
+            scale_type = rng.choice(["linear", "linear", "log"])
+            scales.append({"channel": channel, "type": scale_type, "zero": True})
+        else:
+            scales.append({"channel": channel, "type": "ordinal"})
+
+    spec = {
+        "number_rows": 100,
+        "task": rng.choice(["value", "summary"]),
+        "field": fields,
+        "view": [
+            {
+                "coordinates": "cartesian",
+                "mark": [
+                    {
+                        "type": rng.choice(["point", "bar", "tick", "line"]),
+                        "encoding": encodings,
+                    }
+                ],
+                "scale": scales,
+            }
+        ],
+    }
+    return "\n".join(dict_to_facts(spec))
+
+
+def spec_corpus(size: int, seed: int = 0) -> list[str]:
+    """
+    Generates a reproducible corpus of random specifications.
+
+    :param size: the number of specifications to generate.
+    :param seed: the seed of the random number generator.
+    :return: the list of specifications.
+    """
+    rng = random.Random(seed)
+    return [random_spec(rng) for _ in range(size)]
+
+
+def partial_spec(
+    rng: random.Random, number_fields: int = 8, number_encodings: int = 4
+) -> str:
+    """
+    Generates a partial specification that only names the fields to encode,
+    leaving marks, channels and scales to the solver. Completing it is a hard
+    optimization problem whose difficulty grows with the number of encodings.
+
+    :param rng: the random number generator to draw the schema from.
+    :param number_fields: the number of fields in the schema.
+    :param number_encodings: the number of fields to encode.
+    :return: the partial specification as an ASP program.
+    """
+    fields = [
+        {
+            "name": f"f{i}",
+            "type": rng.choice(["number", "string"]),
+            "unique": rng.randint(2, 100),
+        }
+        for i in range(number_fields)
+    ]
+    encoded = rng.sample(fields, number_encodings)
+
+    spec = {
+        "number_rows": 1000,
+        "task": rng.choice(["value", "summary"]),
+        "field": fields,
+        "view": [
+            {"mark": [{"encoding": [{"field": field["name"]} for field in encoded]}]}
+        ],
+    }
+    return "\n".join(dict_to_facts(spec))
+
+
+def measure(fn: Callable[[], Any], number: int = 10, repeat: int = 5) -> float:
+    """
+    Measures the time it takes to call :code:`fn`.
+
+    :param fn: the function to measure.
+    :param number: how many times to call the function per measurement.
+    :param repeat: how many measurements to take.
+    :return: the best mean time per call in seconds across the measurements.
+    """
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def format_table(headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    """
+    Formats benchmark results as a plain text table.
+
+    :param headers: the column headers.
+    :param rows: the rows of the table.
+    :return: the formatted table.
+    """
+
+    def fmt(value: Any) -> str:
+        return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+    cells = [list(map(str, headers))] + [list(map(fmt, row)) for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    lines = [
+        "  ".join(c.ljust(w) for c, w in zip(row, widths)).rstrip() for row in cells
+    ]
+    lines.insert(1, "  ".join("-" * w for w in widths))
+    return "\n".join(lines)
@@ -1,17 +1,45 @@
+from importlib import import_module
 from importlib.metadata import version
+from typing import TYPE_CHECKING, Any
 
 from draco import programs
 
-from .debug import DracoDebug, DracoDebugChartConfig, DracoDebugPlotter
-from .draco import Draco
+from .canonical import canonicalize, fingerprint
+from .domains import restrict_domains
+from .draco import AsyncDraco, Draco
 from .fact_utils import answer_set_to_dict, dict_to_facts
-from .run import is_satisfiable, run_clingo
-from .schema import schema_from_dataframe, schema_from_file
+from .pool import DracoPool
+from .profiling import Statistics, profile
+from .run import is_satisfiable, is_satisfiable_async, run_clingo, run_clingo_async
 from .utils import dict_union
 from .weights import weights
 
+if TYPE_CHECKING:
+    from .debug import DracoDebug, DracoDebugChartConfig, DracoDebugPlotter
+    from .schema import schema_from_dataframe, schema_from_file
+
 __version__ = version("draco")
 
+# modules that import altair or pandas, which take most of the time to import
+# draco, are only imported when one of their names is first used
+_lazy_names = {
+    "DracoDebug": "debug",
+    "DracoDebugPlotter": "debug",
+    "DracoDebugChartConfig": "debug",
+    "schema_from_dataframe": "schema",
+    "schema_from_file": "schema",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _lazy_names:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f".{_lazy_names[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
     "DracoDebug",
     "DracoDebugPlotter",
@@ -19,11 +47,20 @@ __all__ = [
     "programs",
     "dict_to_facts",
     "answer_set_to_dict",
+    "canonicalize",
+    "fingerprint",
     "run_clingo",
+    "run_clingo_async",
     "is_satisfiable",
+    "is_satisfiable_async",
     "Draco",
+    "AsyncDraco",
+    "DracoPool",
+    "profile",
+    "Statistics",
     "schema_from_dataframe",
     "schema_from_file",
+    "restrict_domains",
     "dict_union",
     "weights",
 ]
@@ -0,0 +1,424 @@
+import re
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Mapping, Sequence, cast
+
+import clingo
+import numpy as np
+from clingo.ast import (
+    AST,
+    ASTType,
+    Function,
+    Literal,
+    Location,
+    ProgramBuilder,
+    Sign,
+    SymbolicAtom,
+    SymbolicTerm,
+    Transformer,
+    Variable,
+    parse_string,
+)
+
+from draco.run import PreparedProgram
+
+# Names used to tie the facts of a specification to its id in a batch.
+# Clingo allows leading underscores, so they cannot clash with Draco's predicates.
+SPEC_PREDICATE = "_draco_spec"
+UNSAT_PREDICATE = "_draco_unsat"
+SPEC_VARIABLE = "DracoSpecId"
+
+# Statements that can be namespaced. Everything else, for example externals,
+# constant definitions, or theory atoms, makes a program unsupported in a batch.
+# Optimization and show statements are dropped, since they do not change which
+# atoms are derived.
+_NAMESPACED = {ASTType.Rule}
+_SHOW = {ASTType.ShowSignature, ASTType.ShowTerm}
+_DROPPED = {ASTType.Minimize, ASTType.Comment} | _SHOW
+
+
+class UnsupportedProgramError(ValueError):
+    """Raised if a program contains statements that cannot be solved in a batch."""
+
+
+class _Namespacer(Transformer):
+    """
+    Rewrites a program so that it can be solved next to other specifications:
+    every atom gets the id of its specification as first argument and integrity
+    constraints derive an unsat atom for the specification instead of removing
+    all answer sets of the batch.
+    """
+
+    def __init__(self, namespace: Callable[[Location], AST], bind: bool):
+        """
+        :param namespace: Creates the term for the spec id at a location.
+        :param bind: Whether the spec id is a variable that has to be bound by
+            adding the spec predicate to the body of every rule.
+        """
+        self.namespace = namespace
+        self.bind = bind
+
+    def visit_SymbolicAtom(self, atom: AST) -> AST:
+        return atom.update(symbol=self._namespace_term(atom.symbol))
+
+    def _namespace_term(self, term: AST) -> AST:
+        if term.ast_type == ASTType.Function:
+            return term.update(
+                arguments=[self.namespace(term.location)] + list(term.arguments)
+            )
+        elif term.ast_type == ASTType.SymbolicTerm and (
+            term.symbol.type == clingo.SymbolType.Function
+        ):
+            return Function(
+                term.location,
+                term.symbol.name,
+                [self.namespace(term.location)]
+                + list(map(_term, term.symbol.arguments)),
+                0,
+            )
+        elif term.ast_type == ASTType.Pool:
+            return term.update(
+                arguments=list(map(self._namespace_term, term.arguments))
+            )
+        elif term.ast_type == ASTType.UnaryOperation:
+            return term.update(argument=self._namespace_term(term.argument))
+        raise UnsupportedProgramError(f"Unsupported atom {term}")
+
+    def visit_TheoryAtom(self, atom: AST) -> AST:
+        raise UnsupportedProgramError("Theory atoms are not supported")
+
+    def visit_Rule(self, rule: AST) -> AST:
+        rule = rule.update(**self.visit_children(rule))
+        location = rule.location
+
+        head = rule.head
+        if head.ast_type == ASTType.Literal and (
+            head.atom.ast_type == ASTType.BooleanConstant and not head.atom.value
+        ):
+            head = _literal(
+                Function(location, UNSAT_PREDICATE, [self.namespace(location)], 0)
+            )
+
+        body = list(rule.body)
+        if self.bind:
+            body.append(
+                _literal(
+                    Function(location, SPEC_PREDICATE, [self.namespace(location)], 0)
+                )
+            )
+
+        return rule.update(head=head, body=body)
+
+
+def _log(code: clingo.MessageCode, message: str):
+    # the namespaced rules of the knowledge base mention atoms that a batch
+    # does not define, which is expected and only clutters the output
+    if code != clingo.MessageCode.AtomUndefined:
+        print(message, file=sys.stderr)
+
+
+def _term(symbol: clingo.Symbol) -> AST:
+    pos = clingo.ast.Position("<batch>", 0, 0)
+    return SymbolicTerm(clingo.ast.Location(pos, pos), symbol)
+
+
+def _literal(atom: AST) -> AST:
+    return Literal(atom.location, Sign.NoSign, SymbolicAtom(atom))
+
+
+# Matches the canonical text of a plain fact such as `attribute((mark,type),m,bar).`
+# Facts with characters that may indicate other constructs (pools, conditions,
+# strings with spaces, ...) do not match and are namespaced on the syntax tree.
+_FACT = re.compile(r"-?[_a-z][A-Za-z0-9_']*(\([^;:{}|#&@ ]*\))?\.")
+
+
+@dataclass(frozen=True)
+class NamespacedSpec:
+    """Class for a specification whose atoms are tied to its id in a batch.
+
+    Attributes:
+        :facts: The namespaced facts as program text. Facts make up most
+            specifications and rewriting their text is much faster than
+            rewriting their syntax trees.
+        :statements: The other namespaced statements.
+    """
+
+    facts: list[str]
+    statements: list[AST]
+
+
+def _namespace_statements(
+    program: str,
+    namespacer: _Namespacer,
+    fact: Callable[[str], str] | None = None,
+    dropped: set[ASTType] = _DROPPED,
+) -> tuple[list[str], list[AST]]:
+    facts: list[str] = []
+    statements: list[AST] = []
+
+    def add(statement: AST):
+        if fact is not None:
+            text = str(statement)
+            if _FACT.fullmatch(text):
+                facts.append(fact(text))
+                return
+
+        if statement.ast_type == ASTType.Program:
+            if statement.name != "base" or len(statement.parameters):
+                raise UnsupportedProgramError("Program parts are not supported")
+        elif statement.ast_type in _NAMESPACED:
+            statements.append(namespacer(statement))
+        elif statement.ast_type not in dropped:
+            raise UnsupportedProgramError(
+                f"Unsupported statement of type {statement.ast_type.name}"
+            )
+
+    parse_string(program, add, logger=lambda code, msg: None)
+    return facts, statements
+
+
+def prepare_batch_program(program: str | Iterable[str]) -> PreparedProgram:
+    """Parse a spec-independent program and namespace it for batch solving.
+    The rules of the program apply to every specification in the batch.
+
+    :param program: Program as a string or iterable of strings that will be
+        concatenated.
+    :raises UnsupportedProgramError: If the program cannot be solved in a batch.
+    :raises RuntimeError: If the program cannot be parsed.
+    :return: The namespaced, prepared program.
+    """
+    if not isinstance(program, str):
+        program = "\n".join(program)
+
+    namespacer = _Namespacer(lambda location: Variable(location, SPEC_VARIABLE), True)
+    _, statements = _namespace_statements(program, namespacer)
+    return PreparedProgram(tuple(statements))
+
+
+def namespace_spec(spec: str, spec_id: int, show: bool = True) -> NamespacedSpec:
+    """Parse a specification and tie all of its atoms to the given id.
+
+    :param spec: The specification as a program string.
+    :param spec_id: The id of the specification in the batch.
+    :param show: Whether the spec may contain show statements, which are dropped.
+        Show statements change which atoms a single solve reports, so callers
+        that read atoms other than the unsat atoms should not allow them.
+    :raises UnsupportedProgramError: If the spec cannot be solved in a batch.
+    :raises RuntimeError: If the spec cannot be parsed.
+    :return: The namespaced spec, including the fact declaring the id.
+    """
+    symbol = clingo.Number(spec_id)
+    namespacer = _Namespacer(lambda location: SymbolicTerm(location, symbol), False)
+
+    def fact(text: str) -> str:
+        start = text.find("(")
+        if start < 0:
+            return f"{text[:-1]}({spec_id})."
+        return f"{text[: start + 1]}{spec_id},{text[start + 1 :]}"
+
+    dropped = _DROPPED if show else _DROPPED - _SHOW
+    facts, statements = _namespace_statements(spec, namespacer, fact, dropped)
+    facts.append(f"{SPEC_PREDICATE}({spec_id}).")
+
+    return NamespacedSpec(facts, statements)
+
+
+def solve_batch(
+    program: PreparedProgram,
+    specs: Sequence[NamespacedSpec],
+    show: Iterable[str] = (),
+    cautious: bool = True,
+    arguments: list[str] = [],
+) -> list[list[clingo.Symbol]]:
+    """Ground the namespaced specifications together with the program once and
+    solve them.
+
+    :param program: The namespaced program from ``prepare_batch_program``.
+    :param specs: The namespaced specifications from ``namespace_spec``.
+    :param show: Signatures of the atoms to show in addition to the unsat atoms,
+        such as ``"preference/3"``. Namespaced atoms have the spec id as first
+        argument.
+    :param cautious: Whether to compute the atoms that are true in all answer
+        sets (the cautious consequences), which are shown by the last model.
+        Otherwise, at most two models are computed, which is enough to tell
+        whether the batch has a unique answer set.
+    :param arguments: Additional arguments to the clingo grounder and solver.
+    :return: The shown atoms of each model. There are no models if any
+        specification has no answer set even when ignoring its integrity
+        constraints.
+    """
+    enum_mode = ["--enum-mode=cautious"] if cautious else []
+    ctl = clingo.Control(["--single-shot"] + enum_mode + arguments, logger=_log)
+    config: Any = ctl.configuration
+    config.solve.models = "0" if cautious else "2"
+
+    with ProgramBuilder(ctl) as builder:
+        for statement in program.statements:
+            builder.add(statement)
+        for spec in specs:
+            for statement in spec.statements:
+                builder.add(statement)
+
+    facts = [fact for spec in specs for fact in spec.facts]
+    shows = [f"#show {signature}." for signature in [f"{UNSAT_PREDICATE}/1", *show]]
+    ctl.add("base", [], "\n".join(facts + shows))
+    ctl.ground([("base", [])])
+
+    models: list[list[clingo.Symbol]] = []
+    solve_handle = cast(clingo.solving.SolveHandle, ctl.solve(yield_=True))
+    with solve_handle as handle:
+        for model in handle:
+            models.append(model.symbols(shown=True))
+
+    return models
+
+
+def _namespace_all(
+    program: PreparedProgram | None,
+    specs: Sequence[str],
+    fallback: Callable[[int, str], None],
+    show: bool = True,
+) -> tuple[list[NamespacedSpec], list[int]]:
+    """Namespace the specifications that can be solved in a batch and hand the
+    others with their index to the fallback."""
+    namespaced: list[NamespacedSpec] = []
+    ids: list[int] = []
+
+    for i, spec in enumerate(specs):
+        if program is None:
+            fallback(i, spec)
+            continue
+        try:
+            namespaced.append(namespace_spec(spec, i, show))
+            ids.append(i)
+        except UnsupportedProgramError:
+            fallback(i, spec)
+
+    return namespaced, ids
+
+
+def check_batch(
+    program: PreparedProgram | None,
+    specs: Sequence[str],
+    fallback: Callable[[str], bool],
+) -> list[bool]:
+    """Check the satisfiability of many specifications with a single grounding.
+
+    The cautious consequences decide satisfiability: a specification has an
+    answer set if and only if its unsat atom is not true in all answer sets of
+    its program without the integrity constraints. If the batch as a whole has
+    no answer set, it is split in halves until the offending specifications are
+    checked on their own.
+
+    :param program: The namespaced program from ``prepare_batch_program``, or
+        None if the program cannot be solved in a batch, so that every
+        specification is handed to the fallback.
+    :param specs: The specifications to check.
+    :param fallback: Checks a single specification that cannot be solved in a
+        batch, for example because it defines constants.
+    :return: Whether each specification is satisfiable, in input order.
+    """
+    results = [False] * len(specs)
+
+    def check_single(i: int, spec: str):
+        results[i] = fallback(spec)
+
+    namespaced, ids = _namespace_all(program, specs, check_single)
+    if program is not None and ids:
+        for i, result in zip(ids, _check_namespaced(program, namespaced, ids)):
+            results[i] = result
+
+    return results
+
+
+def _check_namespaced(
+    program: PreparedProgram, specs: list[NamespacedSpec], ids: list[int]
+) -> list[bool]:
+    models = solve_batch(program, specs)
+
+    if not models:
+        if len(specs) == 1:
+            return [False]
+
+        half = len(specs) // 2
+        return _check_namespaced(program, specs[:half], ids[:half]) + _check_namespaced(
+            program, specs[half:], ids[half:]
+        )
+
+    unsat = {symbol.arguments[0].number for symbol in models[-1]}
+    return [i not in unsat for i in ids]
+
+
+def count_batch(
+    program: PreparedProgram | None,
+    specs: Sequence[str],
+    names: Sequence[str],
+    fallback: Callable[[str], Mapping[str, int] | None],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Count how often each specification violates each preference with a
+    single grounding.
+
+    The counts are only well-defined if a specification has a unique answer set,
+    which holds for facts with Draco's knowledge base. If the batch has no or
+    more than one answer set, it is split in halves until the offending
+    specifications are counted on their own.
+
+    :param program: The namespaced program from ``prepare_batch_program``, or
+        None if the program cannot be solved in a batch, so that every
+        specification is handed to the fallback.
+    :param specs: The specifications to count the preferences of.
+    :param names: The preference names, which determine the column order.
+    :param fallback: Counts the preferences of a single specification that cannot
+        be counted in a batch, returning None if it is not satisfiable.
+    :return: The counts as a matrix with a row per specification and a column
+        per preference and a mask of the specifications that are not
+        satisfiable, whose rows are all zero.
+    """
+    columns = {name: j for j, name in enumerate(names)}
+    counts = np.zeros((len(specs), len(names)), dtype=np.int64)
+    unsatisfiable = np.zeros(len(specs), dtype=bool)
+
+    def count_single(i: int, spec: str):
+        result = fallback(spec)
+        if result is None:
+            unsatisfiable[i] = True
+        else:
+            for name, count in result.items():
+                if name in columns:
+                    counts[i, columns[name]] = count
+
+    def count_namespaced(
+        program: PreparedProgram, batch: list[NamespacedSpec], ids: list[int]
+    ):
+        models = solve_batch(program, batch, ["preference/3"], cautious=False)
+
+        if len(models) != 1:
+            if len(batch) == 1:
+                if models:
+                    # more than one answer set, the first one found counts
+                    count_single(ids[0], specs[ids[0]])
+                else:
+                    unsatisfiable[ids[0]] = True
+                return
+
+            half = len(batch) // 2
+            count_namespaced(program, batch[:half], ids[:half])
+            count_namespaced(program, batch[half:], ids[half:])
+            return
+
+        for symbol in models[0]:
+            i = symbol.arguments[0].number
+            if symbol.name == UNSAT_PREDICATE:
+                unsatisfiable[i] = True
+            else:
+                j = columns.get(symbol.arguments[1].name)
+                if j is not None:
+                    counts[i, j] += 1
+
+    # specs with show statements may hide the preferences from a single solve
+    namespaced, ids = _namespace_all(program, specs, count_single, show=False)
+    if program is not None and ids:
+        count_namespaced(program, namespaced, ids)
+
+    counts[unsatisfiable] = 0
+    return counts, unsatisfiable
@@ -0,0 +1,200 @@
+import hashlib
+import re
+
+import clingo
+from clingo.ast import AST, ASTType, Sign, parse_string
+
+from draco.types import Specification
+
+
+def _silent(code: clingo.MessageCode, message: str):
+    pass
+
+
+# a fact of constants, numbers and tuples without whitespace, which is how
+# `dict_to_facts` writes specifications and is already in canonical form
+_PLAIN_FACT = re.compile(r"[a-z][\w(),]*\.")
+_VARIABLE = re.compile(r"(^|[(,])[A-Z_]")
+
+
+def _parse_fact(text: str) -> str | None:
+    """Parse the atom of a fact without its period into its canonical text,
+    or return None if the text is not a plain atom."""
+    try:
+        symbol = clingo.parse_term(text, logger=_silent)
+    except RuntimeError:
+        return None
+    if symbol.type != clingo.SymbolType.Function or not symbol.name:
+        return None
+    return str(symbol)
+
+
+def _parse_lines(program: str) -> set[str] | None:
+    """Parse a program with one fact per line, which is how specifications
+    are usually written, without building its syntax tree. Returns None if
+    the program has other lines."""
+    facts = set()
+    for line in program.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if _PLAIN_FACT.fullmatch(line) and not _VARIABLE.search(line):
+            facts.add(line[:-1])
+            continue
+        if not line.endswith(".") or "%" in line:
+            return None
+        fact = _parse_fact(line[:-1])
+        if fact is None:
+            return None
+        facts.add(fact)
+    return facts
+
+
+def _fact(statement: AST) -> str | None:
+    """Get the canonical text of the atom of a fact, or None if the statement
+    is not a fact."""
+    if statement.ast_type != ASTType.Rule or statement.body:
+        return None
+    head = statement.head
+    if (
+        head.ast_type != ASTType.Literal
+        or head.sign != Sign.NoSign
+        or head.atom.ast_type != ASTType.SymbolicAtom
+    ):
+        return None
+    return _parse_fact(str(head.atom))
+
+
+def _arguments(fact: str) -> list[str] | None:
+    """Split the canonical text of an atom into the texts of its arguments, or
+    return None if the atom has no arguments."""
+    start = fact.find("(")
+    if start < 0:
+        return None
+
+    arguments = []
+    depth = 0
+    begin = start + 1
+    quoted = False
+    escaped = False
+    for position in range(begin, len(fact) - 1):
+        char = fact[position]
+        if quoted:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                quoted = False
+        elif char == '"':
+            quoted = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            arguments.append(fact[begin:position])
+            begin = position + 1
+    arguments.append(fact[begin:-1])
+    return arguments
+
+
+def _rename_entities(facts: set[str]) -> set[str]:
+    """Replace the entity ids of a specification by ``(e,N)``, numbered in the
+    order of the original ids.
+
+    The order is kept because constraints compare entity ids, for example to
+    consider every pair of encodings once. Ids that contain other entity ids,
+    like the ``(V,M)`` ids of generated marks, are matched by constraints, so
+    specifications with such ids are returned unchanged.
+    """
+    entities = {}
+    attributes = {}
+    for fact in facts:
+        if fact.startswith("entity("):
+            entities[fact] = _arguments(fact)
+        elif fact.startswith("attribute("):
+            attributes[fact] = _arguments(fact)
+
+    ids = {
+        arguments[2]: clingo.parse_term(arguments[2])
+        for arguments in entities.values()
+        if arguments is not None and len(arguments) == 3 and arguments[2] != "root"
+    }
+    symbols = set(ids.values())
+    for symbol in symbols:
+        if symbol.type == clingo.SymbolType.Function and symbols.intersection(
+            symbol.arguments
+        ):
+            return facts
+
+    # clingo compares the ids in the order of their symbols
+    order = sorted(ids, key=ids.__getitem__)
+    renamed = {id_: f"(e,{number})" for number, id_ in enumerate(order)}
+
+    result = set()
+    for fact in facts:
+        arguments = entities.get(fact) or attributes.get(fact)
+        if arguments is not None and len(arguments) == 3:
+            arguments[1] = renamed.get(arguments[1], arguments[1])
+            if fact in entities:
+                arguments[2] = renamed.get(arguments[2], arguments[2])
+            fact = fact[: fact.find("(")] + f"({','.join(arguments)})"
+        result.add(fact)
+    return result
+
+
+def canonicalize(spec: Specification) -> str:
+    """Get a canonical program text for a specification, so that specifications
+    that only differ in the order of their facts, in whitespace, in duplicate
+    facts, or in the names of their entities have the same text.
+
+    Entities are renamed to ``(e,N)`` in the order of their original ids, which
+    constraints can compare, so the canonical text has the same violations and
+    preferences as the specification. Specifications with statements other
+    than facts and ``#show`` statements keep their entity ids, as the other
+    statements may refer to them.
+
+    :param spec: The specification as a program string or list of facts.
+    :raises RuntimeError: If the specification cannot be parsed.
+    :return: The canonical program text with one statement per line.
+    """
+    program = spec if isinstance(spec, str) else "\n".join(spec)
+
+    parsed = _parse_lines(program)
+    facts: set[str] = set() if parsed is None else parsed
+    statements: set[str] = set()
+    only_facts = True
+
+    if parsed is None:
+
+        def add(statement: AST):
+            nonlocal only_facts
+            if statement.ast_type == ASTType.Program and statement.name == "base":
+                return
+            fact = _fact(statement)
+            if fact is not None:
+                facts.add(fact)
+                return
+            statements.add(str(statement))
+            if statement.ast_type != ASTType.ShowSignature:
+                only_facts = False
+
+        parse_string(program, add, logger=_silent)
+
+    if only_facts:
+        facts = _rename_entities(facts)
+    return "\n".join(sorted(f"{fact}." for fact in facts) + sorted(statements))
+
+
+def fingerprint(spec: Specification) -> str:
+    """Get a stable digest of the canonical text of a specification, see
+    ``canonicalize``. Specifications with the same fingerprint have the same
+    violations and preferences.
+
+    :param spec: The specification as a program string or list of facts.
+    :raises RuntimeError: If the specification cannot be parsed.
+    :return: The digest as a hexadecimal string of 32 characters.
+    """
+    canonical = canonicalize(spec)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
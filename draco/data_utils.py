@@ -1,13 +1,16 @@
 import logging
 import math
-from multiprocessing import Manager, cpu_count
-from typing import Any, DefaultDict, Dict, Iterable, List, Tuple
+from collections import defaultdict
+from functools import partial
+from multiprocessing import cpu_count
+from typing import Callable, DefaultDict, Dict, Iterable, List, Tuple
 
 import numpy as np
 import pandas as pd
 from pandas.util import hash_pandas_object
 
 from .draco import Draco
+from .pool import DracoPool
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,12 +31,21 @@ def get_nested_index(fields: Tuple[str, str] = ("negative", "positive")):
     return index
 
 
+def _run_partition(
+    func: Callable, fields: Tuple[str, str], partition: List
+) -> pd.DataFrame:
+    # the memo only needs to cover the partition, since the pair ids are unique
+    return func(({}, fields, partition))
+
+
 def run_in_parallel(
     func,
     data: List,
     fields: Tuple[str, str] = ("negative", "positive"),
 ) -> pd.DataFrame:
-    """Like map, but parallel."""
+    """Like map, but parallel. The partitions of the data are processed by a
+    ``DracoPool``, whose workers share the parsed programs of ``draco``.
+    """
 
     splits = min([cpu_count() * 20, math.ceil(len(data) / 10)])
     df_split: List = np.array_split(data, splits)
@@ -41,22 +53,13 @@ def run_in_parallel(
 
     logger.info(
         f"Running {splits} partitions of {len(data)} items "
-        "in parallel on {processes} processes."
+        f"in parallel on {processes} processes."
     )
 
-    with Manager() as manager:
-        m: Any = manager  # fix for mypy
-        d = m.dict()  # shared dict for memoization
-        pool = m.Pool(processes=processes)
-
-        tuples: List[Tuple[Dict, Tuple[str, str], Any]] = []
-        for s in df_split:
-            # add some arguments
-            tuples.append((d, fields, s))
-
-        df = pd.concat(pool.map(func, tuples))
-        pool.close()
-        pool.join()
+    with DracoPool(draco, processes) as pool:
+        df = pd.concat(
+            pool.map_items(partial(_run_partition, func, fields), df_split, chunksize=1)
+        )
 
     df = df.sort_index()
 
@@ -78,6 +81,27 @@ def pair_partition_to_vec(
     columns = get_nested_index()
     dfs = []
 
+    # count the preferences of all specs in the partition that have not been
+    # counted by other processes at once, the memoized lookups below then hit
+    missing: Dict[str, str | Iterable[str]] = {}
+    for example in partition_data:
+        for field in fields:
+            key = f"{example['pair_id']}_{field}"
+            if key not in processed_specs:
+                missing[key] = example[field]
+
+    counts, unsatisfiable = draco.count_preferences_batch(missing.values())
+    for key, row, is_unsatisfiable in zip(missing.keys(), counts, unsatisfiable):
+        if not is_unsatisfiable:
+            processed_specs[key] = defaultdict(
+                int,
+                {
+                    name: int(count)
+                    for name, count in zip(draco.soft_constraint_names, row)
+                    if count
+                },
+            )
+
     for example in partition_data:
         neg_feature_vec = count_preferences_memoized(
             processed_specs, f"{example['pair_id']}_{fields[0]}", example[fields[0]]
@@ -78,12 +78,11 @@ class DracoDebug:
 
         :return: The above-described pandas ``DataFrame``.
         """
-        # Nested preference counts
+        # Nested preference counts, computed for all specs at once
+        counts, _ = self.draco.count_preferences_batch(self.specs.values())
         pref_count_dict: dict[str, dict[str, int]] = {
-            chart_name: self.__full_pref_count_dict(
-                self.draco, spec, self.feature_names
-            )
-            for chart_name, spec in self.specs.items()
+            chart_name: dict(zip(self.draco.soft_constraint_names, map(int, row)))
+            for chart_name, row in zip(self.specs.keys(), counts)
         }
         # Flattened preference counts
         pref_tuples = self.__unnest_pref_count_dict(pref_count_dict)
@@ -98,19 +97,6 @@ class DracoDebug:
             columns=["chart_name", "pref_name", "pref_description", "count", "weight"],
         )
 
-    @staticmethod
-    def __full_pref_count_dict(
-        draco: Draco, spec: str | Iterable[str], feature_names: set[str]
-    ) -> dict[str, int]:
-        """
-        Constructs a dict of preference counts,
-        including all the soft constraint names in the keys
-        """
-        base: dict[str, int] = draco.count_preferences(spec) or {}
-        included_feature_names = set(base.keys())
-        not_included_feature_names = feature_names - included_feature_names
-        return base | {feature_name: 0 for feature_name in not_included_feature_names}
-
     @staticmethod
     def __unnest_pref_count_dict(dct: dict[str, dict[str, int]]) -> list[PrefTuple]:
         """Flattens the dict of dicts into a list of tuples"""
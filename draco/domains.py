@@ -0,0 +1,100 @@
+from typing import Mapping
+
+import clingo
+
+from draco.fact_utils import get_value
+from draco.types import Specification
+
+# The attribute values that hard constraints reject for encodings of fields of a
+# type, as (attribute, value) pairs. A value of None excludes all values.
+TYPE_EXCLUSIONS: dict[str, list[tuple[str, str | None]]] = {
+    # aggregate_num_valid, bin_n_d, scale_type_data_type, and zero_d_n
+    "string": [
+        ("(encoding,aggregate)", "mean"),
+        ("(encoding,aggregate)", "sum"),
+        ("(encoding,aggregate)", "stdev"),
+        ("(encoding,binning)", None),
+        ("(scale,type)", "linear"),
+        ("(scale,type)", "log"),
+        ("(scale,zero)", None),
+    ],
+    # aggregate_t_valid
+    "datetime": [
+        ("(encoding,aggregate)", "count"),
+        ("(encoding,aggregate)", "mean"),
+        ("(encoding,aggregate)", "median"),
+        ("(encoding,aggregate)", "stdev"),
+        ("(encoding,aggregate)", "sum"),
+    ],
+}
+TYPE_EXCLUSIONS["boolean"] = TYPE_EXCLUSIONS["string"]
+
+
+def excluded_values(field: Mapping) -> list[tuple[str, str | None]]:
+    """The attribute values that hard constraints reject for the encodings of
+    a field and their scales, which restricts the domains of ``define.lp`` to
+    the field.
+
+    :param field: The properties of the field, as in the schema returned by
+        ``schema_from_dataframe``.
+    :return: The excluded values as (attribute, value) pairs, where a value of
+        None excludes all values of the attribute.
+    """
+    excluded = list(TYPE_EXCLUSIONS.get(field.get("type", ""), []))
+    # log_non_positive, which also covers log_zero_included
+    if field.get("type") == "number" and field.get("min", 1) <= 0:
+        excluded.append(("(scale,type)", "log"))
+    return excluded
+
+
+def restrict_domains(spec: Specification) -> list[str]:
+    """Exclude the attribute values that are invalid for the field of an
+    encoding from the choices of the generator.
+
+    The domains in ``define.lp`` do not depend on the data, so the generator
+    grounds choices that hard constraints reject, such as log scales of fields
+    with non-positive values or the mean of strings. The facts of this pre-pass
+    remove these choices for the encodings whose field the partial spec sets,
+    and their scales, so that the hard constraints are decided while grounding
+    instead of while solving. Encodings whose field the solver chooses keep
+    the full domains. The completions do not change.
+
+    :param spec: The partial specification with its schema, such as the facts
+        of a schema from ``schema_from_dataframe`` with views.
+    :return: The facts to add to the specification.
+    """
+    ctl = clingo.Control(["--warn=none"])
+    ctl.add("base", [], spec if isinstance(spec, str) else "\n".join(spec))
+    ctl.ground([("base", [])])
+
+    fields: dict[clingo.Symbol, dict] = {}
+    encodings = []
+    for atom in ctl.symbolic_atoms.by_signature("attribute", 3):
+        prop, obj, value = atom.symbol.arguments
+        if not prop.match("", 2):
+            continue
+        kind, name = prop.arguments
+        if kind.match("field", 0):
+            fields.setdefault(obj, {})[name.name] = get_value(value)
+            if name.match("name", 0):
+                # compare the names as symbols, which encodings refer to
+                fields[obj]["symbol"] = value
+        elif kind.match("encoding", 0) and name.match("field", 0):
+            encodings.append((obj, value))
+
+    by_name = {field["symbol"]: field for field in fields.values() if "symbol" in field}
+    facts = []
+    for encoding, name in encodings:
+        field = by_name.get(name)
+        if field is None:
+            continue
+        for attribute, excluded in excluded_values(field):
+            # the generator names the scale of an encoding E (s,E)
+            target = (
+                f"(s,{encoding})" if attribute.startswith("(scale") else str(encoding)
+            )
+            if excluded is None:
+                facts.append(f"excluded({attribute},{target}).")
+            else:
+                facts.append(f"excluded({attribute},{target},{excluded}).")
+    return facts
@@ -1,15 +1,111 @@
+import hashlib
+import json
 from collections import defaultdict
-from typing import DefaultDict
-
+from contextlib import aclosing, closing
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+)
+
+import numpy as np
+
+import draco.profiling as profiling
 import draco.programs as programs
 from draco.asp_utils import blocks_to_program, parse_blocks
-from draco.run import is_satisfiable, run_clingo
+from draco.batch import check_batch, count_batch
+from draco.canonical import fingerprint
+from draco.program_cache import ProgramCache, default_program_cache
+from draco.result_cache import ResultCache
+from draco.run import (
+    PARALLEL_MODES,
+    Budget,
+    Model,
+    PreparedProgram,
+    ProgramPart,
+    run_clingo,
+    run_clingo_async,
+)
 from draco.types import Specification
 from draco.weights import Weights, assign_program
 from draco.weights import weights as draco_weights
 
 Program = programs.Program
 
+# marks a lookup of a result cache that found nothing, since None is a result
+_missing = object()
+
+# the attributes of a `Draco` instance that the results of its calls depend on
+_CONFIGURATION = (
+    "define",
+    "generate",
+    "constraints",
+    "helpers",
+    "hard",
+    "soft",
+    "optimize",
+    "weights",
+)
+
+
+def _to_program(spec: Specification) -> str:
+    return spec if isinstance(spec, str) else "\n".join(spec)
+
+
+def _spec_key(text: str) -> Hashable:
+    """The fingerprint of a spec, or its text if it cannot be parsed."""
+    try:
+        return fingerprint(text)
+    except RuntimeError:
+        return (text,)
+
+
+def _deduplicate(texts: list[str]) -> tuple[list[str], np.ndarray]:
+    """Group specs with the same fingerprint, so that only one of them is solved.
+
+    :return: The first spec of every group, and the index of the group of
+        every spec.
+    """
+    groups: dict[Hashable, int] = {}
+    keys: dict[str, Hashable] = {}
+    unique: list[str] = []
+    inverse = np.empty(len(texts), dtype=np.intp)
+    for index, text in enumerate(texts):
+        # fingerprinting costs more than a lookup of the exact text
+        key = keys.get(text)
+        if key is None:
+            key = keys[text] = _spec_key(text)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = len(unique)
+            unique.append(text)
+        inverse[index] = group
+    return unique, inverse
+
+
+def _violations(model: Model | None) -> list[str] | None:
+    # None distinguishes unsatisfiable programs from satisfiable programs
+    # where you would expect violations to be []
+    if model is None:
+        return None
+    return [
+        symbol.arguments[0].name
+        for symbol in model.answer_set
+        if symbol.name == "violation"
+    ]
+
+
+def _is_model(model: Model | None) -> bool:
+    return model is not None
+
+
+def _preference_counts(model: Model | None) -> dict[str, int] | None:
+    return None if model is None else model.preference_counts
+
 
 class Draco:
     """A class for holding all the programs used by Draco."""
@@ -24,6 +120,12 @@ class Draco:
         soft: Program | str = programs.soft,
         optimize: Program | str = programs.optimize,
         weights: Weights | dict = draco_weights,
+        prepare: bool = True,
+        program_cache: ProgramCache | None = None,
+        solver_threads: int = 1,
+        parallel_mode: str = "compete",
+        result_cache: ResultCache | None = None,
+        statistics: bool = False,
     ):
         """Create a Draco helper class. If no programs are passed in, the default
         Draco programs are used.
@@ -38,6 +140,27 @@ class Draco:
             :param optimize: The program for optimizing soft constraints.
             :param weights: The program for assigning weights to soft
                 constraints.
+            :param prepare: Whether to parse the knowledge base once and reuse
+                the parsed statements across calls instead of parsing the
+                program text on every call.
+            :param program_cache: The cache holding the parsed knowledge base.
+                Defaults to a cache shared by all Draco instances, so that
+                instances with the same programs parse them only once.
+            :param solver_threads: The number of threads to search for
+                completions with. The other methods solve problems that are too
+                easy to benefit from more threads.
+            :param parallel_mode: How the solver threads work together, either
+                ``"compete"`` or ``"split"``, see ``run_clingo``.
+            :param result_cache: The cache for the results of ``check_spec``,
+                ``complete_spec`` and ``count_preferences``, so that calls with
+                the same spec and arguments do not solve again. Defaults to None,
+                meaning that results are not cached. A cache can be shared by
+                instances, since the programs and weights are part of the key.
+            :param statistics: Whether every call collects its statistics, see
+                ``draco.profiling``. The completions of ``complete_spec`` then
+                hold them as ``Model.statistics``. Defaults to False, meaning
+                that calls only collect statistics while a ``profile`` block or
+                callback is active.
             :param soft_constraint_names: The names of the soft constraints
                 which can be used as features for ML.
         """
@@ -56,6 +179,20 @@ class Draco:
         self.soft = to_string(soft)
         self.optimize = to_string(optimize)
         self.weights = weights.weights if isinstance(weights, Weights) else weights
+        self.prepare = prepare
+        self.program_cache = (
+            default_program_cache if program_cache is None else program_cache
+        )
+
+        if solver_threads < 1:
+            raise ValueError("The solver needs at least one thread.")
+        if parallel_mode not in PARALLEL_MODES:
+            raise ValueError(f"The parallel mode must be one of {PARALLEL_MODES}.")
+        self.solver_threads = solver_threads
+        self.parallel_mode = parallel_mode
+        self.result_cache = result_cache
+        self.statistics = statistics
+        self._configuration: tuple[tuple, str] = ((), "")
 
         constraints_blocks = (
             constraints.blocks
@@ -87,6 +224,182 @@ class Draco:
                 "Weights dictionary does not match soft constraints"
             )
 
+    def _knowledge_base(self, *programs: str) -> list[ProgramPart]:
+        """Get the spec-independent part of a program. If ``prepare`` is set, the
+        programs are parsed on first use and the parsed statements are reused.
+        """
+        if not self.prepare:
+            return list(programs)
+
+        return self.program_cache.get(programs)
+
+    def _batch_knowledge_base(self, *programs: str) -> PreparedProgram | None:
+        """Get the spec-independent part of a program prepared for solving many
+        specs at once, or None if the programs cannot be solved in a batch.
+        """
+        prepared = self.program_cache.get(programs, batch=True)
+        if len(prepared) == 1 and isinstance(prepared[0], PreparedProgram):
+            return prepared[0]
+        return None
+
+    def _check_program(self, spec: Specification) -> list[ProgramPart]:
+        """The program to check a spec against the hard constraints."""
+        return self._knowledge_base(
+            self.define, self.constraints, self.helpers, self.hard
+        ) + [_to_program(spec)]
+
+    def _complete_program(self, spec: Specification) -> list[ProgramPart]:
+        """The program to complete a partial spec."""
+        return self._knowledge_base(
+            self.define,
+            self.generate,
+            self.constraints,
+            self.helpers,
+            self.hard,
+            self.soft,
+            self.assign_weights,
+            self.optimize,
+        ) + [_to_program(spec)]
+
+    def _weight_arguments(self) -> list[str]:
+        """The clingo arguments that pass the weights as constants."""
+        return [f"-c {w}={v}" for w, v in self.weights.items()]
+
+    def _count_program(self, spec: Specification) -> list[ProgramPart]:
+        """The program to count the preferences a spec violates."""
+        return self._knowledge_base(
+            self.define, self.constraints, self.helpers, self.soft
+        ) + [_to_program(spec)]
+
+    def _violations_program(self, spec: Specification) -> list[ProgramPart]:
+        """The program to list the violations of a spec."""
+        return self._knowledge_base(
+            self.define,
+            self.constraints_no_violation,
+            self.helpers,
+            self.hard,
+        ) + [_to_program(spec)]
+
+    def _solve_first(
+        self,
+        method: str,
+        program: Callable[[], list[ProgramPart]],
+        decode: Callable[[Model | None], Any],
+    ) -> Any:
+        """Solve for the first model of a program and decode it into the result
+        of a method, collecting the statistics of the call if enabled.
+
+        :param method: The name of the method, for the statistics.
+        :param program: Builds the program to solve.
+        :param decode: Turns the first model, or None if there is none, into
+            the result.
+        """
+        statistics = profiling.start(method, self.statistics)
+        if statistics is None:
+            with closing(run_clingo(program(), 1)) as models:
+                return decode(next(models, None))
+
+        with statistics.phase("build"):
+            parts = program()
+        with closing(run_clingo(parts, 1, statistics=statistics)) as models:
+            model = next(models, None)
+        with statistics.phase("decode"):
+            result = decode(model)
+        profiling.report(statistics)
+        return result
+
+    def _complete(
+        self, spec: Specification, models: int, budget: Budget | None
+    ) -> Iterator[Model]:
+        """Solve for the completions of a spec, collecting the statistics of the
+        call if enabled."""
+        statistics = profiling.start("complete_spec", self.statistics)
+        if statistics is None:
+            return run_clingo(
+                self._complete_program(spec),
+                models,
+                True,
+                self._weight_arguments(),
+                budget,
+                self.solver_threads,
+                self.parallel_mode,
+            )
+
+        with statistics.phase("build"):
+            program = self._complete_program(spec)
+            arguments = self._weight_arguments()
+        completions = run_clingo(
+            program,
+            models,
+            True,
+            arguments,
+            budget,
+            self.solver_threads,
+            self.parallel_mode,
+            statistics,
+        )
+        return profiling.reported(completions, statistics)
+
+    @property
+    def configuration_hash(self) -> str:
+        """The hex digest of the programs and weights, which identifies the
+        configuration that the results of calls depend on. It is only computed
+        again once the programs or weights change."""
+        # comparing the unchanged programs is cheap as they are the same objects
+        values = tuple(
+            dict(value) if isinstance(value, dict) else value
+            for value in (getattr(self, name) for name in _CONFIGURATION)
+        )
+        if values != self._configuration[0]:
+            digest = hashlib.blake2b(digest_size=16)
+            for value in values:
+                text = (
+                    json.dumps(value, sort_keys=True)
+                    if isinstance(value, dict)
+                    else value
+                )
+                digest.update(text.encode())
+                digest.update(b"\0")
+            self._configuration = (values, digest.hexdigest())
+        return self._configuration[1]
+
+    def _result_key(self, method: str, spec: Hashable, *arguments) -> Hashable:
+        """The key of the result of a call in the result cache.
+
+        :param spec: The text of the spec, or its key from ``_spec_key`` for
+            methods whose results do not contain entity ids.
+        """
+        return (method, self.configuration_hash, spec, *arguments)
+
+    def _cached(self, compute: Callable[[], Any], key: Hashable) -> Any:
+        """Look up the result of a call in the result cache, or compute and
+        store it if there is none."""
+        if self.result_cache is None:
+            return compute()
+
+        result = self.result_cache.get(key, _missing)
+        if result is _missing:
+            result = compute()
+            self.result_cache.put(key, result)
+        return result
+
+    def invalidate_results(self, spec: Specification | None = None) -> int:
+        """Drop results from the result cache.
+
+        :param spec: Only drop the results for this specification. Defaults to
+            dropping all results.
+        :return: The number of dropped results.
+        """
+        if self.result_cache is None:
+            return 0
+        if spec is None:
+            return self.result_cache.invalidate()
+
+        text = _to_program(spec)
+        return self.result_cache.invalidate(text) + self.result_cache.invalidate(
+            _spec_key(text)
+        )
+
     def check_spec(self, spec: Specification) -> bool:
         """Checks the spec against the hard constraints.
 
@@ -95,38 +408,65 @@ class Draco:
 
         :param spec: The specification to check
         """
-        if not isinstance(spec, str):
-            spec = "\n".join(spec)
+        # the spec is read twice, so iterators such as generators are joined
+        spec = _to_program(spec)
+        return self._cached(
+            lambda: self._solve_first(
+                "check_spec", lambda: self._check_program(spec), _is_model
+            ),
+            self._result_key("check_spec", _spec_key(spec)),
+        )
+
+    def check_specs(
+        self, specs: Iterable[Specification], chunk_size: int = 1000
+    ) -> list[bool]:
+        """Checks many specs against the hard constraints. The result is the same
+        as calling ``check_spec`` for every spec, but the specs are grounded and
+        solved together in chunks, which is much faster for large collections.
+        Specs with the same fingerprint (see ``draco.fingerprint``) are only
+        checked once.
+
+        :param specs: The specifications to check
+        :param chunk_size: The maximum number of specs to ground at once
+        :return: Whether each spec is valid, in the order of the input
+        """
+        texts, inverse = _deduplicate(list(map(_to_program, specs)))
+
+        program = self._batch_knowledge_base(
+            self.define, self.constraints, self.helpers, self.hard
+        )
 
-        program = [self.define, self.constraints, self.helpers, self.hard, spec]
+        result: list[bool] = []
+        for start in range(0, len(texts), chunk_size):
+            chunk = texts[start : start + chunk_size]
+            result.extend(check_batch(program, chunk, self.check_spec))
 
-        return is_satisfiable(program)
+        return [result[group] for group in inverse]
 
-    def complete_spec(self, spec: Specification, models=1):
+    def complete_spec(
+        self, spec: Specification, models=1, budget: Budget | None = None
+    ):
         """Get optimal completions for the partial input specification.
 
         :param spec: The partial specification to complete.
         :param models: The number of completions to return, defaults to 1
+        :param budget: Limits for the search, defaults to no limits. If a limit
+            is reached, the best completions found so far are returned instead,
+            with ``optimality_proven`` set to false. Calls with a budget are not
+            cached, as their results depend on the time they take.
         """
-        if not isinstance(spec, str):
-            spec = "\n".join(spec)
-
-        program = [
-            self.define,
-            self.generate,
-            self.constraints,
-            self.helpers,
-            self.hard,
-            self.soft,
-            self.assign_weights,
-            self.optimize,
-            spec,
-        ]
+        spec = _to_program(spec)
 
-        # pass the weights as constraint to Clingo
-        args = [f"-c {w}={v}" for w, v in self.weights.items()]
+        if self.result_cache is None or budget is not None:
+            return self._complete(spec, models, budget)
 
-        return run_clingo(program, models, True, args)
+        # the completions are cached as a whole, so they are solved up front
+        return iter(
+            self._cached(
+                lambda: tuple(self._complete(spec, models, budget)),
+                self._result_key("complete_spec", spec, models),
+            )
+        )
 
     def count_preferences(self, spec: Specification):
         """Get a dictionary from preferences to show how often a given specification
@@ -137,23 +477,52 @@ class Draco:
 
         :param spec: The specification to check
         """
-        if not isinstance(spec, str):
-            spec = "\n".join(spec)
+        spec = _to_program(spec)
 
-        program = [self.define, self.constraints, self.helpers, self.soft, spec]
-
-        try:
-            result: DefaultDict[str, int] = defaultdict(int)
+        def count() -> dict[str, int] | None:
+            return self._solve_first(
+                "count_preferences",
+                lambda: self._count_program(spec),
+                _preference_counts,
+            )
 
-            model = next(run_clingo(program, 1))
+        key = self._result_key("count_preferences", _spec_key(spec))
+        counts = self._cached(count, key)
+        return None if counts is None else defaultdict(int, counts)
+
+    def count_preferences_batch(
+        self, specs: Iterable[Specification], chunk_size: int = 1000
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Count how often each spec violates each preference. The counts are the
+        same as from ``count_preferences``, but the specs are grounded and solved
+        together in chunks, which is much faster for large collections. Specs with
+        the same fingerprint (see ``draco.fingerprint``) are only counted once.
+
+        :param specs: The specifications to check
+        :param chunk_size: The maximum number of specs to ground at once
+        :return: An integer matrix with a row per spec and a column per name in
+            ``soft_constraint_names``, and a boolean mask of the specs that are not
+            satisfiable (for which ``count_preferences`` returns None). The rows
+            of unsatisfiable specs are all zero.
+        """
+        texts, inverse = _deduplicate(list(map(_to_program, specs)))
+        program = self._batch_knowledge_base(
+            self.define, self.constraints, self.helpers, self.soft
+        )
 
-            for symbol in model.answer_set:
-                if symbol.name == "preference":
-                    result[symbol.arguments[0].name] += 1
+        counts = [np.zeros((0, len(self.soft_constraint_names)), dtype=np.int64)]
+        unsatisfiable = [np.zeros(0, dtype=bool)]
+        for start in range(0, len(texts), chunk_size):
+            chunk_counts, chunk_unsatisfiable = count_batch(
+                program,
+                texts[start : start + chunk_size],
+                self.soft_constraint_names,
+                self.count_preferences,
+            )
+            counts.append(chunk_counts)
+            unsatisfiable.append(chunk_unsatisfiable)
 
-            return result
-        except StopIteration:
-            return None
+        return np.concatenate(counts)[inverse], np.concatenate(unsatisfiable)[inverse]
 
     def get_violations(self, spec: Specification):
         """Get the list of violations for a given specification. Returns None if the
@@ -164,26 +533,159 @@ class Draco:
 
         :param spec: The specification to check
         """
-        if not isinstance(spec, str):
-            spec = "\n".join(spec)
+        return self._solve_first(
+            "get_violations", lambda: self._violations_program(spec), _violations
+        )
 
-        program = [
-            self.define,
-            self.constraints_no_violation,
-            self.helpers,
-            self.hard,
-            spec,
-        ]
-
-        try:
-            model = next(run_clingo(program, 1))
-
-            return [
-                symbol.arguments[0].name
-                for symbol in model.answer_set
-                if symbol.name == "violation"
-            ]
-        except StopIteration:
-            # Since the problem is not satisfiable, we return None to distinguish it
-            # from satisfiable programs where you would expect violations to be []
-            return None
+
+class AsyncDraco:
+    """
+    Asyncio counterpart of :code:`Draco`. The methods return the same results as
+    those of the wrapped :code:`Draco` instance but never block the event loop,
+    so that a single thread can keep many solves in flight.
+    """
+
+    def __init__(self, draco: Draco | None = None):
+        """
+        :param draco: The :code:`Draco` instance whose programs to use.
+            Defaults to a :code:`Draco` instance with the default programs.
+        """
+        self.draco = Draco() if draco is None else draco
+
+    async def _cached(self, compute: Callable[[], Awaitable[Any]], key: Hashable):
+        """Look up the result of a call in the result cache of the wrapped
+        instance, see ``Draco._cached``."""
+        cache = self.draco.result_cache
+        if cache is None:
+            return await compute()
+
+        result = cache.get(key, _missing)
+        if result is _missing:
+            result = await compute()
+            cache.put(key, result)
+        return result
+
+    async def _solve_first(
+        self,
+        method: str,
+        program: Callable[[], list[ProgramPart]],
+        decode: Callable[[Model | None], Any],
+    ) -> Any:
+        """Solve for the first model of a program and decode it, see
+        ``Draco._solve_first``."""
+        statistics = profiling.start(method, self.draco.statistics)
+        if statistics is None:
+            async with aclosing(run_clingo_async(program(), 1)) as models:
+                return decode(await anext(models, None))
+
+        with statistics.phase("build"):
+            parts = program()
+        async with aclosing(
+            run_clingo_async(parts, 1, statistics=statistics)
+        ) as models:
+            model = await anext(models, None)
+        with statistics.phase("decode"):
+            result = decode(model)
+        profiling.report(statistics)
+        return result
+
+    def _complete(
+        self, spec: Specification, models: int, budget: Budget | None
+    ) -> AsyncGenerator[Model, None]:
+        """Solve for the completions of a spec, see ``Draco._complete``."""
+        draco = self.draco
+        statistics = profiling.start("complete_spec", draco.statistics)
+        if statistics is None:
+            return run_clingo_async(
+                draco._complete_program(spec),
+                models,
+                True,
+                draco._weight_arguments(),
+                budget,
+                draco.solver_threads,
+                draco.parallel_mode,
+            )
+
+        with statistics.phase("build"):
+            program = draco._complete_program(spec)
+            arguments = draco._weight_arguments()
+        completions = run_clingo_async(
+            program,
+            models,
+            True,
+            arguments,
+            budget,
+            draco.solver_threads,
+            draco.parallel_mode,
+            statistics,
+        )
+        return profiling.reported_async(completions, statistics)
+
+    async def check_spec(self, spec: Specification) -> bool:
+        """Checks the spec against the hard constraints, see ``Draco.check_spec``.
+
+        :param spec: The specification to check
+        """
+        spec = _to_program(spec)
+        return await self._cached(
+            lambda: self._solve_first(
+                "check_spec", lambda: self.draco._check_program(spec), _is_model
+            ),
+            self.draco._result_key("check_spec", _spec_key(spec)),
+        )
+
+    def complete_spec(
+        self, spec: Specification, models=1, budget: Budget | None = None
+    ) -> AsyncGenerator[Model, None]:
+        """Get optimal completions for the partial input specification, see
+        ``Draco.complete_spec``. Closing the returned generator cancels the solve.
+
+        :param spec: The partial specification to complete.
+        :param models: The number of completions to return, defaults to 1
+        :param budget: Limits for the search, defaults to no limits.
+        """
+        spec = _to_program(spec)
+
+        if self.draco.result_cache is None or budget is not None:
+            return self._complete(spec, models, budget)
+
+        async def collect() -> tuple[Model, ...]:
+            async with aclosing(self._complete(spec, models, budget)) as completions:
+                return tuple([model async for model in completions])
+
+        async def cached() -> AsyncGenerator[Model, None]:
+            key = self.draco._result_key("complete_spec", spec, models)
+            for model in await self._cached(collect, key):
+                yield model
+
+        return cached()
+
+    async def count_preferences(self, spec: Specification):
+        """Get a dictionary from preferences to show how often a given specification
+        violates the preference, see ``Draco.count_preferences``. Returns None if
+        the problem is not satisfiable.
+
+        :param spec: The specification to check
+        """
+        spec = _to_program(spec)
+
+        async def count() -> dict[str, int] | None:
+            return await self._solve_first(
+                "count_preferences",
+                lambda: self.draco._count_program(spec),
+                _preference_counts,
+            )
+
+        key = self.draco._result_key("count_preferences", _spec_key(spec))
+        counts = await self._cached(count, key)
+        return None if counts is None else defaultdict(int, counts)
+
+    async def get_violations(self, spec: Specification):
+        """Get the list of violations for a given specification, see
+        ``Draco.get_violations``. Returns None if the problem is not satisfiable.
+
+        :param spec: The specification to check
+        """
+        return await self._solve_first(
+            "get_violations", lambda: self.draco._violations_program(spec), _violations
+        )
@@ -1,7 +1,7 @@
 import itertools
 from collections import defaultdict
 from enum import Enum, unique
-from typing import Generator, Iterable, Iterator, Mapping
+from typing import Any, Generator, Iterable, Iterator, Mapping
 
 from clingo import Symbol
 from clingo.symbol import SymbolType
@@ -132,19 +132,37 @@ def collect_children(name: str, collector: dict):
     return out
 
 
-def answer_set_to_dict(answer_set: Iterable[Symbol], root=ROOT) -> Mapping:
-    """A generic decoder that converts an answer set into a nested data structure.
-    The inverse of this function is :code:`dict_to_facts`.
-    """
+def decode_fact(symbol: Symbol) -> tuple[str, Any, Any, Any] | None:
+    """Decode an attribute or entity fact into its kind, property, object, and
+    value (the child for entities). Other symbols decode to None."""
+    if symbol.match("attribute", 3) or symbol.match("entity", 3):
+        prop, obj, value = map(get_value, symbol.arguments)
+        return symbol.name, prop, obj, value
+    return None
+
+
+def decoded_facts_to_dict(
+    facts: Iterable[tuple[str, Any, Any, Any] | None], root=ROOT
+) -> Mapping:
+    """Convert facts decoded by :code:`decode_fact` into a nested data structure,
+    see :code:`answer_set_to_dict`."""
 
     collector: dict = defaultdict(dict)
 
-    for symbol in answer_set:
-        if symbol.match("attribute", 3):
-            prop, obj, val = map(get_value, symbol.arguments)
-            collector[obj][prop] = val
-        elif symbol.match("entity", 3):
-            prop, obj, child = map(get_value, symbol.arguments)
-            collector[obj][prop] = collector[obj].get(prop, []) + [child]
+    for fact in facts:
+        if fact is None:
+            continue
+        kind, prop, obj, value = fact
+        if kind == "attribute":
+            collector[obj][prop] = value
+        else:
+            collector[obj][prop] = collector[obj].get(prop, []) + [value]
 
     return collect_children(root, collector)
+
+
+def answer_set_to_dict(answer_set: Iterable[Symbol], root=ROOT) -> Mapping:
+    """A generic decoder that converts an answer set into a nested data structure.
+    The inverse of this function is :code:`dict_to_facts`.
+    """
+    return decoded_facts_to_dict(map(decode_fact, answer_set), root)
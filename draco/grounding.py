@@ -0,0 +1,514 @@
+"""
+Attribution of the size of ground programs to the blocks of the knowledge base,
+to find the blocks that blow up grounding, and a regression check against a
+baseline. Run :code:`python -m draco.grounding --help` for the command line.
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Mapping, Sequence
+
+import clingo
+from clingo.ast import AST, ASTType, parse_string
+
+from draco.asp_utils import Block, parse_blocks
+from draco.draco import Draco
+from draco.programs import asp_path
+from draco.types import Specification
+
+# the programs that are grounded, which are the ones of `Draco.complete_spec`
+# without the weights and optimization statements
+PROGRAMS = ("define", "generate", "constraints", "helpers", "hard", "soft")
+
+# the checked-in corpus of specs, which are the examples and the larger specs
+# in the `grounding` directory, and the grounding sizes of their blocks
+corpus_path = asp_path / "examples"
+baseline_path = corpus_path / "grounding_baseline.json"
+
+# the directories of specs that take the longest to ground, which the command
+# line only grounds with `--large`
+LARGE = "large"
+
+# the name of the statements of a program that are not in a block
+PREAMBLE = "__preamble__"
+
+# A predicate as its name and arity, with the text of its first argument if
+# that is known, as Draco uses the first argument to tell apart helpers,
+# attributes, violations, and preferences. None matches any first argument.
+_Key = tuple[str, int, str | None]
+
+
+@dataclass(frozen=True)
+class GroundingSize:
+    """Class for the size of (a part of) a ground program.
+
+    Attributes:
+        :rules: The number of ground rules, including facts and choice rules.
+        :atoms: The number of distinct atoms in the heads of the rules.
+    """
+
+    rules: int
+    atoms: int
+
+
+@dataclass(frozen=True)
+class GroundingReport:
+    """Class for the size of the ground program of a spec.
+
+    Attributes:
+        :total: The size of the whole ground program.
+        :blocks: The size of the ground rules of each block, keyed by the name
+            of the program and block, such as ``"hard:log_non_positive"``.
+    """
+
+    total: GroundingSize
+    blocks: dict[str, GroundingSize]
+
+
+@dataclass(frozen=True)
+class BlockChange:
+    """Class for a change of the grounding size of a block.
+
+    Attributes:
+        :spec: The name of the spec.
+        :block: The name of the block.
+        :before: The size in the baseline, None if the block is new.
+        :after: The current size, None if the block was removed.
+    """
+
+    spec: str
+    block: str
+    before: GroundingSize | None
+    after: GroundingSize | None
+
+    @property
+    def rules(self) -> int:
+        """The change of the number of ground rules."""
+        before = 0 if self.before is None else self.before.rules
+        after = 0 if self.after is None else self.after.rules
+        return after - before
+
+
+@dataclass(frozen=True)
+class _Statements:
+    """The statements of a block with the predicates they define and use."""
+
+    program: str
+    heads: frozenset[_Key]
+    bodies: frozenset[_Key]
+
+
+class _Counter(clingo.backend.Observer):
+    """Counts the ground rules and head atoms passed to the solver."""
+
+    def __init__(self):
+        self.counting = True
+        self.rules = 0
+        self.atoms: set[int] = set()
+
+    def rule(self, choice: bool, head: Sequence[int], body: Sequence[int]):
+        if self.counting:
+            self.rules += 1
+            self.atoms.update(head)
+
+    def weight_rule(
+        self,
+        choice: bool,
+        head: Sequence[int],
+        lower_bound: int,
+        body: Sequence[tuple[int, int]],
+    ):
+        self.rule(choice, head, [])
+
+    def size(self) -> GroundingSize:
+        return GroundingSize(self.rules, len(self.atoms))
+
+
+def _silent(code: clingo.MessageCode, message: str):
+    pass
+
+
+def _key(atom: AST) -> _Key | None:
+    """The key of a symbolic atom, or None for atoms without a name."""
+    symbol = atom.symbol
+    if symbol.ast_type == ASTType.UnaryOperation:
+        symbol = symbol.argument
+    if symbol.ast_type != ASTType.Function or not symbol.name:
+        return None
+
+    first = None
+    if symbol.arguments:
+        text = str(symbol.arguments[0])
+        # pools and variables match more than one argument
+        if ";" not in text and not _has_variable(symbol.arguments[0]):
+            first = text
+    return (symbol.name, len(symbol.arguments), first)
+
+
+def _has_variable(node: AST) -> bool:
+    if node.ast_type == ASTType.Variable:
+        return True
+    return any(_has_variable(child) for child in _children(node))
+
+
+def _children(node: AST) -> Iterable[AST]:
+    for name in node.child_keys:
+        child = getattr(node, name)
+        if isinstance(child, AST):
+            yield child
+        elif child is not None:
+            yield from child
+
+
+def _atoms(node: AST, head: bool, heads: set[_Key], bodies: set[_Key]):
+    """Collect the keys of the atoms in the head and in the body of a rule.
+    The conditions of conditional literals in the head belong to the body."""
+    if node.ast_type == ASTType.SymbolicAtom:
+        key = _key(node)
+        if key is not None:
+            (heads if head else bodies).add(key)
+        return
+    if head and node.ast_type == ASTType.ConditionalLiteral:
+        _atoms(node.literal, True, heads, bodies)
+        for literal in node.condition:
+            _atoms(literal, False, heads, bodies)
+        return
+    for child in _children(node):
+        _atoms(child, head, heads, bodies)
+
+
+def _block_statements(
+    text: str, constants: list[str]
+) -> tuple[list[str], set[_Key], set[_Key]]:
+    """Split the statements of a block into rules and constant definitions,
+    and collect the keys of the predicates the rules define and use."""
+    rules: list[str] = []
+    heads: set[_Key] = set()
+    bodies: set[_Key] = set()
+
+    def add(statement: AST):
+        if statement.ast_type == ASTType.Definition:
+            constants.append(str(statement))
+        elif statement.ast_type in (ASTType.Rule, ASTType.Minimize):
+            rules.append(str(statement))
+            if statement.ast_type == ASTType.Rule:
+                _atoms(statement.head, True, heads, bodies)
+            for literal in statement.body:
+                _atoms(literal, False, heads, bodies)
+
+    parse_string(text, add, logger=_silent)
+    return rules, heads, bodies
+
+
+def _blocks(draco: Draco, programs: Iterable[str]) -> tuple[dict, list[str]]:
+    """The statements of every block of the programs, keyed by
+    ``program:block``, and the constant definitions of all programs."""
+    constants: list[str] = []
+    blocks: dict[str, _Statements] = {}
+    for name in programs:
+        for block, content in parse_blocks(getattr(draco, name)).items():
+            text = content.program if isinstance(content, Block) else content
+            rules, heads, bodies = _block_statements(text, constants)
+            if rules:
+                blocks[f"{name}:{block or PREAMBLE}"] = _Statements(
+                    "\n".join(rules), frozenset(heads), frozenset(bodies)
+                )
+    return blocks, constants
+
+
+def _matches(keys: frozenset[_Key], name: str, arity: int, first: str | None):
+    return (name, arity, None) in keys or (
+        first is not None and (name, arity, first) in keys
+    )
+
+
+def ground_blocks(
+    spec: Specification,
+    draco: Draco | None = None,
+    programs: Iterable[str] = PROGRAMS,
+) -> GroundingReport:
+    """Ground a spec with the knowledge base and attribute the ground rules to
+    the blocks of the knowledge base.
+
+    Every block is grounded on its own, with the atoms of the whole ground
+    program that the block uses as its input. Atoms that are facts in the whole
+    program are facts, the others may or may not hold. The atoms the block
+    defines itself are left out, so that it derives them again. The sizes of
+    the blocks therefore add up to about the size of the whole ground program.
+
+    :param spec: The specification to ground.
+    :param draco: The ``Draco`` instance with the programs. Defaults to the
+        default programs.
+    :param programs: The names of the programs of the ``Draco`` instance to
+        ground, defaults to ``PROGRAMS``.
+    :return: The size of the whole ground program and of every block.
+    """
+    draco = Draco() if draco is None else draco
+    blocks, constants = _blocks(draco, programs)
+    spec_text = spec if isinstance(spec, str) else "\n".join(spec)
+    statements = "\n".join(constants)
+
+    counter = _Counter()
+    ctl = clingo.Control(logger=_silent)
+    ctl.register_observer(counter)
+    ctl.add(
+        "base",
+        [],
+        "\n".join(
+            [statements, spec_text, *(block.program for block in blocks.values())]
+        ),
+    )
+    ctl.ground([("base", [])])
+    total = counter.size()
+
+    # the atoms of the whole program by name, arity, and first argument
+    domain: dict[tuple[str, int], dict[str | None, list[str]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    for atom in ctl.symbolic_atoms:
+        symbol = atom.symbol
+        if symbol.type != clingo.SymbolType.Function or not symbol.name:
+            continue
+        arguments = symbol.arguments
+        first = str(arguments[0]) if arguments else None
+        text = f"{symbol}." if atom.is_fact else f"#external {symbol}."
+        domain[(symbol.name, len(arguments))][first].append(text)
+
+    sizes: dict[str, GroundingSize] = {}
+    for name, block in blocks.items():
+        inputs: list[str] = []
+        for key in block.bodies:
+            for first, atoms in domain.get(key[:2], {}).items():
+                if (key[2] is None or key[2] == first) and not _matches(
+                    block.heads, key[0], key[1], first
+                ):
+                    inputs.extend(atoms)
+
+        counter = _Counter()
+        counter.counting = False
+        ctl = clingo.Control(logger=_silent)
+        ctl.register_observer(counter)
+        ctl.add("inputs", [], "\n".join(dict.fromkeys(inputs)))
+        ctl.add("block", [], f"{statements}\n{block.program}")
+        ctl.ground([("inputs", [])])
+        counter.counting = True
+        ctl.ground([("block", [])])
+        sizes[name] = counter.size()
+
+    return GroundingReport(total, sizes)
+
+
+def read_corpus(path: Path = corpus_path, large: bool = True) -> dict[str, str]:
+    """Read the specs of a corpus.
+
+    :param path: A directory with ``.lp`` files, which are also read from its
+        subdirectories, or a single file. Defaults to the corpus that ships
+        with Draco.
+    :param large: Whether to read the specs in ``large`` subdirectories.
+    :return: The specs keyed by the names of their files without extension.
+    """
+    files = [path] if path.is_file() else sorted(path.rglob("*.lp"))
+    return {
+        file.stem: file.read_text()
+        for file in files
+        if large or LARGE not in file.relative_to(path).parts[:-1]
+    }
+
+
+def ground_corpus(
+    specs: Mapping[str, Specification], draco: Draco | None = None
+) -> dict[str, GroundingReport]:
+    """Attribute the ground rules of every spec of a corpus to the blocks of the
+    knowledge base, see ``ground_blocks``.
+
+    :param specs: The specs keyed by their names.
+    :param draco: The ``Draco`` instance with the programs.
+    :return: The reports keyed by the names of the specs.
+    """
+    draco = Draco() if draco is None else draco
+    return {name: ground_blocks(spec, draco) for name, spec in specs.items()}
+
+
+def _size_to_json(size: GroundingSize) -> list[int]:
+    return [size.rules, size.atoms]
+
+
+def save_baseline(reports: Mapping[str, GroundingReport], path: Path = baseline_path):
+    """Write the grounding sizes of a corpus to a baseline file.
+
+    :param reports: The reports keyed by the names of the specs.
+    :param path: The file to write, defaults to the baseline of the corpus that
+        ships with Draco.
+    """
+    baseline = {
+        name: {
+            "total": _size_to_json(report.total),
+            "blocks": {
+                block: _size_to_json(size)
+                for block, size in sorted(report.blocks.items())
+            },
+        }
+        for name, report in sorted(reports.items())
+    }
+    path.write_text(json.dumps(baseline, indent=1) + "\n")
+
+
+def load_baseline(path: Path = baseline_path) -> dict[str, GroundingReport]:
+    """Read the grounding sizes of a corpus from a baseline file.
+
+    :param path: The file to read, defaults to the baseline of the corpus that
+        ships with Draco.
+    :return: The reports keyed by the names of the specs.
+    """
+    baseline = json.loads(path.read_text())
+    return {
+        name: GroundingReport(
+            GroundingSize(*report["total"]),
+            {block: GroundingSize(*size) for block, size in report["blocks"].items()},
+        )
+        for name, report in baseline.items()
+    }
+
+
+def compare(
+    baseline: Mapping[str, GroundingReport], reports: Mapping[str, GroundingReport]
+) -> list[BlockChange]:
+    """Find the blocks whose grounding size changed from a baseline.
+
+    :param baseline: The reports of the baseline keyed by the names of specs.
+    :param reports: The current reports. Only specs in both are compared.
+    :return: The changed blocks, the ones that grew the most first.
+    """
+    changes = []
+    for spec in baseline.keys() & reports.keys():
+        before, after = baseline[spec].blocks, reports[spec].blocks
+        for block in sorted(before.keys() | after.keys()):
+            change = BlockChange(spec, block, before.get(block), after.get(block))
+            if change.before != change.after:
+                changes.append(change)
+    return sorted(changes, key=lambda change: (-change.rules, change.spec))
+
+
+def _format_size(size: GroundingSize | None) -> str:
+    return "-" if size is None else f"{size.rules} rules, {size.atoms} atoms"
+
+
+class GroundingArgs(argparse.Namespace):
+    """Namespace for the CLI arguments expected from the user."""
+
+    corpus: Path
+    baseline: Path
+    update: bool
+    tolerance: float
+    large: bool
+    top: int
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    """
+    Create an argument parser for the grounding size CLI.
+
+    :return: the argument parser used to collect arguments from the user.
+    """
+    parser = argparse.ArgumentParser(
+        description="Attribute the size of ground programs to the blocks of the "
+        "Draco knowledge base and compare them against a baseline.",
+        usage="python -m draco.grounding [options]",
+    )
+    parser.add_argument(
+        "--corpus",
+        type=Path,
+        default=corpus_path,
+        help="Directory of .lp specs, or a single spec. Defaults to the corpus "
+        "that ships with Draco.",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=baseline_path,
+        help="Baseline file to compare against. Defaults to the baseline of the "
+        "corpus that ships with Draco.",
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Write the current sizes to the baseline instead of comparing.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.01,
+        help="Relative growth of the ground rules of a block that is not a "
+        "regression. Defaults to 0.01, so that changes of the knowledge base "
+        "that add a few rules do not need a new baseline.",
+    )
+    parser.add_argument(
+        "--large",
+        action="store_true",
+        help="Also ground the specs in large directories of the corpus, which "
+        "take the longest.",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of largest blocks to show per spec. Defaults to 10.",
+    )
+    return parser
+
+
+def main(args: Sequence[str] | None = None) -> int:
+    """
+    Print the largest blocks of every spec of a corpus and compare the sizes
+    against the baseline.
+
+    :param args: the command line arguments, defaults to :code:`sys.argv`.
+    :return: the exit code, 1 if a block grew beyond the tolerance.
+    """
+    options = argument_parser().parse_args(args, namespace=GroundingArgs())
+    reports = ground_corpus(read_corpus(options.corpus, options.large))
+
+    for name, report in reports.items():
+        print(f"{name}: {_format_size(report.total)}")
+        largest = sorted(report.blocks.items(), key=lambda item: -item[1].rules)
+        for block, size in largest[: options.top]:
+            print(f"    {block}: {_format_size(size)}")
+
+    if options.update:
+        # keep the sizes of the large specs that were not grounded
+        skipped = read_corpus(options.corpus).keys() - reports.keys()
+        if skipped and options.baseline.exists():
+            kept = load_baseline(options.baseline)
+            reports = {
+                **{name: kept[name] for name in skipped if name in kept},
+                **reports,
+            }
+        save_baseline(reports, options.baseline)
+        print(f"Wrote the baseline to {options.baseline}")
+        return 0
+    if not options.baseline.exists():
+        print(f"There is no baseline at {options.baseline}, use --update.")
+        return 1
+
+    regressions = 0
+    changes = compare(load_baseline(options.baseline), reports)
+    if changes:
+        print("\nChanges from the baseline:")
+    for change in changes:
+        before = 0 if change.before is None else change.before.rules
+        regression = change.rules > options.tolerance * before
+        regressions += regression
+        print(
+            f"{'REGRESSION' if regression else 'changed'} {change.spec} "
+            f"{change.block}: {_format_size(change.before)} -> "
+            f"{_format_size(change.after)}"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import math
+import multiprocessing
+import os
+from functools import partial
+from multiprocessing.context import BaseContext
+from typing import Any, Callable, Iterable, Iterator
+
+from draco.draco import Draco
+from draco.types import Specification
+
+# the methods of `Draco` that workers can call on each spec
+METHODS = ("check_spec", "complete_spec", "count_preferences", "get_violations")
+
+# the `Draco` instance of a worker process
+_worker_draco: Draco | None = None
+
+
+def _draco_arguments(draco: Draco) -> dict[str, Any]:
+    """The arguments to create a copy of a ``Draco`` instance in a process that
+    does not inherit the memory of its parent.
+    """
+    return {
+        "define": draco.define,
+        "constraints": draco.constraints,
+        "helpers": draco.helpers,
+        "generate": draco.generate,
+        "hard": draco.hard,
+        "soft": draco.soft,
+        "optimize": draco.optimize,
+        "weights": draco.weights,
+        "prepare": draco.prepare,
+        "solver_threads": draco.solver_threads,
+        "parallel_mode": draco.parallel_mode,
+        "statistics": draco.statistics,
+    }
+
+
+def _warm_up(draco: Draco):
+    """Parse the knowledge bases of all methods, so that they are in the program
+    cache before any spec is solved.
+    """
+    draco._check_program("")
+    draco._complete_program("")
+    draco._count_program("")
+    draco._violations_program("")
+
+
+def _init_worker(draco: Draco | dict[str, Any]):
+    global _worker_draco
+    if isinstance(draco, Draco):
+        # inherited from the parent, including its warm program cache
+        _worker_draco = draco
+    else:
+        _worker_draco = Draco(**draco)
+        _warm_up(_worker_draco)
+
+
+def _check_method(method: str | Callable[..., Any]):
+    if not callable(method) and method not in METHODS:
+        raise ValueError(f"The method must be a function or one of {METHODS}.")
+
+
+def _apply(
+    draco: Draco, method: str | Callable[..., Any], kwargs: dict[str, Any], item: Any
+) -> Any:
+    if callable(method):
+        return method(draco, item, **kwargs)
+
+    result = getattr(draco, method)(item, **kwargs)
+    # completions are generated lazily, so collect them before sending them back
+    return list(result) if method == "complete_spec" else result
+
+
+def _call(method: str | Callable[..., Any], kwargs: dict[str, Any], item: Any) -> Any:
+    draco = _worker_draco
+    assert draco is not None, "The worker was not initialized."
+    return _apply(draco, method, kwargs, item)
+
+
+def _call_indexed(
+    method: str | Callable[..., Any], kwargs: dict[str, Any], item: tuple[int, Any]
+) -> tuple[int, Any]:
+    index, value = item
+    return index, _call(method, kwargs, value)
+
+
+class DracoPool:
+    """
+    Pool of worker processes that solve specs with the programs of a ``Draco``
+    instance, to use more than one core for CPU-bound solving.
+
+    The knowledge bases are parsed in the parent before the workers are forked,
+    so that the workers share the parsed programs copy-on-write instead of each
+    parsing them again. On platforms that cannot fork, every worker creates its
+    own copy of the ``Draco`` instance when it starts.
+    """
+
+    def __init__(self, draco: Draco | None = None, processes: int | None = None):
+        """
+        :param draco: The ``Draco`` instance whose programs the workers use.
+            Defaults to a ``Draco`` instance with the default programs.
+        :param processes: The number of worker processes. Defaults to the number
+            of CPUs.
+        """
+        self.draco = Draco() if draco is None else draco
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        if self.processes < 1:
+            raise ValueError("The pool needs at least one process.")
+
+        context: BaseContext
+        if "fork" in multiprocessing.get_all_start_methods():
+            _warm_up(self.draco)
+            context = multiprocessing.get_context("fork")
+            initargs: tuple = (self.draco,)
+        else:  # pragma: no cover
+            context = multiprocessing.get_context()
+            initargs = (_draco_arguments(self.draco),)
+
+        self._pool = context.Pool(self.processes, _init_worker, initargs)
+
+    def _chunksize(self, items: list, chunksize: int | None) -> int:
+        if chunksize is None:
+            # a few chunks per worker balance the load without much overhead
+            return max(1, math.ceil(len(items) / (4 * self.processes)))
+        if chunksize < 1:
+            raise ValueError("The chunks must hold at least one item.")
+        return chunksize
+
+    def map(
+        self,
+        method: str | Callable[..., Any],
+        specs: Iterable[Specification | Any],
+        chunksize: int | None = None,
+        **kwargs,
+    ) -> list:
+        """Call a method on every spec in the workers.
+
+        :param method: The name of the ``Draco`` method to call, one of
+            ``check_spec``, ``complete_spec``, ``count_preferences`` and
+            ``get_violations``, or a picklable function that is called with the
+            ``Draco`` instance of the worker and an item.
+        :param specs: The specs (or items for a function) to call it on.
+        :param chunksize: How many specs to send to a worker at once. Defaults
+            to splitting the specs into about four chunks per worker.
+        :param kwargs: Further arguments to the method, such as ``models`` for
+            ``complete_spec``.
+        :return: The results in the order of the specs. The completions of
+            ``complete_spec`` are lists of models.
+        """
+        _check_method(method)
+        items = list(specs)
+        return self._pool.map(
+            partial(_call, method, kwargs), items, self._chunksize(items, chunksize)
+        )
+
+    def map_items(
+        self,
+        function: Callable[[Any], Any],
+        items: Iterable[Any],
+        chunksize: int | None = None,
+    ) -> list:
+        """Call a function that does not need the ``Draco`` instance of the
+        worker on every item in the workers. The workers still share the parsed
+        programs of the parent, for functions that solve with a ``Draco``
+        instance of their own.
+
+        :param function: A picklable function that is called with an item.
+        :param items: The items to call it on.
+        :param chunksize: How many items to send to a worker at once, see ``map``.
+        :return: The results in the order of the items.
+        """
+        items = list(items)
+        return self._pool.map(function, items, self._chunksize(items, chunksize))
+
+    def imap_unordered(
+        self,
+        method: str | Callable[..., Any],
+        specs: Iterable[Specification | Any],
+        chunksize: int | None = 1,
+        **kwargs,
+    ) -> Iterator[tuple[int, Any]]:
+        """Call a method on every spec in the workers and yield the results as
+        soon as they are done, see ``map``.
+
+        :param method: The name of the ``Draco`` method to call or a function.
+        :param specs: The specs (or items for a function) to call it on.
+        :param chunksize: How many specs to send to a worker at once, defaults
+            to 1 so that every result arrives as early as possible.
+        :param kwargs: Further arguments to the method.
+        :yield: Pairs of the index of a spec in ``specs`` and its result.
+        """
+        _check_method(method)
+        items = list(enumerate(specs))
+        return self._pool.imap_unordered(
+            partial(_call_indexed, method, kwargs),
+            items,
+            self._chunksize(items, chunksize),
+        )
+
+    def close(self):
+        """Stop accepting work and wait for the workers to finish theirs."""
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        """Stop the workers immediately, dropping any outstanding work."""
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self) -> "DracoPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
@@ -0,0 +1,300 @@
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Generator,
+    Iterator,
+    TypeVar,
+)
+
+import clingo
+
+try:
+    # used to read single statistics without converting all of them to a dict
+    from clingo._internal import _ffi, _handle_error, _lib
+except ImportError:  # pragma: no cover
+    _ffi = None
+
+# the functions of clingo's C API that the fast path reads statistics with
+_C_FUNCTIONS = (
+    "clingo_control_statistics",
+    "clingo_statistics_root",
+    "clingo_statistics_map_at",
+    "clingo_statistics_value_get",
+    "clingo_statistics_array_size",
+    "clingo_statistics_array_at",
+)
+
+# whether the private clingo internals of the fast path exist, otherwise the
+# statistics are read through the public `Control.statistics`
+FAST_STATISTICS = _ffi is not None and all(hasattr(_lib, name) for name in _C_FUNCTIONS)
+
+# The phases of a call in the order they run. `build` assembles the program,
+# `parse` adds it to the solver, and `decode` turns answer sets into results.
+PHASES = ("build", "parse", "ground", "solve", "decode")
+
+
+@dataclass
+class Statistics:
+    """Class for where a solver call spent its time and how large and hard its
+    problem was. The solver fills in the statistics while the call runs, so they
+    are complete once the call has finished.
+
+    Attributes:
+        :method: The name of the call, such as ``"check_spec"`` or
+            ``"run_clingo"``.
+        :timings: The seconds spent in each phase, see ``PHASES``. Phases
+            that did not run are missing.
+        :atoms: The number of ground atoms of the program.
+        :rules: The number of ground rules of the program.
+        :choices: The number of choices of the solver, summed over solve calls.
+        :conflicts: The number of conflicts of the solver, summed over solve
+            calls.
+        :solve_calls: The number of solve calls. Top K solving solves once per
+            cost level.
+        :solve_time: The seconds clingo reports for solving, summed over solve
+            calls.
+        :costs: The cost of the best model of the last solve call that
+            optimized, empty if there was none.
+        :lower: The best lower bound of the cost that the solver proved, empty
+            if it proved none.
+    """
+
+    method: str = "run_clingo"
+    timings: dict[str, float] = field(default_factory=dict)
+    atoms: int = 0
+    rules: int = 0
+    choices: int = 0
+    conflicts: int = 0
+    solve_calls: int = 0
+    solve_time: float = 0.0
+    costs: list[int] = field(default_factory=list)
+    lower: list[int] = field(default_factory=list)
+
+    @property
+    def total(self) -> float:
+        """The seconds spent in all phases."""
+        return sum(self.timings.values())
+
+    def add_time(self, phase: str, seconds: float):
+        """Add time to a phase."""
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """Add the time the block takes to a phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - start)
+
+    def update(self, ctl: clingo.Control):
+        """Add the statistics of the last solve call of a solver."""
+        values = _read_statistics(ctl)
+        self.atoms = max(self.atoms, int(values["atoms"]))
+        self.rules = max(self.rules, int(values["rules"]))
+        self.choices += int(values["choices"])
+        self.conflicts += int(values["conflicts"])
+        self.solve_calls += 1
+        self.solve_time += values["solve"]
+        # solve calls that find no model report infinite costs and bounds
+        if values["costs"] and all(map(math.isfinite, values["costs"])):
+            self.costs = [int(cost) for cost in values["costs"]]
+        if values["lower"] and all(map(math.isfinite, values["lower"])):
+            lower = [int(bound) for bound in values["lower"]]
+            self.lower = max(self.lower, lower)
+
+
+# the statistics that `Statistics.update` reads, as paths in clingo's statistics
+_VALUES = {
+    "atoms": (b"problem", b"lp", b"atoms"),
+    "rules": (b"problem", b"lp", b"rules"),
+    "choices": (b"solving", b"solvers", b"choices"),
+    "conflicts": (b"solving", b"solvers", b"conflicts"),
+    "solve": (b"summary", b"times", b"solve"),
+}
+_ARRAYS = {"costs": (b"summary", b"costs"), "lower": (b"summary", b"lower")}
+
+
+def _read_statistics(ctl: clingo.Control) -> dict[str, Any]:
+    """Read the statistics that ``Statistics`` keeps from a solver.
+
+    ``Control.statistics`` converts all statistics of the solver into a dict,
+    which takes longer than most solve calls of Draco. With ``FAST_STATISTICS``,
+    only the needed values are looked up through clingo's private CFFI module.
+    Otherwise, or if the solver does not expose its C handle, the public
+    ``Control.statistics`` is read.
+    """
+    c_control = getattr(ctl, "_rep", None)
+    if not FAST_STATISTICS or c_control is None:
+        stats: Any = ctl.statistics
+        return {
+            name: _lookup(stats, path) for name, path in (_VALUES | _ARRAYS).items()
+        }
+
+    p_stats = _ffi.new("clingo_statistics_t**")
+    p_key = _ffi.new("uint64_t*")
+    p_value = _ffi.new("double*")
+    p_size = _ffi.new("size_t*")
+    _handle_error(_lib.clingo_control_statistics(c_control, p_stats))
+    c_stats = p_stats[0]
+    _handle_error(_lib.clingo_statistics_root(c_stats, p_key))
+    root = p_key[0]
+
+    def key(path: tuple[bytes, ...]) -> int:
+        current = root
+        for name in path:
+            _handle_error(_lib.clingo_statistics_map_at(c_stats, current, name, p_key))
+            current = p_key[0]
+        return current
+
+    def value(key: int) -> float:
+        _handle_error(_lib.clingo_statistics_value_get(c_stats, key, p_value))
+        return p_value[0]
+
+    result: dict[str, Any] = {name: value(key(path)) for name, path in _VALUES.items()}
+    for name, path in _ARRAYS.items():
+        array = key(path)
+        _handle_error(_lib.clingo_statistics_array_size(c_stats, array, p_size))
+        items = []
+        for index in range(p_size[0]):
+            _handle_error(_lib.clingo_statistics_array_at(c_stats, array, index, p_key))
+            items.append(value(p_key[0]))
+        result[name] = items
+    return result
+
+
+def _lookup(stats: Any, path: tuple[bytes, ...]) -> Any:
+    for name in path:
+        stats = stats[name.decode()]
+    return stats
+
+
+class Profile:
+    """
+    Collects the statistics of the calls that finish in a ``profile`` block.
+
+    Attributes:
+        :calls: The statistics of the calls in the order they finished.
+    """
+
+    def __init__(self):
+        self.calls: list[Statistics] = []
+
+    @property
+    def timings(self) -> dict[str, float]:
+        """The seconds spent in each phase, summed over all calls."""
+        timings: dict[str, float] = {}
+        for statistics in self.calls:
+            for phase, seconds in statistics.timings.items():
+                timings[phase] = timings.get(phase, 0.0) + seconds
+        return {phase: timings[phase] for phase in PHASES if phase in timings}
+
+    @property
+    def total(self) -> float:
+        """The seconds spent in all phases of all calls."""
+        return sum(self.timings.values())
+
+
+# the callbacks that receive the statistics of every call
+_callbacks: list[Callable[[Statistics], None]] = []
+# the profiles of the `profile` blocks the current context is in
+_profiles: ContextVar[tuple[Profile, ...]] = ContextVar("profiles", default=())
+
+
+def add_callback(callback: Callable[[Statistics], None]):
+    """Call a function with the statistics of every solver call once it has
+    finished, for example to export them as metrics. While no callback is
+    registered and no ``profile`` block is active, calls do not collect
+    statistics.
+
+    :param callback: The function, which is called in the thread that finished
+        the call.
+    """
+    _callbacks.append(callback)
+
+
+def remove_callback(callback: Callable[[Statistics], None]):
+    """Stop calling a function that ``add_callback`` registered.
+
+    :param callback: The function to stop calling.
+    """
+    _callbacks.remove(callback)
+
+
+@contextmanager
+def profile() -> Generator[Profile, None, None]:
+    """Collect the statistics of the solver calls in the block, including calls
+    in tasks that the block starts.
+
+    :yield: The profile that collects the statistics.
+    """
+    result = Profile()
+    token = _profiles.set(_profiles.get() + (result,))
+    try:
+        yield result
+    finally:
+        _profiles.reset(token)
+
+
+def enabled() -> bool:
+    """Whether solver calls collect their statistics."""
+    return bool(_callbacks) or bool(_profiles.get())
+
+
+def start(method: str, collect: bool = False) -> Statistics | None:
+    """Start the statistics of a call, or return None if the call does not
+    collect statistics.
+
+    :param method: The name of the call.
+    :param collect: Whether to collect the statistics even if no callback or
+        profile is active.
+    """
+    if collect or _callbacks or _profiles.get():
+        return Statistics(method)
+    return None
+
+
+T = TypeVar("T")
+
+
+def report(statistics: Statistics):
+    """Pass the statistics of a finished call to the callbacks and profiles."""
+    for profile in _profiles.get():
+        profile.calls.append(statistics)
+    for callback in list(_callbacks):
+        callback(statistics)
+
+
+def reported(items: Iterator[T], statistics: Statistics) -> Generator[T, None, None]:
+    """Yield the items of a lazy call and report its statistics once the call
+    has finished or was closed."""
+    try:
+        yield from items
+    finally:
+        close = getattr(items, "close", None)
+        if close is not None:
+            close()
+        report(statistics)
+
+
+async def reported_async(
+    items: AsyncIterator[T], statistics: Statistics
+) -> AsyncGenerator[T, None]:
+    """Yield the items of a lazy asynchronous call and report its statistics
+    once the call has finished or was closed, like ``reported``."""
+    try:
+        async for item in items:
+            yield item
+    finally:
+        close = getattr(items, "aclose", None)
+        if close is not None:
+            await close()
+        report(statistics)
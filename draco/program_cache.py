@@ -0,0 +1,134 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable
+
+from draco.batch import UnsupportedProgramError, prepare_batch_program
+from draco.run import ProgramPart, prepare_program
+
+
+@dataclass(frozen=True)
+class ProgramCacheStats:
+    """Class for the usage statistics of a program cache.
+
+    Attributes:
+        :hits: How many lookups found an already prepared program.
+        :misses: How many lookups had to prepare the program.
+        :evictions: How many prepared programs were dropped to respect the size.
+        :size: How many prepared programs are currently held.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of lookups that were hits, 0 if there were no lookups."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ProgramCache:
+    """
+    Thread-safe, size-bounded cache of prepared programs keyed by the program
+    texts they were prepared from, so that ``Draco`` instances with the same
+    programs (and threads sharing one instance) parse them only once.
+    The least recently used program is evicted when the cache is full.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        """
+        :param maxsize: The maximum number of prepared programs to hold.
+        """
+        if maxsize < 1:
+            raise ValueError("The cache must be able to hold at least one program.")
+
+        self.maxsize = maxsize
+        self._programs: OrderedDict[tuple[bool, tuple[str, ...]], list[ProgramPart]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        # the programs that a thread is parsing, set once they are stored
+        self._parsing: dict[tuple[bool, tuple[str, ...]], threading.Event] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, programs: Iterable[str], batch: bool = False) -> list[ProgramPart]:
+        """Get the prepared program for the concatenation of the given programs,
+        preparing it on the first lookup.
+
+        If the programs cannot be parsed on their own, for example because they
+        end in an incomplete rule that the spec completes, the program texts are
+        returned unchanged so that they are parsed together with the spec.
+
+        :param programs: The program texts that form the knowledge base.
+        :param batch: Whether to prepare the programs for solving many specs at
+            once with ``draco.batch``. Programs that cannot be solved in a batch
+            are returned unchanged as well.
+        :return: The parts to pass to ``run_clingo`` before the spec.
+        """
+        texts = tuple(programs)
+        key = (batch, texts)
+
+        # the programs are parsed outside the lock, so that lookups of other
+        # programs do not wait for the parse, but only one thread parses them
+        while True:
+            with self._lock:
+                prepared = self._programs.get(key)
+                if prepared is not None:
+                    self._hits += 1
+                    self._programs.move_to_end(key)
+                    return list(prepared)
+
+                parsing = self._parsing.get(key)
+                if parsing is None:
+                    parsing = self._parsing[key] = threading.Event()
+                    self._misses += 1
+                    break
+            # check again once the other thread stored the program
+            parsing.wait()
+
+        try:
+            try:
+                prepared = [
+                    prepare_batch_program(texts)
+                    if batch
+                    else prepare_program(texts, logger=lambda code, msg: None)
+                ]
+            except (RuntimeError, UnsupportedProgramError):
+                prepared = list(texts)
+
+            with self._lock:
+                self._programs[key] = prepared
+                if len(self._programs) > self.maxsize:
+                    self._programs.popitem(last=False)
+                    self._evictions += 1
+        finally:
+            with self._lock:
+                del self._parsing[key]
+            parsing.set()
+
+        return list(prepared)
+
+    @property
+    def stats(self) -> ProgramCacheStats:
+        """The usage statistics of the cache."""
+        with self._lock:
+            return ProgramCacheStats(
+                self._hits, self._misses, self._evictions, len(self._programs)
+            )
+
+    def clear(self):
+        """Drop all prepared programs and reset the statistics."""
+        with self._lock:
+            self._programs.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+# the cache shared by all `Draco` instances unless they are given their own
+default_program_cache = ProgramCache()
@@ -0,0 +1,184 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, NamedTuple
+
+
+@dataclass(frozen=True)
+class ResultCacheStats:
+    """Class for the usage statistics of a result cache.
+
+    Attributes:
+        :hits: How many lookups found a result.
+        :misses: How many lookups found no result, including expired ones.
+        :evictions: How many results were dropped to respect the memory bound.
+        :expirations: How many results were dropped because they outlived the
+            time to live.
+        :size: How many results are currently held.
+        :memory: The approximate number of bytes of the results currently held.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    memory: int
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of lookups that were hits, 0 if there were no lookups."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    expires: float | None
+
+
+def _size(value: Any) -> int:
+    """The approximate number of bytes an object and its items occupy,
+    including the values of the slots of objects such as ``draco.run.Model``."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(_size(key) + _size(item) for key, item in value.items())
+    else:
+        for cls in type(value).__mro__:
+            slots = getattr(cls, "__slots__", ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                size += _size(getattr(value, name, None))
+    return size
+
+
+class ResultCache:
+    """
+    Thread-safe cache of solver results, so that repeated calls with the same
+    spec, arguments and programs do not solve again. The cache is bounded by the
+    approximate memory of its keys and results, and the least recently used
+    results are evicted first. Results can also expire after a time to live.
+
+    The cached results must be immutable, as a hit returns the cached object
+    itself. ``Draco`` only caches calls that are deterministic, so that a hit
+    returns the same result as solving again would.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2**20, ttl: float | None = None):
+        """
+        :param max_bytes: The maximum approximate number of bytes of the cached
+            keys and results. Results that are larger on their own are not cached.
+        :param ttl: The number of seconds after which a result expires, defaults
+            to None, meaning that results do not expire.
+        """
+        if max_bytes < 1:
+            raise ValueError("The cache must be able to hold at least one byte.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("The time to live must be positive.")
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._results: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get the cached result for a key.
+
+        :param key: The key the result was stored under.
+        :param default: The value to return if there is no result.
+        :return: The result, or the default if there is none or it expired.
+        """
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None and (
+                entry.expires is not None and entry.expires <= time.monotonic()
+            ):
+                self._remove(key)
+                self._expirations += 1
+                entry = None
+
+            if entry is None:
+                self._misses += 1
+                return default
+
+            self._hits += 1
+            self._results.move_to_end(key)
+            return entry.value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a result, evicting the least recently used results if the
+        memory bound is exceeded.
+
+        :param key: The key to store the result under.
+        :param value: The immutable result.
+        """
+        size = _size(key) + _size(value)
+        if size > self.max_bytes:
+            return
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+
+        with self._lock:
+            if key in self._results:
+                self._remove(key)
+            self._results[key] = _Entry(value, size, expires)
+            self._memory += size
+
+            while self._memory > self.max_bytes:
+                self._remove(next(iter(self._results)))
+                self._evictions += 1
+
+    def _remove(self, key: Hashable):
+        self._memory -= self._results.pop(key).size
+
+    def invalidate(self, spec: Hashable | None = None) -> int:
+        """Drop cached results, for example after the data behind a spec changed.
+
+        :param spec: Only drop the results of calls with this spec, as the
+            program text or fingerprint that ``Draco`` keys it by. Defaults to
+            dropping all results.
+        :return: The number of dropped results.
+        """
+        with self._lock:
+            if spec is None:
+                keys = list(self._results)
+            else:
+                keys = [
+                    key
+                    for key in self._results
+                    if isinstance(key, tuple) and spec in key
+                ]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    @property
+    def stats(self) -> ResultCacheStats:
+        """The usage statistics of the cache."""
+        with self._lock:
+            return ResultCacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self._expirations,
+                len(self._results),
+                self._memory,
+            )
+
+    def clear(self):
+        """Drop all results and reset the statistics."""
+        with self._lock:
+            self._results.clear()
+            self._memory = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._expirations = 0
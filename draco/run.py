@@ -1,28 +1,332 @@
+import asyncio
 import logging
-from dataclasses import dataclass
-from typing import Any, Generator, Iterable, Sequence, cast
+import time
+from array import array
+from contextlib import aclosing, closing
+from dataclasses import FrozenInstanceError, dataclass
+from functools import partial
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Generator,
+    Hashable,
+    Iterable,
+    Mapping,
+    Sequence,
+    cast,
+)
 
 # Clingo Python API is documented at https://potassco.org/clingo/python-api/current/
 import clingo
+from clingo.ast import AST, ProgramBuilder, parse_string
+
+from draco.fact_utils import answer_set_to_dict
+from draco.profiling import Statistics, report, start
+
+try:
+    # used to copy the symbol handles of a model at once
+    from clingo._internal import _ffi
+except ImportError:  # pragma: no cover
+    _ffi = None
+
+
+def _handles_supported() -> bool:
+    """Check that clingo has the private internals that symbol handles rely on:
+    the CFFI module, ``Symbol._rep``, and the ``Symbol`` constructor that takes
+    a handle. The ``_p_symbols`` view of ``Model.symbols`` is checked per model.
+    """
+    if _ffi is None or not hasattr(_ffi, "buffer"):
+        return False
+    try:
+        symbol = clingo.Function("f", [clingo.Number(1)])
+        return clingo.symbol.Symbol(symbol._rep) == symbol
+    except (AttributeError, TypeError):
+        return False
+
+
+# whether models store symbol handles, otherwise they store the clingo.Symbol
+# objects, which works with any clingo version
+SYMBOL_HANDLES = _handles_supported()
+
+
+def handle_to_symbol(handle: Hashable) -> clingo.Symbol:
+    """Get the symbol of a handle from ``Model.handles``.
+
+    :param handle: the handle of the symbol.
+    :return: the symbol.
+    """
+    if SYMBOL_HANDLES:
+        return clingo.symbol.Symbol(handle)
+    return cast(clingo.Symbol, handle)
+
+
+def _symbol_handles(
+    symbols: Iterable[clingo.Symbol],
+) -> array | tuple[clingo.Symbol, ...]:
+    """Get the handles of symbols as an array of 64-bit integers.
+
+    Clingo interns every symbol in a table that lives as long as the process,
+    so the handle identifies a symbol without holding on to a Python object.
+    Without ``SYMBOL_HANDLES``, the symbols themselves are kept in a tuple.
+    """
+    if isinstance(symbols, array):
+        return symbols
+    if not SYMBOL_HANDLES:
+        return tuple(symbols)
+
+    handles = array("Q")
+    # `Model.symbols` returns a view on a C array of handles, which is copied
+    # at once instead of creating a Python object per symbol
+    c_symbols = getattr(symbols, "_p_symbols", None)
+    if c_symbols is not None and _ffi is not None:
+        handles.frombytes(_ffi.buffer(c_symbols))
+    else:
+        handles.extend(symbol._rep for symbol in symbols)
+    return handles
+
+
+def _model_from_strings(
+    strings: Sequence[str],
+    cost: list[int],
+    number: int,
+    optimality_proven: bool,
+    statistics: Statistics | None = None,
+) -> "Model":
+    # symbol handles are only valid in the process that created them
+    answer_set = [clingo.parse_term(string) for string in strings]
+    return Model(answer_set, cost, number, optimality_proven, statistics)
 
 
-@dataclass(frozen=True)
 class Model:
     """Class for a model.
 
+    The answer set is stored as compact symbol handles and only decoded into
+    symbols, strings, a specification dictionary, or preference counts when
+    these are first accessed. Each decoded form is cached.
+
     Attributes:
         :answer_set: The answer set of this model.
-            An answer set is a list of Clingo Symbols.
+            An answer set is a sequence of Clingo Symbols.
         :cost: The cost of this answer set.
         :number: The sequence number of this answer.
+        :optimality_proven: Whether the model is known to be optimal. This is
+            only false for models that the solver returned because its budget
+            ran out before it could prove optimality.
+        :statistics: The statistics of the solver call that found the model, if
+            it collected them. They are complete once the call has finished.
     """
 
-    answer_set: Iterable[clingo.Symbol]
-    cost: list[int]
+    __slots__ = (
+        "_cost",
+        "number",
+        "optimality_proven",
+        "statistics",
+        "_symbols",
+        "_answer_set",
+        "_strings",
+        "_dict",
+        "_preferences",
+    )
+
+    _cost: tuple[int, ...]
     number: int
+    optimality_proven: bool
+    statistics: Statistics | None
+    _symbols: array | tuple[clingo.Symbol, ...]
+    _answer_set: tuple[clingo.Symbol, ...] | None
+    _strings: tuple[str, ...] | None
+    _dict: Mapping | None
+    _preferences: dict[str, int] | None
+
+    def __init__(
+        self,
+        answer_set: Iterable[clingo.Symbol],
+        cost: list[int],
+        number: int,
+        optimality_proven: bool = True,
+        statistics: Statistics | None = None,
+    ):
+        init = object.__setattr__
+        init(self, "_symbols", _symbol_handles(answer_set))
+        init(self, "_cost", tuple(cost))
+        init(self, "number", number)
+        init(self, "optimality_proven", optimality_proven)
+        init(self, "statistics", statistics)
+        for cached in ["_answer_set", "_strings", "_dict", "_preferences"]:
+            init(self, cached, None)
+
+    def __setattr__(self, name: str, value: Any):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def _cache(self, name: str, value: Any) -> Any:
+        object.__setattr__(self, name, value)
+        return value
+
+    @property
+    def cost(self) -> list[int]:
+        """The cost of the answer set. The cost is copied, so that changing it
+        does not change the model."""
+        return list(self._cost)
+
+    @property
+    def answer_set(self) -> tuple[clingo.Symbol, ...]:
+        """The symbols of the answer set."""
+        if self._answer_set is None:
+            return self._cache(
+                "_answer_set", tuple(map(handle_to_symbol, self._symbols))
+            )
+        return self._answer_set
+
+    @property
+    def handles(self) -> Sequence[Hashable]:
+        """The handles of the symbols of the answer set, which identify the
+        symbols for as long as the process runs, see ``handle_to_symbol``."""
+        return self._symbols
+
+    @property
+    def strings(self) -> tuple[str, ...]:
+        """The symbols of the answer set as strings."""
+        if self._strings is None:
+            symbols: Iterable[clingo.Symbol] = (
+                map(handle_to_symbol, self._symbols)
+                if self._answer_set is None
+                else self._answer_set
+            )
+            return self._cache("_strings", tuple(map(str, symbols)))
+        return self._strings
+
+    def to_dict(self) -> Mapping:
+        """The answer set as a specification dictionary, see
+        ``fact_utils.answer_set_to_dict``."""
+        if self._dict is None:
+            return self._cache("_dict", answer_set_to_dict(self.answer_set))
+        return self._dict
+
+    @property
+    def preference_counts(self) -> dict[str, int]:
+        """How often the model violates each preference, for models of programs
+        that derive ``preference`` atoms. Preferences that are not violated are
+        missing."""
+        if self._preferences is None:
+            counts: dict[str, int] = {}
+            for symbol in self.answer_set:
+                if symbol.name == "preference":
+                    name = symbol.arguments[0].name
+                    counts[name] = counts.get(name, 0) + 1
+            return dict(self._cache("_preferences", counts))
+        return dict(self._preferences)
+
+    def __len__(self) -> int:
+        return len(self._symbols)
 
     def __str__(self):
-        return "\n".join([f"{s}." for s in self.answer_set])
+        return "\n".join([f"{s}." for s in self.strings])
+
+    def __repr__(self):
+        return (
+            f"Model(answer_set={list(self.answer_set)!r}, cost={self.cost!r}, "
+            f"number={self.number!r}, optimality_proven={self.optimality_proven!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Model):
+            return NotImplemented
+        return (
+            self._symbols == other._symbols
+            and self._cost == other._cost
+            and self.number == other.number
+            and self.optimality_proven == other.optimality_proven
+        )
+
+    def __hash__(self) -> int:
+        symbols = self._symbols
+        return hash(
+            (
+                symbols.tobytes() if isinstance(symbols, array) else symbols,
+                self._cost,
+                self.number,
+                self.optimality_proven,
+            )
+        )
+
+    def __reduce__(self):
+        return (
+            _model_from_strings,
+            (
+                self.strings,
+                self.cost,
+                self.number,
+                self.optimality_proven,
+                self.statistics,
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class PreparedProgram:
+    """Class for a program that has already been parsed into clingo statements.
+
+    Adding a prepared program to a solver skips parsing the program text again,
+    which pays off for large programs that are solved many times.
+
+    Attributes:
+        :statements: The parsed statements of the program.
+    """
+
+    statements: tuple[AST, ...]
+
+
+def prepare_program(
+    program: str | Iterable[str],
+    logger: Callable[[clingo.MessageCode, str], None] | None = None,
+) -> PreparedProgram:
+    """Parse a program once so that it can be passed to ``run_clingo`` repeatedly.
+
+    :param program: Program as a string or iterable of strings that will be
+        concatenated.
+    :param logger: Function to intercept messages of the parser, defaults to
+        clingo's logger which prints to stderr.
+    :raises RuntimeError: If the program cannot be parsed.
+    :return: The prepared program.
+    """
+    if not isinstance(program, str):
+        program = "\n".join(program)
+
+    statements: list[AST] = []
+    parse_string(program, statements.append, logger=logger)
+
+    return PreparedProgram(tuple(statements))
+
+
+ProgramPart = str | PreparedProgram
+
+
+def add_program(ctl: clingo.Control, program: ProgramPart | Iterable[ProgramPart]):
+    """Add a program to the base part of the solver.
+
+    :param ctl: The control object to add the program to.
+    :param program: Program as a string, prepared program, or iterable of those.
+        Strings are concatenated and parsed, prepared programs are added as is.
+    """
+    if isinstance(program, (str, PreparedProgram)):
+        program = [program]
+
+    texts: list[str] = []
+    prepared: list[PreparedProgram] = []
+    for part in program:
+        if isinstance(part, PreparedProgram):
+            prepared.append(part)
+        else:
+            texts.append(part)
+
+    if prepared:
+        with ProgramBuilder(ctl) as builder:
+            for part in prepared:
+                for statement in part.statements:
+                    builder.add(statement)
+
+    ctl.add("base", [], "\n".join(texts))
 
 
 class Observer(clingo.backend.Observer):
@@ -33,95 +337,650 @@ class Observer(clingo.backend.Observer):
         self.minimize_literals = literals
 
 
+# How clasp's threads work together, see ``--parallel-mode`` in the potassco guide
+PARALLEL_MODES = ("compete", "split")
+
+
+def _ground(
+    program: ProgramPart | Iterable[ProgramPart],
+    models: int,
+    topK: bool,
+    arguments: list[str],
+    threads: int = 1,
+    parallel_mode: str = "compete",
+    statistics: Statistics | None = None,
+) -> tuple[clingo.Control, Observer | None]:
+    """Create a solver for the program and ground it. The observer collects the
+    minimize literals for top K solving and is None if models are not optimized.
+    """
+    if statistics is not None:
+        started = time.perf_counter()
+    if threads < 1:
+        raise ValueError("The solver needs at least one thread.")
+    if parallel_mode not in PARALLEL_MODES:
+        raise ValueError(f"The parallel mode must be one of {PARALLEL_MODES}.")
+
+    # single-shot solving is often faster, but we cannot change the program
+    ctl = clingo.Control(["--single-shot"] + arguments if not topK else arguments)
+    config: Any = ctl.configuration
+
+    if threads > 1:
+        # clasp enumerates the optimal models of a top K iteration without
+        # duplicates across threads, and the weight rules added between
+        # iterations are shared by all threads
+        config.solve.parallel_mode = f"{threads},{parallel_mode}"
+
+    add_program(ctl, program)
+    if statistics is not None:
+        parsed = time.perf_counter()
+        statistics.add_time("parse", parsed - started)
+
+    # topK with all models is the same as ignoring optimization
+    if topK and models == 0:
+        logging.warning("Since all models should be computed, topK is ignored.")
+        topK = False
+        config.solve.opt_mode = "ignore"
+
+    obs = None
+    if topK:
+        config.solve.opt_mode = "optN"
+
+        obs = Observer()
+        ctl.register_observer(obs)
+    else:
+        config.solve.models = str(models)
+
+        config.solve.project = 1
+
+    ctl.ground([("base", [])])
+    if statistics is not None:
+        statistics.add_time("ground", time.perf_counter() - parsed)
+
+    return ctl, obs
+
+
+def _exclude_cost(ctl: clingo.Control, obs: Observer, cost: int):
+    """Disallow models with at most the given cost in the next solve call."""
+    with ctl.backend() as backend:
+        aux = backend.add_atom()
+        backend.add_weight_rule([aux], cost + 1, obs.minimize_literals)
+        backend.add_rule([], [-aux])
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Class for the limits of a search, so that a solver call returns within a
+    bounded time. Limits that are None do not apply.
+
+    Attributes:
+        :time: The wall-clock time in seconds for the whole call, including
+            grounding.
+        :conflicts: The number of conflicts the solver may run into, summed over
+            all solve calls.
+        :gap: How far the cost of the best model found may be above the best
+            known lower bound of the cost. Only applies to top K solving.
+        :cancelled: A function that tells whether the caller has cancelled the
+            call, such as ``threading.Event.is_set``. The search polls it every
+            ``POLL_INTERVAL`` seconds and stops like when the time runs out.
+    """
+
+    time: float | None = None
+    conflicts: int | None = None
+    gap: int | None = None
+    cancelled: Callable[[], bool] | None = None
+
+    def __post_init__(self):
+        for name in ["time", "conflicts", "gap"]:
+            value = getattr(self, name)
+            if value is not None and value < 0:
+                raise ValueError(f"The {name} budget must not be negative.")
+
+
+# the seconds between two checks whether a call with a budget was cancelled
+POLL_INTERVAL = 0.05
+
+
+class _Anytime:
+    """Tracks the budget of a solver call across its solve calls."""
+
+    def __init__(self, budget: Budget | None):
+        budget = Budget() if budget is None else budget
+        self.deadline = None if budget.time is None else time.monotonic() + budget.time
+        self.conflicts = budget.conflicts
+        self.gap = budget.gap
+        self.cancelled = budget.cancelled
+
+    @property
+    def bounded(self) -> bool:
+        """Whether the search may have to stop before it has finished."""
+        return self.deadline is not None or self.cancelled is not None
+
+    def timeout(self) -> float | None:
+        """The seconds to wait for the solver before checking the budget again,
+        or None if the search is not bounded."""
+        if self.deadline is None:
+            return None if self.cancelled is None else POLL_INTERVAL
+        left = max(0.0, self.deadline - time.monotonic())
+        return left if self.cancelled is None else min(left, POLL_INTERVAL)
+
+    def stopped(self) -> bool:
+        """Whether the call was cancelled."""
+        return self.cancelled is not None and self.cancelled()
+
+    def exhausted(self) -> bool:
+        """Whether the time is up or the call was cancelled."""
+        if self.stopped():
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def wait(self, handle: clingo.solving.SolveHandle) -> bool:
+        """Wait for the next model or the end of a solve call, and return
+        whether it came before the budget ran out."""
+        while not handle.wait(self.timeout()):
+            if self.exhausted():
+                return False
+        # a search that finds models quickly never times out
+        return not self.stopped()
+
+    def configure(self, ctl: clingo.Control):
+        """Limit the conflicts of the next solve call to the ones left."""
+        if self.conflicts is not None:
+            config: Any = ctl.configuration
+            config.solve.solve_limit = str(self.conflicts)
+
+    def consume(self, ctl: clingo.Control):
+        """Subtract the conflicts of the last solve call from the ones left."""
+        if self.conflicts is not None:
+            stats: Any = ctl.statistics
+            conflicts = int(stats["solving"]["solvers"]["conflicts"])
+            self.conflicts = max(0, self.conflicts - conflicts)
+
+
+class _TopK:
+    """
+    Drives top K solving as a sequence of solve calls on one control object,
+    so that the solver keeps its heuristics and learned nogoods between them.
+
+    After the models of some cost ``c`` are found, the models with cost at most
+    ``c`` are excluded. If the cost has a single priority level, the next solve
+    call enumerates the models of cost ``c + 1`` without optimizing, which are
+    optimal by construction. Only if there are none, an optimization runs again,
+    bounded by the cheapest model that earlier optimizations came across.
+
+    Models of an optimization that are not proven optimal are kept as candidates
+    for the bound, and they stand in for the optimal models if the budget runs
+    out.
+    """
+
+    def __init__(self, ctl: clingo.Control, models: int, gap: int | None):
+        self.config: Any = ctl.configuration
+        self.models = models
+        self.gap = gap
+        # every model that is cheaper has been returned or excluded
+        self.floor: int | None = None
+        # whether the next solve call enumerates the models of cost `floor`
+        self.step = False
+        self.lower: int | None = None
+        self.candidates: list[Model] = []
+        self.proven: set[frozenset[Hashable]] = set()
+
+    def configure(self) -> bool:
+        """Configure the next solve call.
+
+        :return: Whether the solve call optimizes.
+        """
+        self.config.solve.models = str(self.models)
+        if self.step:
+            self.config.solve.opt_mode = f"enum,{self.floor}"
+            return False
+
+        bounds = [
+            model.cost[0]
+            for model in self.candidates
+            if len(model.cost) == 1
+            and (self.floor is None or model.cost[0] >= self.floor)
+        ]
+        self.config.solve.opt_mode = f"optN,{min(bounds)}" if bounds else "optN"
+        return True
+
+    def prove(self, model: Model):
+        """Remember a model that is proven optimal and returned."""
+        self.models -= 1
+        self.proven.add(frozenset(model.handles))
+
+    def improve(self, model: Model) -> bool:
+        """Remember a model that is not proven optimal.
+
+        :return: Whether the cost of the model is within the gap of the lower
+            bound, so that the search can stop.
+        """
+        self.candidates.append(model)
+        return (
+            self.gap is not None
+            and self.lower is not None
+            and model.cost[0] - self.lower <= self.gap
+        )
+
+    def advance(self, cost: list[int] | None) -> int | None:
+        """Prepare the next solve call after one that found no more models.
+
+        :param cost: The cost of the models the last solve call returned, if any.
+        :return: The cost up to which models need to be excluded, if any.
+        """
+        if cost is None:
+            # there are no models of cost `floor`, so optimize to find the next
+            self.step = False
+            return None
+        self.floor = cost[0] + 1
+        self.step = len(cost) == 1
+        return cost[0]
+
+    def best(self) -> list[Model]:
+        """The best models that are not proven optimal, cheapest first."""
+        # clingo finds the model of the optimal cost again when enumerating
+        # the proven models, so it may already have been returned
+        candidates: dict[frozenset[Hashable], Model] = {}
+        for model in sorted(self.candidates, key=lambda model: model.cost):
+            key = frozenset(model.handles)
+            if (
+                key not in self.proven
+                and key not in candidates
+                and (self.floor is None or model.cost[0] >= self.floor)
+            ):
+                candidates[key] = model
+        best = list(candidates.values())[: self.models]
+
+        # a model whose cost meets the lower bound is optimal after all
+        return [
+            Model(model._symbols, model.cost, model.number, True, model.statistics)
+            if self.lower is not None and model.cost[0] <= self.lower
+            else model
+            for model in best
+        ]
+
+
+def _lower_bound(ctl: clingo.Control, floor: int | None) -> int | None:
+    """Get the best known lower bound of the cost by letting the solver propagate
+    the program without searching.
+
+    :param floor: A lower bound that is already known, if any.
+    """
+    config: Any = ctl.configuration
+    models, solve_limit = config.solve.models, config.solve.solve_limit
+    config.solve.models, config.solve.solve_limit = "1", "0"
+    ctl.solve()
+    config.solve.models, config.solve.solve_limit = models, solve_limit
+
+    stats: Any = ctl.statistics
+    lower = stats["summary"].get("lower")
+    bounds = [int(lower[0])] if lower else []
+    if floor is not None:
+        bounds.append(floor)
+    return max(bounds, default=None)
+
+
+def _to_model(
+    model: clingo.Model, optimize: bool, statistics: Statistics | None = None
+) -> Model:
+    answer_set = model.symbols(shown=True)
+    return Model(
+        answer_set,
+        model.cost,
+        model.number,
+        model.optimality_proven or not optimize,
+        statistics,
+    )
+
+
+def _solve(
+    ctl: clingo.Control,
+    optimize: bool,
+    anytime: _Anytime,
+    statistics: Statistics | None = None,
+) -> Generator[Model | clingo.SolveResult, None, None]:
+    """Solve and yield the models as they are found, followed by the result of
+    the solve call. If the time budget runs out or the call is cancelled, the
+    search is stopped and no result follows.
+    """
+    if statistics is not None:
+        yield from _solve_with_statistics(ctl, optimize, anytime, statistics)
+        return
+
+    anytime.configure(ctl)
+
+    # searching in the background allows to stop waiting when the time is up or
+    # the call was cancelled
+    solve_handle = cast(
+        clingo.solving.SolveHandle,
+        ctl.solve(yield_=True, async_=anytime.bounded),
+    )
+    with solve_handle as handle:
+        while True:
+            handle.resume()
+            if not anytime.wait(handle):
+                return
+            model = handle.model()
+            if model is None:
+                break
+            yield _to_model(model, optimize)
+        result = handle.get()
+
+    anytime.consume(ctl)
+    yield result
+
+
+def _solve_with_statistics(
+    ctl: clingo.Control, optimize: bool, anytime: _Anytime, statistics: Statistics
+) -> Generator[Model | clingo.SolveResult, None, None]:
+    """Solve like ``_solve`` and add the time and statistics of the solve call
+    to the statistics. The time the consumer of the models takes is not counted.
+    """
+    anytime.configure(ctl)
+
+    started: float | None = time.perf_counter()
+    solve_handle = cast(
+        clingo.solving.SolveHandle,
+        ctl.solve(yield_=True, async_=anytime.bounded),
+    )
+    try:
+        with solve_handle as handle:
+            while True:
+                handle.resume()
+                if not anytime.wait(handle):
+                    return
+                model = handle.model()
+                if model is None:
+                    break
+                found = time.perf_counter()
+                item = _to_model(model, optimize, statistics)
+                statistics.add_time("solve", found - cast(float, started))
+                statistics.add_time("decode", time.perf_counter() - found)
+                started = None
+                yield item
+                started = time.perf_counter()
+            result = handle.get()
+    finally:
+        if started is not None:
+            statistics.add_time("solve", time.perf_counter() - started)
+        # the statistics are only available once the solve call has stopped
+        statistics.update(ctl)
+
+    anytime.consume(ctl)
+    yield result
+
+
 def run_clingo(
-    program: str | Iterable[str],
+    program: ProgramPart | Iterable[ProgramPart],
     models: int = 0,
     topK=False,
     arguments: list[str] = [],
+    budget: Budget | None = None,
+    threads: int = 1,
+    parallel_mode: str = "compete",
+    statistics: Statistics | bool = False,
 ) -> Generator[Model, None, None]:
     """Run the solver and yield the models.
 
     :param program: Program as a string or iterable of strings that will be
-        concatenated.
+        concatenated. Parts that were parsed with ``prepare_program`` are added
+        without parsing them again.
     :param models: Number of models to generate, defaults to 0 (meaning all models).
     :param topK: Whether to return the top K models. If false (default), the program
-        will not optimize the output models.
+        will not optimize the output models. The top K models are yielded in
+        non-decreasing order of their cost.
     :param arguments: Arguments to the clingo grounder and solver.
         Only gringo options (without --text) and clasp's search options are supported.
         For example, you can use ["-c foo=5"] to override the occurrences of
         constant "foo" in your input program.
         Refer to the potassco guide for the options.
+    :param budget: Limits for the search, defaults to no limits. When a limit is
+        reached, the search stops. For top K solving, the best models found so far
+        then fill up the remaining models, with ``optimality_proven`` set to false.
+    :param threads: Number of threads the solver searches with, defaults to 1.
+        More threads mostly pay off for hard optimization problems.
+    :param parallel_mode: How the threads work together, either ``"compete"``
+        (default) to run different search strategies on the whole problem or
+        ``"split"`` to divide the search space among the threads.
+    :param statistics: Whether to collect the statistics of the call, which the
+        models then hold as ``Model.statistics``, defaults to False. Calls also
+        collect statistics while a ``profile`` block or callback is active, see
+        ``draco.profiling``. Passing a ``Statistics`` object collects into it,
+        so that callers can add phases of their own and report it themselves.
     :yield: The models.
     """
-    if not isinstance(program, str):
-        program = "\n".join(program)
+    record: Statistics | None
+    if isinstance(statistics, Statistics):
+        record, owned = statistics, False
+    else:
+        record = start("run_clingo", statistics)
+        owned = record is not None
 
-    # single-shot solving is often faster, but we cannot change the program
-    ctl = clingo.Control(["--single-shot"] + arguments if not topK else arguments)
-    config: Any = ctl.configuration
+    try:
+        anytime = _Anytime(budget)
+        ctl, obs = _ground(
+            program, models, topK, arguments, threads, parallel_mode, record
+        )
 
-    ctl.add(
-        "base",
-        [],
-        program,
-    )
+        if obs is not None:
+            top = _TopK(ctl, models, anytime.gap)
+            while top.models > 0:
+                cost = None
+                optimize = top.configure()
+                if optimize and anytime.gap is not None:
+                    top.lower = _lower_bound(ctl, top.floor)
 
-    # topK with all models is the same as ignoring optimization
-    if topK and models == 0:
-        logging.warning("Since all models should be computed, topK is ignored.")
-        topK = False
-        config.solve.opt_mode = "ignore"
+                result = None
+                with closing(_solve(ctl, optimize, anytime, record)) as solve:
+                    for item in solve:
+                        if isinstance(item, clingo.SolveResult):
+                            result = item
+                        elif item.optimality_proven:
+                            cost = item.cost
+                            top.prove(item)
+                            yield item
+                        elif top.improve(item):
+                            break
 
-    if topK:
-        config.solve.opt_mode = "optN"
+                if result is None or (not result.exhausted and top.models > 0):
+                    # the budget ran out before the optimal models were found
+                    yield from top.best()
+                    break
+                if optimize and result.unsatisfiable:
+                    break
 
-        obs = Observer()
-        ctl.register_observer(obs)
+                exclude = top.advance(cost) if top.models > 0 else None
+                if exclude is not None:
+                    # add weight rule to disallow the returned models in next
+                    # solve call
+                    _exclude_cost(ctl, obs, exclude)
 
-        ctl.ground([("base", [])])
+        else:
+            with closing(_solve(ctl, False, anytime, record)) as solve:
+                for item in solve:
+                    if isinstance(item, Model):
+                        yield item
+    finally:
+        if owned:
+            report(cast(Statistics, record))
 
-        while models > 0:
-            cost = 0
-            config.solve.models = str(models)
 
-            solve_handle = cast(clingo.solving.SolveHandle, ctl.solve(yield_=True))
-            with solve_handle as handle:
-                for model in handle:
-                    if model.optimality_proven:
-                        cost = model.cost[0]
-                        models -= 1
+async def _solve_async(
+    ctl: clingo.Control,
+    optimize: bool,
+    anytime: _Anytime,
+    statistics: Statistics | None = None,
+) -> AsyncGenerator[Model | clingo.SolveResult, None]:
+    """Solve in clingo's background thread and yield the models as they are
+    found, followed by the result of the solve call, like ``_solve``.
+    Closing the generator before the result cancels the search.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[Model | clingo.SolveResult] = asyncio.Queue()
+    started = 0.0
+    decoding = 0.0
 
-                        answer_set = model.symbols(shown=True)
-                        yield Model(answer_set, model.cost, model.number)
-                if handle.get().unsatisfiable:
-                    break
+    def put(item: Model | clingo.SolveResult):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            # the event loop was closed, so nobody is waiting for the item
+            pass
+
+    def on_model(model: clingo.Model):
+        # clingo models are only valid in the callback, so copy the symbols
+        if statistics is None:
+            put(_to_model(model, optimize))
+            return
+
+        nonlocal decoding
+        found = time.perf_counter()
+        put(_to_model(model, optimize, statistics))
+        decoding += time.perf_counter() - found
+
+    def on_finish(result: clingo.SolveResult):
+        if statistics is not None:
+            # the search runs in clingo's thread, so the models are decoded
+            # while it runs
+            elapsed = time.perf_counter() - started
+            statistics.add_time("solve", elapsed - decoding)
+            statistics.add_time("decode", decoding)
+        put(result)
+
+    anytime.configure(ctl)
+    if statistics is not None:
+        started = time.perf_counter()
 
-            if models > 0:
-                # add weight rule to disallow optimal models in next solve call
-                with ctl.backend() as backend:
-                    aux = backend.add_atom()
-                    backend.add_weight_rule([aux], cost + 1, obs.minimize_literals)
-                    backend.add_rule([], [-aux])
+    # clingo prepares the search before it hands it to its own thread
+    solve = partial(ctl.solve, on_model=on_model, on_finish=on_finish, async_=True)
+    handle = cast(clingo.solving.SolveHandle, await loop.run_in_executor(None, solve))
 
+    def stop():
+        with handle:
+            handle.cancel()
+
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), anytime.timeout())
+            except TimeoutError:
+                if anytime.exhausted():
+                    return
+                continue
+            if anytime.stopped():
+                return
+            if isinstance(item, clingo.SolveResult):
+                break
+            yield item
+    finally:
+        # cancelling waits for the search to stop, so it must not block the loop
+        await loop.run_in_executor(None, stop)
+        if statistics is not None:
+            statistics.update(ctl)
+
+    anytime.consume(ctl)
+    yield item
+
+
+async def run_clingo_async(
+    program: ProgramPart | Iterable[ProgramPart],
+    models: int = 0,
+    topK=False,
+    arguments: list[str] = [],
+    budget: Budget | None = None,
+    threads: int = 1,
+    parallel_mode: str = "compete",
+    statistics: Statistics | bool = False,
+) -> AsyncGenerator[Model, None]:
+    """Run the solver without blocking the event loop and yield the models.
+
+    This is the asyncio counterpart of ``run_clingo`` and yields the same models.
+    Grounding runs in the default executor of the event loop, solving runs in
+    a thread of clingo, and the models arrive through a queue as they are found.
+    Closing the generator, or dropping it, cancels the solve.
+
+    :param program: Program as a string or iterable of strings that will be
+        concatenated. Prepared programs are supported as in ``run_clingo``.
+    :param models: Number of models to generate, defaults to 0 (meaning all models).
+    :param topK: Whether to return the top K models, as in ``run_clingo``.
+    :param arguments: Arguments to the clingo grounder and solver,
+        as in ``run_clingo``.
+    :param budget: Limits for the search, as in ``run_clingo``.
+    :param threads: Number of solver threads, as in ``run_clingo``.
+    :param parallel_mode: How the threads work together, as in ``run_clingo``.
+    :param statistics: Whether to collect the statistics of the call, as in
+        ``run_clingo``.
+    :yield: The models.
+    """
+    record: Statistics | None
+    if isinstance(statistics, Statistics):
+        record, owned = statistics, False
     else:
-        config.solve.models = str(models)
+        record = start("run_clingo", statistics)
+        owned = record is not None
 
-        config.solve.project = 1
+    loop = asyncio.get_running_loop()
+    anytime = _Anytime(budget)
+    try:
+        ctl, obs = await loop.run_in_executor(
+            None,
+            _ground,
+            program,
+            models,
+            topK,
+            arguments,
+            threads,
+            parallel_mode,
+            record,
+        )
 
-        ctl.ground([("base", [])])
+        if obs is None:
+            async with aclosing(_solve_async(ctl, False, anytime, record)) as solve:
+                async for item in solve:
+                    if isinstance(item, Model):
+                        yield item
+            return
 
-        solve_handle = cast(clingo.solving.SolveHandle, ctl.solve(yield_=True))
-        with solve_handle as handle:
-            for model in handle:
-                answer_set = model.symbols(shown=True)
-                yield Model(answer_set, model.cost, model.number)
+        top = _TopK(ctl, models, anytime.gap)
+        while top.models > 0:
+            cost = None
+            optimize = top.configure()
+            if optimize and anytime.gap is not None:
+                top.lower = await loop.run_in_executor(
+                    None, _lower_bound, ctl, top.floor
+                )
+
+            result = None
+            async with aclosing(_solve_async(ctl, optimize, anytime, record)) as solve:
+                async for item in solve:
+                    if isinstance(item, clingo.SolveResult):
+                        result = item
+                    elif item.optimality_proven:
+                        cost = item.cost
+                        top.prove(item)
+                        yield item
+                    elif top.improve(item):
+                        break
+
+            if result is None or (not result.exhausted and top.models > 0):
+                for model in top.best():
+                    yield model
+                break
+            if optimize and result.unsatisfiable:
+                break
+
+            exclude = top.advance(cost) if top.models > 0 else None
+            if exclude is not None:
+                _exclude_cost(ctl, obs, exclude)
+    finally:
+        if owned:
+            report(cast(Statistics, record))
 
 
-def is_satisfiable(program: str | Iterable[str]) -> bool:
+def is_satisfiable(program: ProgramPart | Iterable[ProgramPart]) -> bool:
     """Checks whether the program is satisfiable.
 
     :param program: Program as a string or iterable of strings that will be
-        concatenated.
+        concatenated. Prepared programs are supported as in ``run_clingo``.
     :return: Whether the program is satisfiable.
     """
     try:
@@ -129,3 +988,15 @@ def is_satisfiable(program: str | Iterable[str]) -> bool:
         return True
     except StopIteration:
         return False
+
+
+async def is_satisfiable_async(program: ProgramPart | Iterable[ProgramPart]) -> bool:
+    """Checks whether the program is satisfiable without blocking the event loop.
+
+    :param program: Program as in ``is_satisfiable``.
+    :return: Whether the program is satisfiable.
+    """
+    async with aclosing(run_clingo_async(program, 1)) as models:
+        async for _ in models:
+            return True
+    return False
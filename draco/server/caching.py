@@ -0,0 +1,127 @@
+import hashlib
+import json
+from typing import Callable, Coroutine
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.responses import StreamingResponse
+
+from draco import Draco
+from draco.result_cache import ResultCache
+from draco.server.encoding import negotiate
+
+
+def configuration_hash(draco: Draco) -> str:
+    """
+    Hash the programs and weights of a :code:`Draco` instance, so that responses
+    computed with another configuration are not reused.
+
+    :param draco: the :code:`Draco` instance.
+    :return: the hex digest of the configuration, see
+        :code:`Draco.configuration_hash`.
+    """
+    return draco.configuration_hash
+
+
+def canonical_body(body: bytes) -> str:
+    """
+    Serialize a JSON request body with sorted keys and without whitespace, so
+    that equal requests map to the same cache entry.
+
+    :param body: the raw request body.
+    :return: the canonical JSON text.
+    :raises ValueError: if the body is not JSON.
+    """
+    return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+
+
+def etag(content: bytes) -> str:
+    """
+    Compute the strong entity tag of a response body.
+
+    :param content: the response body.
+    :return: the quoted entity tag.
+    """
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def _matches(if_none_match: str | None, tag: str) -> bool:
+    if if_none_match is None:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or tag in tags
+
+
+# the methods whose cached responses can be revalidated with `If-None-Match`
+_SAFE_METHODS = ("GET", "HEAD")
+
+
+def cached_route(cache: ResultCache, draco: Draco) -> type[APIRoute]:
+    """
+    Create a route class that caches the responses of deterministic endpoints.
+
+    Responses are keyed by the path, the canonical request body (the query of
+    :code:`GET` and :code:`HEAD` requests), the configuration hash of the
+    :code:`Draco` instance and the encoding the :code:`Accept` header
+    negotiates, see :code:`draco.server.encoding`. They carry a strong
+    :code:`ETag`. :code:`GET` and :code:`HEAD` requests whose
+    :code:`If-None-Match` header lists it are answered with
+    :code:`304 Not Modified` and no body. Other requests, such as the
+    :code:`POST` requests of the Draco endpoints, always get the cached
+    response, because RFC 9110 does not allow :code:`304 Not Modified` for
+    them and a :code:`412 Precondition Failed` would leave the client without
+    a result. Only successful, non-streaming responses are cached.
+
+    :param cache: the store of the responses, bounded by its memory.
+    :param draco: the :code:`Draco` instance whose configuration the responses
+        depend on.
+    :return: the route class to declare the endpoints with.
+    """
+
+    class CachedRoute(APIRoute):
+        def get_route_handler(
+            self,
+        ) -> Callable[[Request], Coroutine[None, None, Response]]:
+            handler = super().get_route_handler()
+
+            async def cached_handler(request: Request) -> Response:
+                if request.method in _SAFE_METHODS:
+                    body = str(request.query_params)
+                else:
+                    try:
+                        body = canonical_body(await request.body())
+                    except ValueError:
+                        # let the validation of the endpoint report the error
+                        return await handler(request)
+
+                encoding = negotiate(request.headers.get("accept"))
+                key = (
+                    "response",
+                    request.url.path,
+                    configuration_hash(draco),
+                    body,
+                    encoding.media_type,
+                    encoding.form,
+                )
+                entry = cache.get(key)
+                if entry is None:
+                    response = await handler(request)
+                    if response.status_code != 200 or isinstance(
+                        response, StreamingResponse
+                    ):
+                        return response
+                    content = bytes(response.body)
+                    entry = (content, response.media_type, etag(content))
+                    cache.put(key, entry)
+
+                content, media_type, tag = entry
+                headers = {"ETag": tag, "Vary": "Accept"}
+                if request.method in _SAFE_METHODS and _matches(
+                    request.headers.get("if-none-match"), tag
+                ):
+                    return Response(status_code=304, headers=headers)
+                return Response(content, media_type=media_type, headers=headers)
+
+            return cached_handler
+
+    return CachedRoute
@@ -0,0 +1,97 @@
+import asyncio
+from typing import Awaitable, TypeVar, cast
+
+from fastapi import HTTPException, Request
+
+T = TypeVar("T")
+
+# the header with the timeout of a request in seconds
+TIMEOUT_HEADER = "X-Request-Timeout"
+
+
+class RequestCancelledError(HTTPException):
+    """
+    Raised when the solver work of a request is cancelled before it finished.
+    The :code:`reason` is :code:`"disconnect"` or :code:`"deadline"`.
+    """
+
+    reason: str
+
+
+class ClientDisconnectedError(RequestCancelledError):
+    """Raised when the client closed the connection before the response."""
+
+    reason = "disconnect"
+
+    def __init__(self):
+        # the status that proxies such as nginx log for such requests, it is
+        # never sent since the client is gone
+        super().__init__(status_code=499, detail="The client closed the connection.")
+
+
+class DeadlineExceededError(RequestCancelledError):
+    """
+    Raised when a request did not finish within its timeout, which FastAPI
+    answers with :code:`504 Gateway Timeout`.
+    """
+
+    reason = "deadline"
+
+    def __init__(self, timeout: float):
+        super().__init__(
+            status_code=504,
+            detail=f"The request did not finish within {timeout:g} seconds.",
+        )
+
+
+def request_timeout(*timeouts: float | None) -> float | None:
+    """
+    Combine the timeouts of a request, such as those of its header and body.
+
+    :param timeouts: the timeouts in seconds, None for no timeout.
+    :return: the shortest timeout, or None if there is none.
+    """
+    return min((t for t in timeouts if t is not None), default=None)
+
+
+async def _disconnected(request: Request):
+    # once the body is read, the next message tells that the client is gone
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancellable(
+    request: Request, work: Awaitable[T], timeout: float | None = None
+) -> T:
+    """
+    Await the solver work of a request, and cancel it if the client disconnects
+    or the timeout passes first. Cancelling closes the solves of the work, which
+    stops clingo and frees the solver of the executor.
+
+    :param request: the request, whose body has already been read.
+    :param work: the solver work of the request.
+    :param timeout: the seconds the work may take, None for no timeout.
+    :return: the result of the work.
+    :raises ClientDisconnectedError: if the client disconnected.
+    :raises DeadlineExceededError: if the timeout passed.
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_disconnected(request))
+    try:
+        done, _ = await asyncio.wait(
+            {task, watcher}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+            # wait for the solves to stop, without raising their cancellation
+            await asyncio.wait({task})
+
+    if task in done:
+        return task.result()
+    if watcher in done:
+        raise ClientDisconnectedError()
+    raise DeadlineExceededError(cast(float, timeout))
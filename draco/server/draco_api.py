@@ -1,7 +1,18 @@
 from fastapi import FastAPI
 
 import draco.server.routers as routers
-from draco import Draco
+from draco import Draco, dict_to_facts
+from draco.pool import _warm_up
+from draco.result_cache import ResultCache
+from draco.server.executor import SolverExecutor
+from draco.server.metrics import Metrics
+
+# a specification that exercises all parts of the knowledge base
+WARM_UP_SPEC = {
+    "number_rows": 100,
+    "field": [{"name": "temperature", "type": "number"}],
+    "view": [{"mark": [{"encoding": [{"field": "temperature"}]}]}],
+}
 
 
 class DracoAPI:
@@ -17,6 +28,11 @@ class DracoAPI:
         draco: Draco = Draco(),
         app: FastAPI = FastAPI(),
         base_routers: list[routers.BaseDracoRouter] | None = None,
+        executor: SolverExecutor | None = None,
+        response_cache: ResultCache | None = None,
+        cache_responses: bool = True,
+        metrics: Metrics | None = None,
+        collect_metrics: bool = True,
     ):
         """
         Creates a new :code:`DracoAPI` instance. If no parameters are passed in,
@@ -30,6 +46,7 @@ class DracoAPI:
         - :code:`ClingoRouter` - exposes the functionality of the Clingo solver
         - :code:`RendererRouter` - exposes renderer functionality
         - :code:`UtilityRouter` - exposes various utility endpoints
+        - :code:`MetricsRouter` - exposes the telemetry of the server
 
         If you wish to enable only a subset of these endpoints,
         you can pass in a list of routers to the :code:`base_routers` parameter.
@@ -67,9 +84,38 @@ class DracoAPI:
                     according to your needs.
         :param base_routers: Routers to be used by the server,
                              defining the actual endpoints.
+        :param executor: The executor running the solver work of the routers,
+                         which limits the number of concurrent solves and
+                         the number of requests waiting for one. Requests
+                         beyond that fail with :code:`503 Service Unavailable`.
+                         Defaults to a thread executor with one solver per CPU.
+                         Routers constructed without an executor share it.
+        :param response_cache: The store of the responses of the deterministic
+                               endpoints, such as :code:`/draco/check-spec`.
+                               Repeated requests are answered from the store
+                               and carry an :code:`ETag`, see
+                               :code:`draco.server.caching.cached_route`.
+                               Defaults to a store of 64 MiB. Routers
+                               constructed without a store share it.
+        :param cache_responses: Whether to cache responses at all.
+        :param metrics: The metrics recording the latency of the requests and
+                        the statistics of their solver calls, which
+                        :code:`MetricsRouter` publishes at :code:`/metrics`.
+                        Defaults to new metrics. Routers constructed
+                        without metrics share them.
+        :param collect_metrics: Whether to record metrics at all. Without
+                                metrics, the default routers leave out
+                                :code:`MetricsRouter`.
         """
         self.draco = draco
         self.app = app
+        self.executor = executor or SolverExecutor(draco)
+        self.response_cache: ResultCache | None = None
+        if cache_responses:
+            self.response_cache = response_cache or ResultCache()
+        self.metrics: Metrics | None = None
+        if collect_metrics:
+            self.metrics = metrics or Metrics()
 
         # Creating the base routers if none were passed in
         if base_routers is None:
@@ -83,6 +129,8 @@ class DracoAPI:
                 renderer_router,
                 utility_router,
             ]
+            if self.metrics is not None:
+                self.base_routers.append(routers.MetricsRouter(draco))
         else:
             self.base_routers = base_routers
 
@@ -95,5 +143,25 @@ class DracoAPI:
 
         # Actually register the routers
         for router in self.base_routers:
+            if router.executor is None:
+                router.executor = self.executor
+            if router.response_cache is None:
+                router.response_cache = self.response_cache
+            if router.metrics is None:
+                router.metrics = self.metrics
             router.register()
             self.app.include_router(router)
+
+    def warm_up(self):
+        """
+        Parse the knowledge bases and solve a small specification with every
+        method of :code:`Draco`, so that the first requests to the server are
+        as fast as the later ones. Workers forked afterwards share the parsed
+        knowledge bases.
+        """
+        _warm_up(self.draco)
+        spec = dict_to_facts(WARM_UP_SPEC)
+        self.draco.check_spec(spec)
+        self.draco.count_preferences(spec)
+        self.draco.get_violations(spec)
+        list(self.draco.complete_spec(spec))
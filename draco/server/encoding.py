@@ -0,0 +1,134 @@
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import Response
+
+from draco.server.models.shared import AnswerSetForm
+
+try:
+    # serializes several times faster than the json module
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+COMPACT_JSON_MEDIA_TYPE = "application/vnd.draco.compact+json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# the media types that accept the default encoding
+_JSON_MEDIA_TYPES = (JSON_MEDIA_TYPE, "application/*", "*/*")
+
+# documents the compact encodings of endpoints with answer sets
+ANSWER_SET_RESPONSES: dict[int | str, dict[str, Any]] = {
+    200: {"content": {COMPACT_JSON_MEDIA_TYPE: {}, MSGPACK_MEDIA_TYPE: {}}}
+}
+
+
+@dataclass(frozen=True)
+class Encoding:
+    """Class for the encoding of a response with answer sets.
+
+    Attributes:
+        :media_type: The media type of the response body.
+        :form: The form of the answer sets, see
+            ``draco.server.utils.ModelEncoder``.
+    """
+
+    media_type: str
+    form: AnswerSetForm
+
+
+DEFAULT_ENCODING = Encoding(JSON_MEDIA_TYPE, "symbols")
+
+
+def _parameters(parts: list[str]) -> dict[str, str]:
+    parameters = {}
+    for part in parts:
+        name, _, value = part.partition("=")
+        parameters[name.strip().lower()] = value.strip().strip('"')
+    return parameters
+
+
+def negotiate(accept: str | None) -> Encoding:
+    """
+    Choose the encoding of a response with answer sets from the :code:`Accept`
+    header of the request.
+
+    Clients that accept :code:`application/vnd.draco.compact+json` or, if
+    :code:`msgpack` is installed, :code:`application/msgpack` get answer sets
+    as lists of facts, or as specification dictionaries with the media type
+    parameter :code:`answer-set=spec`. Other clients get the default JSON
+    encoding with typed symbols. The media type with the highest quality wins,
+    and the first one among equals.
+
+    :param accept: the :code:`Accept` header of the request.
+    :return: the encoding of the response.
+    """
+    if accept is None:
+        return DEFAULT_ENCODING
+
+    best, best_quality = DEFAULT_ENCODING, 0.0
+    for item in accept.split(","):
+        media_type, *parts = item.split(";")
+        media_type = media_type.strip().lower()
+        parameters = _parameters(parts)
+
+        if media_type == COMPACT_JSON_MEDIA_TYPE or (
+            media_type == MSGPACK_MEDIA_TYPE and msgpack is not None
+        ):
+            form: AnswerSetForm = (
+                "spec" if parameters.get("answer-set") == "spec" else "facts"
+            )
+            candidate = Encoding(media_type, form)
+        elif media_type in _JSON_MEDIA_TYPES:
+            candidate = DEFAULT_ENCODING
+        else:
+            continue
+
+        try:
+            quality = float(parameters.get("q", 1))
+        except ValueError:
+            continue
+        if quality > best_quality:
+            best, best_quality = candidate, quality
+    return best
+
+
+def encode(content: Any, encoding: Encoding) -> bytes:
+    """
+    Serialize the content of a response without validating it against the
+    response model of its endpoint. JSON is serialized with :code:`orjson` if
+    it is installed.
+
+    :param content: the JSON-serializable content.
+    :param encoding: the negotiated encoding.
+    :return: the response body.
+    """
+    if encoding.media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(content)
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def encoded_response(content: Any, encoding: Encoding) -> Response:
+    """
+    Create the response of an endpoint with answer sets in the negotiated
+    encoding, see :code:`negotiate`.
+
+    :param content: the JSON-serializable content, whose answer sets already
+        have the form of the encoding.
+    :param encoding: the negotiated encoding.
+    :return: the response.
+    """
+    return Response(
+        encode(content, encoding),
+        media_type=encoding.media_type,
+        headers={"Vary": "Accept"},
+    )
@@ -0,0 +1,310 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from functools import partial
+from multiprocessing.context import BaseContext
+from typing import Any, AsyncIterator, Callable, Iterator, Literal
+
+import anyio
+from fastapi import HTTPException
+
+from draco import Draco, profiling
+from draco.pool import (
+    _apply,
+    _call,
+    _check_method,
+    _draco_arguments,
+    _init_worker,
+    _warm_up,
+)
+from draco.run import Budget
+
+ExecutorKind = Literal["thread", "process"]
+
+
+# the flags with which the executor cancels the calls of a worker process, one
+# per solver
+_worker_cancelled: Any = None
+
+
+def _init_solver_worker(draco: Draco | dict[str, Any], cancelled: Any):
+    global _worker_cancelled
+    _init_worker(draco)
+    _worker_cancelled = cancelled
+
+
+def _flag(flags: Any, index: int) -> bool:
+    return bool(flags[index])
+
+
+def _cancellable(
+    kwargs: dict[str, Any], cancelled: Callable[[], bool]
+) -> dict[str, Any]:
+    """Make a call that takes a budget stop its search once it is cancelled."""
+    if "budget" not in kwargs:
+        return kwargs
+    budget = kwargs["budget"] or Budget()
+    return kwargs | {"budget": replace(budget, cancelled=cancelled)}
+
+
+def _call_in_worker(
+    collect: bool,
+    index: int,
+    method: str | Callable[..., Any],
+    kwargs: dict[str, Any],
+    item: Any,
+) -> tuple[Any, list[profiling.Statistics]]:
+    """Call a method in a worker process, which stops its search once the flag
+    of its solver is set, and return the statistics of its solver calls along
+    with the result if the caller collects them."""
+    kwargs = _cancellable(kwargs, partial(_flag, _worker_cancelled, index))
+    if not collect:
+        return _call(method, kwargs, item), []
+    with profiling.profile() as profile:
+        result = _call(method, kwargs, item)
+    return result, profile.calls
+
+
+class ServerOverloadedError(HTTPException):
+    """
+    Raised when the solver executor of the server already runs and queues as
+    many requests as it may, which FastAPI answers with :code:`503 Service
+    Unavailable` and a :code:`Retry-After` header.
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail="The server is busy solving other requests, try again later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class SolverExecutor:
+    """
+    Runs the solver work of the server on a bounded number of threads or
+    processes, so that the event loop stays responsive and the number of
+    concurrent solves is limited.
+
+    Requests beyond :code:`max_concurrency` wait in a queue of at most
+    :code:`max_queue` requests. When the queue is full, further requests fail
+    right away with :code:`ServerOverloadedError`, so that the latency of the
+    accepted requests stays predictable under load.
+
+    The pool of workers starts with :code:`start`, or otherwise with the first
+    call, so the settings can be changed until then, for example from the
+    command line options.
+    """
+
+    def __init__(
+        self,
+        draco: Draco,
+        kind: ExecutorKind = "thread",
+        max_concurrency: int | None = None,
+        max_queue: int = 32,
+        retry_after: int = 1,
+    ):
+        """
+        :param draco: The :code:`Draco` instance to solve with. Worker processes
+            use a copy of it.
+        :param kind: Whether to solve in threads or in worker processes, which
+            also use more than one core for the grounding.
+        :param max_concurrency: The number of requests to solve at once.
+            Defaults to the number of CPUs.
+        :param max_queue: The number of requests that may wait for a solver.
+        :param retry_after: The seconds after which clients should retry
+            rejected requests.
+        """
+        self.draco = draco
+        self.kind = kind
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        # the requests that hold a solver, and those that wait for one
+        self.running = 0
+        self.waiting = 0
+        self._pool: Executor | None = None
+        self._slots: anyio.Semaphore | None = None
+        # one flag per solver to cancel the call it runs, and the free flags
+        self._cancelled: Any = None
+        self._free: list[int] = []
+
+    def _start(self) -> tuple[Executor, anyio.Semaphore]:
+        if self.max_concurrency < 1:
+            raise ValueError("The executor needs at least one solver.")
+        if self.max_queue < 0:
+            raise ValueError("The queue cannot hold a negative number of requests.")
+
+        pool: Executor
+        cancelled: Any
+        if self.kind == "thread":
+            pool = ThreadPoolExecutor(
+                self.max_concurrency, thread_name_prefix="draco-solver"
+            )
+            cancelled = bytearray(self.max_concurrency)
+        elif self.kind == "process":
+            # as in `DracoPool`, forked workers share the parsed knowledge bases
+            if "fork" in multiprocessing.get_all_start_methods():
+                _warm_up(self.draco)
+                context: BaseContext = multiprocessing.get_context("fork")
+                initargs: tuple = (self.draco,)
+            else:  # pragma: no cover
+                context = multiprocessing.get_context()
+                initargs = (_draco_arguments(self.draco),)
+            # shared memory, which the workers inherit
+            cancelled = context.RawArray("b", self.max_concurrency)
+            pool = ProcessPoolExecutor(
+                self.max_concurrency,
+                mp_context=context,
+                initializer=_init_solver_worker,
+                initargs=initargs + (cancelled,),
+            )
+        else:
+            raise ValueError(f"Unknown kind of executor {self.kind!r}.")
+
+        self._pool = pool
+        self._slots = anyio.Semaphore(self.max_concurrency)
+        self._cancelled = cancelled
+        self._free = list(range(self.max_concurrency))
+        return pool, self._slots
+
+    async def _acquire(self) -> anyio.Semaphore:
+        if self._slots is None:
+            self._start()
+        slots = self._slots
+        assert slots is not None
+
+        if self.running + self.waiting >= self.max_concurrency + self.max_queue:
+            raise ServerOverloadedError(self.retry_after)
+
+        self.waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        return slots
+
+    def _release(self, slots: anyio.Semaphore):
+        self.running -= 1
+        slots.release()
+
+    def start(self):
+        """
+        Start the pool of workers, unless it is already running.
+
+        Servers start the pool before they serve requests, because worker
+        processes that are forked later, from a process that already runs the
+        threads of the server, may inherit locks that those threads hold and
+        deadlock.
+        """
+        if self._pool is not None:
+            return
+        pool, _ = self._start()
+        if self.kind == "process":
+            # the first task starts the workers
+            pool.submit(os.getpid).result()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Wait for one of the :code:`max_concurrency` solvers, for work that runs
+        on the event loop, such as streamed completions.
+
+        :raises ServerOverloadedError: if the queue of waiting requests is full.
+        """
+        slots = await self._acquire()
+        try:
+            yield
+        finally:
+            self._release(slots)
+
+    async def call(self, method: str | Callable[..., Any], item: Any, **kwargs) -> Any:
+        """
+        Call a method of :code:`Draco` in a worker once a solver is free.
+
+        Cancelling the call stops the search of methods that take a
+        :code:`budget`, such as :code:`complete_spec`, also in worker
+        processes. The solver stays taken until the worker has finished, so
+        that the limits of the executor count the work that actually runs.
+
+        :param method: The name of the :code:`Draco` method to call, or a
+            function that is called with the :code:`Draco` instance and the
+            item, as in :code:`DracoPool.map`. Functions must be picklable to
+            run in worker processes.
+        :param item: The spec, or the item for a function.
+        :param kwargs: Further arguments to the method.
+        :return: The result. The completions of :code:`complete_spec` are a
+            list of models.
+        :raises ServerOverloadedError: if the queue of waiting requests is full.
+        """
+        _check_method(method)
+        slots = await self._acquire()
+        loop = asyncio.get_running_loop()
+        # every running call has a solver, and so a free flag
+        cancelled, free = self._cancelled, self._free
+        index = free.pop()
+        cancelled[index] = 0
+
+        def release():
+            free.append(index)
+            self._release(slots)
+
+        try:
+            if self.kind == "process":
+                # specs that pydantic validated are iterators, which cannot be
+                # sent to workers
+                if isinstance(item, Iterator):
+                    item = list(item)
+                collect = profiling.enabled()
+                work = partial(_call_in_worker, collect, index, method, kwargs, item)
+            else:
+                # threads see the context of the request, such as its profiles
+                context = contextvars.copy_context()
+                kwargs = _cancellable(kwargs, partial(_flag, cancelled, index))
+                work = partial(context.run, _apply, self.draco, method, kwargs, item)
+            assert self._pool is not None
+            future = self._pool.submit(work)
+        except BaseException:
+            release()
+            raise
+
+        def done(_: Future):
+            try:
+                loop.call_soon_threadsafe(release)
+            except RuntimeError:
+                # the event loop has closed, so nothing waits for the solver
+                release()
+
+        future.add_done_callback(done)
+        try:
+            # cancelling the call cancels the work if it has not started yet
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # and otherwise stops the search of the worker
+            cancelled[index] = 1
+            raise
+        if self.kind == "process":
+            # report the statistics of the worker to the profiles and callbacks
+            # of the request
+            result, calls = result
+            for statistics in calls:
+                profiling.report(statistics)
+        return result
+
+    def shutdown(self):
+        """Stop the workers once they have finished their work."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._slots = None
+            self._cancelled = None
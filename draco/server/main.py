@@ -1,4 +1,7 @@
 import argparse
+import os
+import signal
+import traceback
 
 import uvicorn
 
@@ -12,11 +15,24 @@ class DracoServerArgs(argparse.Namespace):
     host: str
     port: int
     reload: bool
+    workers: int
     show_routes: bool
+    executor: str
+    max_concurrency: int | None
+    max_queue: int
+    response_cache_size: int
 
 
 __DEFAULT_ARGS__ = DracoServerArgs(
-    host="127.0.0.1", port=8000, reload=False, show_routes=False
+    host="127.0.0.1",
+    port=8000,
+    reload=False,
+    workers=1,
+    show_routes=False,
+    executor="thread",
+    max_concurrency=None,
+    max_queue=32,
+    response_cache_size=64,
 )
 
 
@@ -53,6 +69,46 @@ def argument_parser() -> argparse.ArgumentParser:
         default=__DEFAULT_ARGS__.reload,
         help="Enable auto-reloading of the server on code changes.",
     )
+    run_group.add_argument(
+        "--workers",
+        type=int,
+        default=__DEFAULT_ARGS__.workers,
+        help="Number of worker processes, forked after loading the knowledge base. "
+        f"Defaults to {__DEFAULT_ARGS__.workers}",
+    )
+
+    # Options related to the solver work of the endpoints
+    solver_group = parser.add_argument_group(
+        "Solver Options", "Options related to the solver work of the endpoints"
+    )
+    solver_group.add_argument(
+        "--executor",
+        choices=["thread", "process"],
+        default=__DEFAULT_ARGS__.executor,
+        help="Solve in threads or in worker processes. "
+        f"Defaults to {__DEFAULT_ARGS__.executor}",
+    )
+    solver_group.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=__DEFAULT_ARGS__.max_concurrency,
+        help="Number of requests to solve at once. Defaults to the number of CPUs",
+    )
+    solver_group.add_argument(
+        "--max-queue",
+        type=int,
+        default=__DEFAULT_ARGS__.max_queue,
+        help="Number of requests that may wait for a solver, further requests "
+        f"fail with 503. Defaults to {__DEFAULT_ARGS__.max_queue}",
+    )
+
+    solver_group.add_argument(
+        "--response-cache-size",
+        type=int,
+        default=__DEFAULT_ARGS__.response_cache_size,
+        help="MiB of responses of deterministic endpoints to cache, 0 disables "
+        f"the cache. Defaults to {__DEFAULT_ARGS__.response_cache_size}",
+    )
 
     # Options related to the server utilities
     utility_group = parser.add_mutually_exclusive_group()
@@ -66,6 +122,56 @@ def argument_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def serve_workers(draco_api: DracoAPI, args: DracoServerArgs):
+    """
+    Serve the API from worker processes that share a listening socket.
+
+    The workers are forked from this process after it has loaded and warmed up
+    the knowledge base, so that they share it instead of each loading it again.
+    Every worker warms up once more and starts its own solver executor before
+    it starts to accept connections, so that no request waits for a cold
+    worker. Stopping this process stops the
+    workers.
+
+    :param draco_api: the DracoAPI object to serve, warmed up.
+    :param args: the host, port and number of workers to serve with.
+    """
+    if not hasattr(os, "fork"):  # pragma: no cover
+        raise RuntimeError("Running several workers needs a platform that can fork.")
+
+    config = uvicorn.Config(draco_api.app, host=args.host, port=args.port)
+    sock = config.bind_socket()
+
+    pids = []
+    for _ in range(args.workers):
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            code = 0
+            try:
+                draco_api.warm_up()
+                draco_api.executor.start()
+                uvicorn.Server(config).run(sockets=[sock])
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        pids.append(pid)
+    sock.close()
+
+    def stop(signum, frame):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+
 def main(
     draco_api: DracoAPI | None = None,
     args: DracoServerArgs = __DEFAULT_ARGS__,
@@ -78,10 +184,35 @@ def main(
     """
     used_draco_api = draco_api or DracoAPI()
 
+    # the workers of the executor start once the server is warmed up
+    executor = used_draco_api.executor
+    executor.kind = getattr(args, "executor", executor.kind)
+    executor.max_concurrency = (
+        getattr(args, "max_concurrency", None) or executor.max_concurrency
+    )
+    executor.max_queue = getattr(args, "max_queue", executor.max_queue)
+    cache = used_draco_api.response_cache
+    if cache is not None and hasattr(args, "response_cache_size"):
+        # a store of 0 bytes caches nothing
+        cache.max_bytes = args.response_cache_size * 2**20
+
     if args.show_routes:
         print(utils.tabulate_routes(used_draco_api.app))
         return
 
+    # load the knowledge base before serving, so that the first requests
+    # after a start are not slower than the others
+    used_draco_api.warm_up()
+
+    workers = getattr(args, "workers", 1)
+    if workers > 1:
+        if args.reload:
+            raise ValueError("The server cannot reload with several workers.")
+        serve_workers(used_draco_api, args)
+        return
+
+    # start the solver workers before the server starts its threads
+    executor.start()
     uvicorn.run(
         used_draco_api.app,
         host=args.host,
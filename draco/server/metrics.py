@@ -0,0 +1,340 @@
+import threading
+import time
+from typing import Any, Callable, Coroutine, Iterable, Mapping
+
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+from draco import profiling
+from draco.server.cancellation import RequestCancelledError
+from draco.server.executor import SolverExecutor
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# the default buckets of Prometheus clients, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# the number of ground rules of Draco's programs range from thousands to millions
+RULE_BUCKETS = (1e3, 1e4, 3e4, 1e5, 3e5, 1e6, 3e6, 1e7)
+
+
+# the gauges of a `SolverExecutor`, by the attributes they read
+_EXECUTOR_GAUGES = (
+    ("draco_solves_in_flight", "Requests that hold a solver.", "running"),
+    ("draco_solve_queue_depth", "Requests that wait for a solver.", "waiting"),
+    ("draco_solve_max_concurrency", "Number of solvers.", "max_concurrency"),
+)
+# the metrics of the statistics of a cache, by the attributes they read
+_CACHE_METRICS = (
+    ("draco_cache_hits_total", "counter", "Lookups that found an entry.", "hits"),
+    ("draco_cache_misses_total", "counter", "Lookups that found no entry.", "misses"),
+    ("draco_cache_hit_ratio", "gauge", "Share of lookups that were hits.", "hit_rate"),
+    ("draco_cache_entries", "gauge", "Entries the cache holds.", "size"),
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _sample(
+    name: str, labels: Mapping[str, str], value: float, suffix: str = ""
+) -> str:
+    text = ",".join(f'{key}="{_escape(str(v))}"' for key, v in labels.items())
+    number = "+Inf" if value == float("inf") else repr(float(value))
+    return f"{name}{suffix}{{{text}}} {number}" if text else f"{name}{suffix} {number}"
+
+
+def _header(name: str, kind: str, documentation: str) -> list[str]:
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+
+
+class Counter:
+    """A family of counters with the same labels, in Prometheus terms."""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...]):
+        """
+        :param name: the name of the metric, ending in :code:`_total`.
+        :param documentation: the help text of the metric.
+        :param labels: the names of the labels of the counters.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple[str, ...], amount: float = 1):
+        """
+        Increase the counter with the given label values.
+
+        :param labels: the values of the labels, in the order of :code:`labels`.
+        :param amount: the non-negative amount to add.
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        """The lines of the counters in the Prometheus text format."""
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = _header(self.name, "counter", self.documentation)
+        for labels, value in values:
+            lines.append(_sample(self.name, dict(zip(self.labels, labels)), value))
+        return lines
+
+
+class Histogram:
+    """A family of histograms with the same labels and buckets."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...],
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        """
+        :param name: the name of the metric.
+        :param documentation: the help text of the metric.
+        :param labels: the names of the labels of the histograms.
+        :param buckets: the increasing upper bounds of the buckets, without
+            the implicit :code:`+Inf` bucket.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # the counts per bucket (not cumulative), followed by the sum
+        self._values: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple[str, ...], value: float):
+        """
+        Record an observation in the histogram with the given label values.
+
+        :param labels: the values of the labels, in the order of :code:`labels`.
+        :param value: the observed value.
+        """
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            values = self._values.get(labels)
+            if values is None:
+                values = self._values[labels] = [0.0] * (len(self.buckets) + 1)
+            values[index] += 1
+            values[-1] += value
+
+    def render(self) -> list[str]:
+        """The lines of the histograms in the Prometheus text format."""
+        with self._lock:
+            histograms = sorted(
+                (key, list(values)) for key, values in self._values.items()
+            )
+        lines = _header(self.name, "histogram", self.documentation)
+        for labels, values in histograms:
+            names = dict(zip(self.labels, labels))
+            count = 0.0
+            for bound, n in zip(self.buckets, values):
+                count += n
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(_sample(self.name, names | {"le": le}, count, "_bucket"))
+            lines.append(_sample(self.name, names, values[-1], "_sum"))
+            lines.append(_sample(self.name, names, count, "_count"))
+        return lines
+
+
+class Metrics:
+    """
+    Collects the operational telemetry of a Draco server in memory and renders
+    it in the Prometheus text format, without any external service.
+
+    Routers with metrics time their requests, and attribute the statistics of
+    the solver calls of a request (see :code:`draco.profiling`) to its route.
+    """
+
+    def __init__(self, latency_buckets: Iterable[float] = LATENCY_BUCKETS):
+        """
+        :param latency_buckets: the upper bounds of the buckets of the request
+            and solve time histograms, in seconds.
+        """
+        self.requests = Histogram(
+            "draco_request_duration_seconds",
+            "Time to answer a request.",
+            ("method", "route", "status"),
+            latency_buckets,
+        )
+        self.cancellations = Counter(
+            "draco_request_cancellations_total",
+            "Requests whose solver work was cancelled, by disconnect or deadline.",
+            ("route", "reason"),
+        )
+        self.solver_calls = Counter(
+            "draco_solver_calls_total",
+            "Solver calls of the requests to a route.",
+            ("route", "call"),
+        )
+        self.solve_seconds = Histogram(
+            "draco_solver_solve_seconds",
+            "Time clingo reports for solving a call.",
+            ("route",),
+            latency_buckets,
+        )
+        self.phase_seconds = Counter(
+            "draco_solver_phase_seconds_total",
+            "Time solver calls spent in each phase.",
+            ("route", "phase"),
+        )
+        self.ground_rules = Histogram(
+            "draco_solver_ground_rules",
+            "Number of ground rules of a call.",
+            ("route",),
+            RULE_BUCKETS,
+        )
+        self.ground_atoms = Counter(
+            "draco_solver_ground_atoms_total",
+            "Number of ground atoms of the calls.",
+            ("route",),
+        )
+        self.conflicts = Counter(
+            "draco_solver_conflicts_total",
+            "Conflicts of the solver in the calls.",
+            ("route",),
+        )
+        self.choices = Counter(
+            "draco_solver_choices_total",
+            "Choices of the solver in the calls.",
+            ("route",),
+        )
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        """
+        Record the latency of a request.
+
+        :param method: the HTTP method of the request.
+        :param route: the path of the route, with its parameters as templates.
+        :param status: the status code of the response.
+        :param seconds: the time to answer the request.
+        """
+        self.requests.observe((method, route, str(status)), seconds)
+
+    def observe_cancellation(self, route: str, reason: str):
+        """
+        Record that the solver work of a request was cancelled.
+
+        :param route: the path of the route of the request.
+        :param reason: why the work was cancelled, see
+            :code:`draco.server.cancellation.RequestCancelledError`.
+        """
+        self.cancellations.inc((route, reason))
+
+    def observe_solver(self, route: str, statistics: profiling.Statistics):
+        """
+        Record the statistics of a solver call of a request.
+
+        :param route: the path of the route of the request.
+        :param statistics: the statistics of the finished call.
+        """
+        key = (route,)
+        self.solver_calls.inc((route, statistics.method))
+        self.solve_seconds.observe(key, statistics.solve_time)
+        self.ground_rules.observe(key, statistics.rules)
+        self.ground_atoms.inc(key, statistics.atoms)
+        self.conflicts.inc(key, statistics.conflicts)
+        self.choices.inc(key, statistics.choices)
+        for phase, seconds in statistics.timings.items():
+            self.phase_seconds.inc((route, phase), seconds)
+
+    def render(
+        self,
+        executor: SolverExecutor | None = None,
+        caches: Mapping[str, Any] | None = None,
+    ) -> str:
+        """
+        Render the metrics in the Prometheus text format.
+
+        :param executor: the executor whose in-flight solves and queue depth to
+            report.
+        :param caches: the caches whose hit rates to report by name, such as
+            :code:`ResultCache` and :code:`ProgramCache` instances. Caches that
+            are None are left out.
+        :return: the text of the metrics.
+        """
+        lines: list[str] = []
+        for family in (
+            self.requests,
+            self.cancellations,
+            self.solver_calls,
+            self.solve_seconds,
+            self.phase_seconds,
+            self.ground_rules,
+            self.ground_atoms,
+            self.conflicts,
+            self.choices,
+        ):
+            lines.extend(family.render())
+
+        if executor is not None:
+            for name, documentation, attribute in _EXECUTOR_GAUGES:
+                lines.extend(_header(name, "gauge", documentation))
+                lines.append(_sample(name, {}, getattr(executor, attribute)))
+
+        stats = {
+            name: cache.stats
+            for name, cache in (caches or {}).items()
+            if cache is not None
+        }
+        if stats:
+            for name, kind, documentation, attribute in _CACHE_METRICS:
+                lines.extend(_header(name, kind, documentation))
+                for cache, values in sorted(stats.items()):
+                    value = getattr(values, attribute)
+                    lines.append(_sample(name, {"cache": cache}, value))
+
+        return "\n".join(lines) + "\n"
+
+
+def instrumented_route(
+    metrics: Metrics, base: type[APIRoute] = APIRoute
+) -> type[APIRoute]:
+    """
+    Create a route class that records the latency of the requests to its routes
+    and the statistics of their solver calls in the metrics.
+
+    :param metrics: the metrics to record in.
+    :param base: the route class to extend, such as a class from
+        :code:`draco.server.caching.cached_route`.
+    :return: the route class to declare the endpoints with.
+    """
+
+    class InstrumentedRoute(base):  # type: ignore[valid-type, misc]
+        def get_route_handler(
+            self,
+        ) -> Callable[[Request], Coroutine[None, None, Response]]:
+            handler = super().get_route_handler()
+            route = self.path
+
+            async def instrumented_handler(request: Request) -> Response:
+                status = 500
+                start = time.perf_counter()
+                with profiling.profile() as result:
+                    try:
+                        response = await handler(request)
+                        status = response.status_code
+                        return response
+                    except HTTPException as e:
+                        status = e.status_code
+                        if isinstance(e, RequestCancelledError):
+                            metrics.observe_cancellation(route, e.reason)
+                        raise
+                    except RequestValidationError:
+                        status = 422
+                        raise
+                    finally:
+                        seconds = time.perf_counter() - start
+                        metrics.observe_request(request.method, route, status, seconds)
+                        for statistics in result.calls:
+                            metrics.observe_solver(route, statistics)
+
+            return instrumented_handler
+
+    return InstrumentedRoute
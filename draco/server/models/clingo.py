@@ -1,6 +1,6 @@
 from typing import Iterable
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PositiveFloat
 
 from .shared import ClingoModel
 
@@ -12,6 +12,8 @@ class RunClingoDTO(BaseModel):
     models: int = 0
     topK: bool = False
     arguments: list[str] = []
+    # the seconds the solve may take, see `draco.server.cancellation`
+    timeout: PositiveFloat | None = None
 
 
 RunClingoReturn = list[ClingoModel]
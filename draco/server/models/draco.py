@@ -1,6 +1,7 @@
-from typing import DefaultDict
+from typing import DefaultDict, Generic, Literal, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PositiveFloat
+from typing_extensions import TypedDict
 
 from draco.types import Specification
 
@@ -21,6 +22,8 @@ class CompleteSpecDTO(BaseModel):
 
     spec: Specification
     models: int = 1
+    # the seconds the solve may take, see `draco.server.cancellation`
+    timeout: PositiveFloat | None = None
 
 
 CompleteSpecReturn = list[ClingoModel]
@@ -42,3 +45,43 @@ class GetViolationsDTO(BaseModel):
 
 
 GetViolationsReturn = list[str] | None
+
+
+T = TypeVar("T")
+
+
+class BatchItem(TypedDict, Generic[T]):
+    """Result of a single specification of a batch, or the error it raised"""
+
+    index: int
+    result: T | None
+    error: str | None
+
+
+class BatchDTO(BaseModel):
+    """Data Transfer Object to call a method of ``Draco`` on many specifications."""
+
+    specs: list[Specification]
+
+
+class CompleteSpecBatchDTO(BatchDTO):
+    """Data Transfer Object to complete many specifications."""
+
+    models: int = 1
+
+
+CheckSpecBatchReturn = list[BatchItem[CheckSpecReturn]]
+CompleteSpecBatchReturn = list[BatchItem[CompleteSpecReturn]]
+CountPreferencesBatchReturn = list[BatchItem[dict[str, int]]]
+GetViolationsBatchReturn = list[BatchItem[list[str]]]
+
+BatchMethod = Literal[
+    "check_spec", "complete_spec", "count_preferences", "get_violations"
+]
+
+
+class BatchStreamDTO(CompleteSpecBatchDTO):
+    """Data Transfer Object to stream the results of a method of ``Draco`` on
+    many specifications."""
+
+    method: BatchMethod
@@ -1,3 +1,5 @@
+from typing import Any, Literal
+
 from typing_extensions import TypedDict
 
 
@@ -14,3 +16,15 @@ class ClingoModel(TypedDict):
     answer_set: list[ClingoSymbol]
     cost: list[int]
     number: int
+
+
+class CompactModel(TypedDict):
+    """Clingo model whose answer set is a list of facts or a specification"""
+
+    answer_set: list[str] | dict[str, Any]
+    cost: list[int]
+    number: int
+
+
+# the forms of the answer sets of responses, see `draco.server.encoding`
+AnswerSetForm = Literal["symbols", "facts", "spec"]
@@ -1,6 +1,7 @@
 from .base import BaseDracoRouter
 from .clingo import ClingoRouter
 from .draco import DracoRouter
+from .metrics import MetricsRouter
 from .renderer import RendererRouter
 from .utility import UtilityRouter
 
@@ -8,6 +9,7 @@ __all__ = [
     "BaseDracoRouter",
     "ClingoRouter",
     "DracoRouter",
+    "MetricsRouter",
     "RendererRouter",
     "UtilityRouter",
 ]
@@ -1,8 +1,14 @@
 from abc import ABC, abstractmethod
+from typing import Any, Callable
 
 from fastapi import APIRouter
+from fastapi.types import DecoratedCallable
 
 from draco import Draco
+from draco.result_cache import ResultCache
+from draco.server.caching import cached_route
+from draco.server.executor import SolverExecutor
+from draco.server.metrics import Metrics, instrumented_route
 
 
 class BaseDracoRouter(APIRouter, ABC):
@@ -15,15 +21,71 @@ class BaseDracoRouter(APIRouter, ABC):
     <https://fastapi.tiangolo.com/advanced/custom-request-and-route/?h=apiroute>`_
     """
 
-    def __init__(self, draco: Draco, **kwargs):
+    def __init__(
+        self,
+        draco: Draco,
+        executor: SolverExecutor | None = None,
+        response_cache: ResultCache | None = None,
+        metrics: Metrics | None = None,
+        **kwargs,
+    ):
         """
         :param draco: the underlying :code:`Draco` instance
                       to be used by the router endpoints.
+        :param executor: the executor to run the solver work of the endpoints in.
+                         :code:`DracoAPI` shares its own executor with routers
+                         that have none, so that they share a single limit
+                         of concurrent solves.
+        :param response_cache: the store of the responses of the endpoints
+                               declared with :code:`cached_post`.
+                               Defaults to None, meaning that responses
+                               are not cached. :code:`DracoAPI` shares
+                               its own cache with routers that have none.
+        :param metrics: the metrics to record the latency of the requests
+                        and the statistics of their solver calls in.
+                        Defaults to None, meaning that nothing is recorded.
+                        :code:`DracoAPI` shares its own metrics with routers
+                        that have none.
         :param kwargs: keyword arguments to be passed
                        to the :code:`APIRouter` constructor.
         """
         super().__init__(**kwargs)
         self.draco = draco
+        self.executor = executor
+        self.response_cache = response_cache
+        self.metrics = metrics
+
+    def cached_post(
+        self, path: str, **kwargs: Any
+    ) -> Callable[[DecoratedCallable], DecoratedCallable]:
+        """
+        Declare a POST endpoint like :code:`post` does, for endpoints whose
+        responses only depend on the request body and the configuration of
+        the :code:`Draco` instance. If the router has a response cache,
+        their responses are cached and carry an :code:`ETag`,
+        see :code:`draco.server.caching.cached_route`.
+
+        :param path: the path of the endpoint.
+        :param kwargs: keyword arguments to be passed to :code:`add_api_route`.
+        """
+
+        def decorator(endpoint: DecoratedCallable) -> DecoratedCallable:
+            route_class = None
+            if self.response_cache is not None:
+                route_class = cached_route(self.response_cache, self.draco)
+                if self.metrics is not None:
+                    # time the cache hits too
+                    route_class = instrumented_route(self.metrics, route_class)
+            self.add_api_route(
+                path,
+                endpoint,
+                methods=["POST"],
+                route_class_override=route_class,
+                **kwargs,
+            )
+            return endpoint
+
+        return decorator
 
     @staticmethod
     @abstractmethod
@@ -42,5 +104,10 @@ class BaseDracoRouter(APIRouter, ABC):
         """
         Convenience method to register the endpoints of the router
         by calling the :code:`_register` method.
+        Routers registered without an executor get one of their own.
         """
+        if self.executor is None:
+            self.executor = SolverExecutor(self.draco)
+        if self.metrics is not None:
+            self.route_class = instrumented_route(self.metrics, self.route_class)
         self._register(self)
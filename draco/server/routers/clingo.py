@@ -1,6 +1,13 @@
+from typing import Annotated
+
+from fastapi import Header, Request, Response
+from pydantic import PositiveFloat
+
 import draco.server.models.clingo as endpoint_models
 import draco.server.services.clingo as service
 
+from ..cancellation import cancellable, request_timeout
+from ..encoding import ANSWER_SET_RESPONSES, encoded_response, negotiate
 from .base import BaseDracoRouter
 
 
@@ -13,10 +20,11 @@ class ClingoRouter(BaseDracoRouter):
     __DEFAULT_PREFIX__ = "/clingo"
     __DEFAULT_TAGS__ = ["Clingo"]
 
-    def __init__(self, draco, **kwargs):
+    def __init__(self, draco, executor=None, **kwargs):
         c = ClingoRouter
         super().__init__(
             draco,
+            executor,
             prefix=kwargs.pop("prefix", c.__DEFAULT_PREFIX__),
             tags=kwargs.pop("tags", c.__DEFAULT_TAGS__),
             **kwargs,
@@ -24,8 +32,36 @@ class ClingoRouter(BaseDracoRouter):
 
     @staticmethod
     def _register(router: "BaseDracoRouter"):
-        @router.post("/run")
-        def run(dto: endpoint_models.RunClingoDTO) -> endpoint_models.RunClingoReturn:
-            return service.run_clingo(
-                dto.program, dto.models, dto.topK, dto.arguments
-            )  # pragma: no cover
+        @router.post(
+            "/run",
+            response_model=endpoint_models.RunClingoReturn,
+            responses=ANSWER_SET_RESPONSES,
+        )
+        async def run(
+            request: Request,
+            dto: endpoint_models.RunClingoDTO,
+            accept: Annotated[str | None, Header()] = None,
+            x_request_timeout: Annotated[PositiveFloat | None, Header()] = None,
+        ) -> Response:
+            """
+            Runs clingo. Clients that accept
+            :code:`application/vnd.draco.compact+json` or
+            :code:`application/msgpack` get the answer sets as facts,
+            or as decoded dictionaries with :code:`answer-set=spec`.
+
+            The solve stops when the client disconnects, or when the timeout
+            of the :code:`timeout` field or :code:`X-Request-Timeout` header
+            passes, which fails with :code:`504 Gateway Timeout`.
+            """
+            encoding = negotiate(accept)
+            timeout = request_timeout(dto.timeout, x_request_timeout)
+            work = service.run_clingo_async(
+                dto.program,
+                dto.models,
+                dto.topK,
+                dto.arguments,
+                router.executor,
+                encoding.form,
+            )
+            models = await cancellable(request, work, timeout)
+            return encoded_response(models, encoding)  # pragma: no cover
@@ -1,6 +1,15 @@
+from typing import Annotated
+
+from fastapi import Header, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import PositiveFloat
+
 import draco.server.models.draco as endpoint_models
 
+from ..cancellation import cancellable, request_timeout
+from ..encoding import ANSWER_SET_RESPONSES, encoded_response, negotiate
 from ..services.draco import DracoService
+from ..utils import NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE, stream_response
 from .base import BaseDracoRouter
 
 
@@ -10,10 +19,11 @@ class DracoRouter(BaseDracoRouter):
     __DEFAULT_PREFIX__ = "/draco"
     __DEFAULT_TAGS__ = ["Draco"]
 
-    def __init__(self, draco, **kwargs):
+    def __init__(self, draco, executor=None, **kwargs):
         c = DracoRouter
         super().__init__(
             draco,
+            executor,
             prefix=kwargs.pop("prefix", c.__DEFAULT_PREFIX__),
             tags=kwargs.pop("tags", c.__DEFAULT_TAGS__),
             **kwargs,
@@ -21,28 +31,139 @@ class DracoRouter(BaseDracoRouter):
 
     @staticmethod
     def _register(router: "BaseDracoRouter") -> None:
-        service = DracoService(router.draco)
+        service = DracoService(router.draco, router.executor)
 
-        @router.post("/check-spec")
-        def check_spec(
+        @router.cached_post("/check-spec")
+        async def check_spec(
             dto: endpoint_models.CheckSpecDTO,
         ) -> endpoint_models.CheckSpecReturn:
-            return service.check_spec(dto.spec)  # pragma: no cover
+            return await service.check_spec_async(dto.spec)  # pragma: no cover
 
-        @router.post("/complete-spec")
-        def complete_spec(
+        @router.cached_post(
+            "/complete-spec",
+            response_model=endpoint_models.CompleteSpecReturn,
+            responses=ANSWER_SET_RESPONSES,
+        )
+        async def complete_spec(
+            request: Request,
+            dto: endpoint_models.CompleteSpecDTO,
+            accept: Annotated[str | None, Header()] = None,
+            x_request_timeout: Annotated[PositiveFloat | None, Header()] = None,
+        ) -> Response:
+            """
+            Completes the specification. Clients that accept
+            :code:`application/vnd.draco.compact+json` or
+            :code:`application/msgpack` get the answer sets as facts,
+            or as specifications with :code:`answer-set=spec`.
+
+            The solve stops when the client disconnects, or when the timeout
+            of the :code:`timeout` field or :code:`X-Request-Timeout` header
+            passes, which fails with :code:`504 Gateway Timeout`.
+            """
+            encoding = negotiate(accept)
+            timeout = request_timeout(dto.timeout, x_request_timeout)
+            models = await cancellable(
+                request,
+                service.complete_spec_async(dto.spec, dto.models, encoding.form),
+                timeout,
+            )
+            return encoded_response(models, encoding)  # pragma: no cover
+
+        @router.post(
+            "/complete-spec/stream",
+            response_class=StreamingResponse,
+            responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, SSE_MEDIA_TYPE: {}}}},
+        )
+        async def complete_spec_stream(
             dto: endpoint_models.CompleteSpecDTO,
-        ) -> endpoint_models.CompleteSpecReturn:
-            return service.complete_spec(dto.spec, dto.models)  # pragma: no cover
+            accept: Annotated[str | None, Header()] = None,
+        ) -> StreamingResponse:
+            """
+            Streams the completions as the solver finds them, as Server-Sent
+            Events if the client accepts :code:`text/event-stream` and as
+            newline-delimited JSON otherwise. The solve stops when the client
+            disconnects. Streams have no timeout.
+            """
+            models = service.complete_spec_stream(dto.spec, dto.models)
+            return await stream_response(models, accept)  # pragma: no cover
 
-        @router.post("/count-preferences")
-        def count_preferences(
+        @router.cached_post("/count-preferences")
+        async def count_preferences(
             dto: endpoint_models.CountPreferencesDTO,
         ) -> endpoint_models.CountPreferencesReturn:
-            return service.count_preferences(dto.spec)  # pragma: no cover
+            return await service.count_preferences_async(dto.spec)  # pragma: no cover
 
-        @router.post("/get-violations")
-        def get_violations(
+        @router.cached_post("/get-violations")
+        async def get_violations(
             dto: endpoint_models.GetViolationsDTO,
         ) -> endpoint_models.GetViolationsReturn:
-            return service.get_violations(dto.spec)  # pragma: no cover
+            return await service.get_violations_async(dto.spec)  # pragma: no cover
+
+        @router.post("/batch/check-spec")
+        async def check_spec_batch(
+            dto: endpoint_models.BatchDTO,
+        ) -> endpoint_models.CheckSpecBatchReturn:
+            """
+            Checks many specifications at once. The specifications are grounded
+            together in chunks, which are solved in parallel. The results are in
+            the order of the specifications, with the error of each
+            specification that could not be checked.
+            """
+            return await service.check_spec_batch(dto.specs)  # pragma: no cover
+
+        @router.post(
+            "/batch/complete-spec",
+            response_model=endpoint_models.CompleteSpecBatchReturn,
+            responses=ANSWER_SET_RESPONSES,
+        )
+        async def complete_spec_batch(
+            dto: endpoint_models.CompleteSpecBatchDTO,
+            accept: Annotated[str | None, Header()] = None,
+        ) -> Response:
+            """
+            Completes many specifications at once, see :code:`/batch/check-spec`
+            and :code:`/complete-spec` for the encodings of the answer sets.
+            """
+            encoding = negotiate(accept)
+            items = await service.complete_spec_batch(
+                dto.specs, dto.models, encoding.form
+            )
+            return encoded_response(items, encoding)  # pragma: no cover
+
+        @router.post("/batch/count-preferences")
+        async def count_preferences_batch(
+            dto: endpoint_models.BatchDTO,
+        ) -> endpoint_models.CountPreferencesBatchReturn:
+            """
+            Counts the preferences of many specifications at once,
+            see :code:`/batch/check-spec`.
+            """
+            return await service.count_preferences_batch(dto.specs)  # pragma: no cover
+
+        @router.post("/batch/get-violations")
+        async def get_violations_batch(
+            dto: endpoint_models.BatchDTO,
+        ) -> endpoint_models.GetViolationsBatchReturn:
+            """
+            Gets the violations of many specifications at once,
+            see :code:`/batch/check-spec`.
+            """
+            return await service.get_violations_batch(dto.specs)  # pragma: no cover
+
+        @router.post(
+            "/batch/stream",
+            response_class=StreamingResponse,
+            responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, SSE_MEDIA_TYPE: {}}}},
+        )
+        async def batch_stream(
+            dto: endpoint_models.BatchStreamDTO,
+            accept: Annotated[str | None, Header()] = None,
+        ) -> StreamingResponse:
+            """
+            Streams the results of a method on many specifications as the chunks
+            of specifications are done, for batches too large to wait for as a
+            whole. The results carry their index, as they may arrive out of
+            order. The batch stops when the client disconnects.
+            """
+            items = service.batch_stream(dto.method, dto.specs, dto.models)
+            return await stream_response(items, accept)  # pragma: no cover
@@ -0,0 +1,49 @@
+from fastapi.responses import PlainTextResponse
+
+from draco.server.metrics import CONTENT_TYPE, Metrics
+
+from .base import BaseDracoRouter
+
+
+class MetricsRouter(BaseDracoRouter):
+    """
+    Router exposing the operational telemetry of the server in the
+    `Prometheus <https://prometheus.io/>`_ text format, such as the latency of
+    the requests per route, the in-flight solves and the cache hit rates.
+    """
+
+    __DEFAULT_PREFIX__ = ""
+    __DEFAULT_TAGS__ = ["Metrics"]
+
+    def __init__(self, draco, **kwargs):
+        c = MetricsRouter
+        super().__init__(
+            draco,
+            prefix=kwargs.pop("prefix", c.__DEFAULT_PREFIX__),
+            tags=kwargs.pop("tags", c.__DEFAULT_TAGS__),
+            **kwargs,
+        )
+
+    @staticmethod
+    def _register(router: "BaseDracoRouter") -> None:
+        if router.metrics is None:
+            router.metrics = Metrics()
+        metrics = router.metrics
+
+        @router.get("/metrics", response_class=PlainTextResponse)
+        def get_metrics() -> PlainTextResponse:
+            """
+            Returns the metrics of the requests to the routers sharing the
+            metrics of this router, the statistics of their solver calls
+            aggregated per route, the in-flight solves, the queue depth and
+            the cache hit rates.
+            """
+            text = metrics.render(
+                router.executor,
+                {
+                    "response": router.response_cache,
+                    "result": router.draco.result_cache,
+                    "program": router.draco.program_cache,
+                },
+            )
+            return PlainTextResponse(text, media_type=CONTENT_TYPE)
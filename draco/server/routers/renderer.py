@@ -26,7 +26,7 @@ class RendererRouter(BaseDracoRouter):
 
     @staticmethod
     def _register(router: "BaseDracoRouter") -> None:
-        @router.post("/render-spec")
+        @router.cached_post("/render-spec")
         def render_spec(
             dto: endpoint_models.RenderSpecDTO,
         ) -> endpoint_models.RenderSpecReturn:
@@ -1,8 +1,14 @@
+from contextlib import AsyncExitStack, aclosing
 from typing import Iterable
 
 import draco.server.models.clingo as endpoint_models
+from draco import Draco
+from draco.run import Budget
 from draco.run import run_clingo as run_clingo_internal
-from draco.server.utils import model_to_jsonable_model
+from draco.run import run_clingo_async as run_clingo_async_internal
+from draco.server.executor import SolverExecutor
+from draco.server.models.shared import AnswerSetForm, ClingoModel, CompactModel
+from draco.server.utils import ModelEncoder, model_to_jsonable_model
 
 
 def run_clingo(
@@ -10,3 +16,50 @@ def run_clingo(
 ) -> endpoint_models.RunClingoReturn:
     generator = run_clingo_internal(program, models, topK, arguments)
     return list(map(model_to_jsonable_model, generator))
+
+
+def run_clingo_task(
+    draco: Draco,
+    program: str | Iterable[str],
+    models: int,
+    topK: bool,
+    arguments: list[str],
+    form: AnswerSetForm = "symbols",
+    budget: Budget | None = None,
+) -> list[ClingoModel | CompactModel]:
+    """Runs clingo as a task of a :code:`SolverExecutor`, which passes in the
+    :code:`Draco` instance of its worker first."""
+    generator = run_clingo_internal(program, models, topK, arguments, budget)
+    return list(map(ModelEncoder(form), generator))
+
+
+async def run_clingo_async(
+    program: str | Iterable[str],
+    models: int,
+    topK: bool,
+    arguments: list[str],
+    executor: SolverExecutor | None = None,
+    form: AnswerSetForm = "symbols",
+) -> list[ClingoModel | CompactModel]:
+    """Runs clingo. Cancelling the call stops the solve, also in worker
+    processes, and frees the solver once the solve has stopped."""
+    if executor is not None and executor.kind == "process":
+        return await executor.call(
+            run_clingo_task,
+            program,
+            models=models,
+            topK=topK,
+            arguments=arguments,
+            form=form,
+            # the budget lets the executor stop the search when cancelled
+            budget=None,
+        )
+
+    encoder = ModelEncoder(form)
+    async with AsyncExitStack() as stack:
+        if executor is not None:
+            await stack.enter_async_context(executor.slot())
+        generator = await stack.enter_async_context(
+            aclosing(run_clingo_async_internal(program, models, topK, arguments))
+        )
+        return [encoder(model) async for model in generator]
@@ -1,8 +1,106 @@
+import asyncio
+import math
+from contextlib import AsyncExitStack, aclosing
+from typing import Any, AsyncGenerator, Callable, Iterable
+
 import draco.server.models.draco as endpoint_models
-from draco import Draco
-from draco.server.utils import model_to_jsonable_model
+from draco import AsyncDraco, Draco
+from draco.server.executor import SolverExecutor
+from draco.server.models.shared import AnswerSetForm, ClingoModel, CompactModel
+from draco.server.utils import ModelEncoder, model_to_jsonable_model
 from draco.types import Specification
 
+# the largest number of specs that a worker grounds and solves together
+BATCH_CHUNK_SIZE = 256
+
+BatchChunk = tuple[int, list[str]]
+
+
+def _each(
+    method: Callable[[str], Any], chunk: BatchChunk
+) -> list[endpoint_models.BatchItem]:
+    """Calls the method on every spec of a chunk, recording errors per spec."""
+    start, specs = chunk
+    items: list[endpoint_models.BatchItem] = []
+    for index, spec in enumerate(specs, start):
+        try:
+            items.append({"index": index, "result": method(spec), "error": None})
+        except Exception as e:
+            items.append({"index": index, "result": None, "error": str(e)})
+    return items
+
+
+def _items(start: int, results: Iterable[Any]) -> list[endpoint_models.BatchItem]:
+    return [
+        {"index": index, "result": result, "error": None}
+        for index, result in enumerate(results, start)
+    ]
+
+
+def check_spec_batch_task(
+    draco: Draco, chunk: BatchChunk
+) -> list[endpoint_models.BatchItem]:
+    """Checks a chunk of specs with a single grounding, see
+    :code:`Draco.check_specs`. Runs as a task of a :code:`SolverExecutor`."""
+    start, specs = chunk
+    try:
+        results = draco.check_specs(specs)
+    except Exception:
+        # isolate the specs that fail the batch, such as those with syntax errors
+        return _each(draco.check_spec, chunk)
+    return _items(start, results)
+
+
+def count_preferences_batch_task(
+    draco: Draco, chunk: BatchChunk
+) -> list[endpoint_models.BatchItem]:
+    """Counts the preferences of a chunk of specs with a single grounding, see
+    :code:`Draco.count_preferences_batch`."""
+    start, specs = chunk
+    try:
+        counts, unsatisfiable = draco.count_preferences_batch(specs)
+    except Exception:
+
+        def count(spec: str) -> dict[str, int] | None:
+            counts = draco.count_preferences(spec)
+            return None if counts is None else dict(counts)
+
+        return _each(count, chunk)
+
+    # as `count_preferences`, only list the violated preferences
+    names = draco.soft_constraint_names
+    results = [
+        None if unsat else {name: int(n) for name, n in zip(names, row) if n}
+        for row, unsat in zip(counts, unsatisfiable)
+    ]
+    return _items(start, results)
+
+
+def get_violations_batch_task(
+    draco: Draco, chunk: BatchChunk
+) -> list[endpoint_models.BatchItem]:
+    """Gets the violations of a chunk of specs one by one."""
+    return _each(draco.get_violations, chunk)
+
+
+def complete_spec_batch_task(
+    draco: Draco, chunk: BatchChunk, models: int = 1, form: AnswerSetForm = "symbols"
+) -> list[endpoint_models.BatchItem]:
+    """Completes a chunk of specs one by one."""
+    encoder = ModelEncoder(form)
+    return _each(
+        lambda spec: list(map(encoder, draco.complete_spec(spec, models))),
+        chunk,
+    )
+
+
+BATCH_TASKS: dict[str, Callable[..., list[endpoint_models.BatchItem]]] = {
+    "check_spec": check_spec_batch_task,
+    "complete_spec": complete_spec_batch_task,
+    "count_preferences": count_preferences_batch_task,
+    "get_violations": get_violations_batch_task,
+}
+
 
 class DracoService:
     """
@@ -10,11 +108,18 @@ class DracoService:
     Used by :code:`DracoRouter`.
     """
 
-    def __init__(self, draco: Draco):
+    def __init__(self, draco: Draco, executor: SolverExecutor | None = None):
         """
         :param draco: :code:`Draco` instance to use.
+        :param executor: Executor to run the solver work of the async methods
+            in, which bounds the number of concurrent solves. Without one, the
+            async methods solve in threads of :code:`AsyncDraco`.
         """
         self.draco = draco
+        self.async_draco = AsyncDraco(draco)
+        self.executor = executor
+        # batches always run in chunks on an executor
+        self._batch_executor = executor or SolverExecutor(draco)
 
     def check_spec(self, spec: Specification) -> endpoint_models.CheckSpecReturn:
         return self.draco.check_spec(spec)
@@ -34,3 +139,144 @@ class DracoService:
         self, spec: Specification
     ) -> endpoint_models.GetViolationsReturn:
         return self.draco.get_violations(spec)
+
+    async def check_spec_async(
+        self, spec: Specification
+    ) -> endpoint_models.CheckSpecReturn:
+        if self.executor is not None:
+            return await self.executor.call("check_spec", spec)
+        return await self.async_draco.check_spec(spec)
+
+    async def complete_spec_async(
+        self,
+        spec: Specification,
+        models: int,
+        form: AnswerSetForm = "symbols",
+    ) -> list[ClingoModel | CompactModel]:
+        """Completes the spec. Cancelling the call stops the solve, also in
+        worker processes, and frees the solver once the solve has stopped."""
+        encoder = ModelEncoder(form)
+        if self.executor is not None and self.executor.kind == "process":
+            # the budget lets the executor stop the search when cancelled
+            result = await self.executor.call(
+                "complete_spec", spec, models=models, budget=None
+            )
+            return list(map(encoder, result))
+
+        async with AsyncExitStack() as stack:
+            if self.executor is not None:
+                await stack.enter_async_context(self.executor.slot())
+            completions = await stack.enter_async_context(
+                aclosing(self.async_draco.complete_spec(spec, models))
+            )
+            return [encoder(model) async for model in completions]
+
+    async def complete_spec_stream(
+        self, spec: Specification, models: int
+    ) -> AsyncGenerator[ClingoModel | CompactModel, None]:
+        """Yields the completions one by one as the solver finds them.
+        Closing the generator cancels the solve. With an executor, the stream
+        holds one of its solvers until it ends."""
+        async with AsyncExitStack() as stack:
+            if self.executor is not None:
+                await stack.enter_async_context(self.executor.slot())
+            generator = await stack.enter_async_context(
+                aclosing(self.async_draco.complete_spec(spec, models))
+            )
+            encoder = ModelEncoder()
+            async for model in generator:
+                yield encoder(model)
+
+    async def count_preferences_async(
+        self, spec: Specification
+    ) -> endpoint_models.CountPreferencesReturn:
+        if self.executor is not None:
+            return await self.executor.call("count_preferences", spec)
+        return await self.async_draco.count_preferences(spec)
+
+    async def get_violations_async(
+        self, spec: Specification
+    ) -> endpoint_models.GetViolationsReturn:
+        if self.executor is not None:
+            return await self.executor.call("get_violations", spec)
+        return await self.async_draco.get_violations(spec)
+
+    def _chunks(self, specs: list[Specification]) -> list[BatchChunk]:
+        # join the specs, which may be iterators, to send them to workers
+        texts = [spec if isinstance(spec, str) else "\n".join(spec) for spec in specs]
+        # spread the batch over the solvers, in chunks small enough to stream
+        limit = self._batch_executor.max_concurrency
+        size = min(max(1, math.ceil(len(texts) / limit)), BATCH_CHUNK_SIZE)
+        return [(i, texts[i : i + size]) for i in range(0, len(texts), size)]
+
+    async def _run_batch(
+        self, method: endpoint_models.BatchMethod, specs: list[Specification], **kwargs
+    ) -> AsyncGenerator[list[endpoint_models.BatchItem], None]:
+        """Yields the results of the chunks of a batch as they are done, running
+        at most one chunk per solver of the executor at once."""
+        executor = self._batch_executor
+        task = BATCH_TASKS[method]
+        chunks = iter(self._chunks(specs))
+        pending: set[asyncio.Future] = set()
+        try:
+            while True:
+                while len(pending) < executor.max_concurrency:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    call = executor.call(task, chunk, **kwargs)
+                    pending.add(asyncio.ensure_future(call))
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def _batch(
+        self, method: endpoint_models.BatchMethod, specs: list[Specification], **kwargs
+    ) -> list[endpoint_models.BatchItem]:
+        items = []
+        async with aclosing(self._run_batch(method, specs, **kwargs)) as chunks:
+            async for chunk in chunks:
+                items.extend(chunk)
+        return sorted(items, key=lambda item: item["index"])
+
+    async def check_spec_batch(
+        self, specs: list[Specification]
+    ) -> endpoint_models.CheckSpecBatchReturn:
+        return await self._batch("check_spec", specs)
+
+    async def complete_spec_batch(
+        self, specs: list[Specification], models: int, form: AnswerSetForm = "symbols"
+    ) -> list[endpoint_models.BatchItem]:
+        return await self._batch("complete_spec", specs, models=models, form=form)
+
+    async def count_preferences_batch(
+        self, specs: list[Specification]
+    ) -> endpoint_models.CountPreferencesBatchReturn:
+        return await self._batch("count_preferences", specs)
+
+    async def get_violations_batch(
+        self, specs: list[Specification]
+    ) -> endpoint_models.GetViolationsBatchReturn:
+        return await self._batch("get_violations", specs)
+
+    async def batch_stream(
+        self,
+        method: endpoint_models.BatchMethod,
+        specs: list[Specification],
+        models: int = 1,
+    ) -> AsyncGenerator[endpoint_models.BatchItem, None]:
+        """Yields the results of a batch as the chunks of specs are done, which
+        may be out of input order. Closing the generator stops the batch."""
+        kwargs = {"models": models} if method == "complete_spec" else {}
+        async with aclosing(self._run_batch(method, specs, **kwargs)) as chunks:
+            async for chunk in chunks:
+                for item in chunk:
+                    yield item
@@ -1,11 +1,17 @@
+import json
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, AsyncIterable, AsyncIterator, Hashable
+
 import clingo
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from fastapi.routing import APIRoute
 from tabulate import tabulate
 
-from draco.run import Model
+from draco.fact_utils import decode_fact, decoded_facts_to_dict
+from draco.run import Model, handle_to_symbol
 
-from .models.shared import ClingoModel, ClingoSymbol
+from .models.shared import AnswerSetForm, ClingoModel, ClingoSymbol, CompactModel
 
 
 def clingo_symbol_to_jsonable_symbol(symbol: clingo.Symbol) -> ClingoSymbol:
@@ -20,6 +26,112 @@ def model_to_jsonable_model(model: Model) -> ClingoModel:
     }
 
 
+class ModelEncoder:
+    """
+    Converts the models of a response into JSON-serializable models whose
+    answer sets have the given form: typed symbols as
+    :code:`model_to_jsonable_model` does, facts such as
+    :code:`"attribute(number_rows,root,100)."`, or the specification
+    dictionary the answer set decodes to.
+
+    The models of a program share most of their symbols, so the encoder
+    converts each symbol once and reuses the result for the following models.
+    """
+
+    def __init__(self, form: AnswerSetForm = "symbols"):
+        """
+        :param form: the form of the answer sets.
+        """
+        self.form = form
+        # the converted symbols by their handles
+        self._symbols: dict[Hashable, Any] = {}
+
+    def _convert(self, handle: Hashable) -> Any:
+        symbol = handle_to_symbol(handle)
+        if self.form == "symbols":
+            return clingo_symbol_to_jsonable_symbol(symbol)
+        if self.form == "spec":
+            return decode_fact(symbol)
+        return f"{symbol}."
+
+    def __call__(self, model: Model) -> ClingoModel | CompactModel:
+        """
+        :param model: the model to convert.
+        :return: the JSON-serializable model.
+        """
+        symbols = self._symbols
+        converted = []
+        for handle in model.handles:
+            if handle not in symbols:
+                symbols[handle] = self._convert(handle)
+            converted.append(symbols[handle])
+        answer_set: Any = converted
+        if self.form == "spec":
+            answer_set = dict(decoded_facts_to_dict(converted))
+        return {"cost": model.cost, "number": model.number, "answer_set": answer_set}
+
+
+# the media types of streamed responses, one JSON document per line by default
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+async def _ndjson_lines(items: AsyncIterable[Any]) -> AsyncIterator[str]:
+    async for item in items:
+        yield json.dumps(item) + "\n"
+
+
+async def _sse_events(items: AsyncIterable[Any]) -> AsyncIterator[str]:
+    async for item in items:
+        yield f"data: {json.dumps(item)}\n\n"
+    # tells clients that the stream is complete rather than interrupted
+    yield "event: end\ndata: \n\n"
+
+
+async def _chain(first: list[Any], items: AsyncGenerator[Any, None]):
+    async with aclosing(items):
+        for item in first:
+            yield item
+        async for item in items:
+            yield item
+
+
+async def stream_response(
+    items: AsyncGenerator[Any, None], accept: str | None
+) -> StreamingResponse:
+    """
+    Streams JSON-serializable items to the client as they are produced, as
+    Server-Sent Events if the client accepts them and as newline-delimited JSON
+    otherwise. If the client disconnects, the generator of the items is closed.
+
+    The first item is awaited before the response starts, so that errors such
+    as invalid programs are reported with the status code of the response
+    instead of breaking off the stream.
+
+    :param items: the items to stream.
+    :param accept: the :code:`Accept` header of the request.
+    :return: the streaming response.
+    """
+    try:
+        first = [await anext(items)]
+    except StopAsyncIteration:
+        first = []
+    except BaseException:
+        await items.aclose()
+        raise
+    chained = _chain(first, items)
+
+    # proxies should pass the items on as they arrive
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if accept is not None and SSE_MEDIA_TYPE in accept:
+        return StreamingResponse(
+            _sse_events(chained), media_type=SSE_MEDIA_TYPE, headers=headers
+        )
+    return StreamingResponse(
+        _ndjson_lines(chained), media_type=NDJSON_MEDIA_TYPE, headers=headers
+    )
+
+
 def tabulate_routes(app: FastAPI):
     """
     Tabulates the routes registered by the server.
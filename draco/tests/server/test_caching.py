@@ -0,0 +1,116 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from draco import Draco, dict_to_facts
+from draco.result_cache import ResultCache
+from draco.server import DracoAPI
+from draco.server.caching import (
+    cached_route,
+    canonical_body,
+    configuration_hash,
+    etag,
+)
+
+SPEC = dict_to_facts({"mark": [{"type": "point"}]})
+
+
+def test_canonical_body():
+    assert canonical_body(b'{"b": 1, "a": [1, 2]}') == '{"a":[1,2],"b":1}'
+    assert canonical_body(b'{"a":[1,2],"b":1}') == canonical_body(b'{"b":1,"a":[1,2]}')
+
+
+def test_configuration_hash():
+    draco = Draco()
+    assert configuration_hash(draco) == configuration_hash(Draco())
+    weights = draco.weights | {"linear_x_weight": 1000}
+    assert configuration_hash(draco) != configuration_hash(Draco(weights=weights))
+
+
+def test_etag():
+    assert etag(b"true") == etag(b"true")
+    assert etag(b"true") != etag(b"false")
+    assert etag(b"true").startswith('"')
+
+
+def test_cached_responses():
+    draco = Draco()
+    cache = ResultCache()
+    client = TestClient(DracoAPI(draco, app=FastAPI(), response_cache=cache).app)
+
+    response = client.post("/draco/count-preferences", json={"spec": SPEC})
+    assert response.status_code == 200
+    tag = response.headers["etag"]
+    assert cache.stats.misses == 1
+
+    # the same request in another order of keys hits the cache
+    again = client.post(
+        "/draco/count-preferences",
+        content='{ "spec" : %s }' % str(SPEC).replace("'", '"'),
+        headers={"Content-Type": "application/json"},
+    )
+    assert again.json() == response.json()
+    assert again.headers["etag"] == tag
+    assert cache.stats.hits == 1
+
+    headers = {"If-None-Match": tag}
+    response = client.post(
+        "/draco/count-preferences", json={"spec": SPEC}, headers=headers
+    )
+    # RFC 9110 only allows `304 Not Modified` for GET and HEAD, so POST
+    # requests get the cached response
+    assert response.status_code == 200
+    assert response.json() == again.json()
+    assert response.headers["etag"] == tag
+    assert cache.stats.hits == 2
+
+    # other configurations compute the responses again, the counts are the same
+    draco.weights = draco.weights | {"linear_x_weight": 1000}
+    response = client.post(
+        "/draco/count-preferences", json={"spec": SPEC}, headers=headers
+    )
+    assert response.status_code == 200
+    assert cache.stats.misses == 2
+
+
+def test_cached_get_responses():
+    cache = ResultCache()
+    app = FastAPI()
+    router = APIRouter(route_class=cached_route(cache, Draco()))
+    calls = []
+
+    @router.get("/square")
+    def square(x: int) -> int:
+        calls.append(x)
+        return x * x
+
+    app.include_router(router)
+    client = TestClient(app)
+
+    response = client.get("/square", params={"x": 3})
+    assert response.json() == 9
+    assert client.get("/square", params={"x": 4}).json() == 16
+    assert client.get("/square", params={"x": 3}).json() == 9
+    assert calls == [3, 4]
+
+    headers = {"If-None-Match": response.headers["etag"]}
+    response = client.get("/square", params={"x": 3}, headers=headers)
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_uncached_responses():
+    cache = ResultCache()
+    client = TestClient(DracoAPI(app=FastAPI(), response_cache=cache).app)
+
+    # errors are not cached
+    response = client.post("/draco/check-spec", json={"specs": SPEC})
+    assert response.status_code == 422
+    assert "etag" not in response.headers
+    response = client.post("/draco/check-spec", content=b"not json")
+    assert response.status_code == 422
+    assert cache.stats.size == 0
+
+    client = TestClient(DracoAPI(app=FastAPI(), cache_responses=False).app)
+    response = client.post("/draco/check-spec", json={"spec": SPEC})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
@@ -0,0 +1,136 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from draco import Draco, dict_to_facts
+from draco.server import DracoAPI
+from draco.server.cancellation import (
+    ClientDisconnectedError,
+    DeadlineExceededError,
+    cancellable,
+    request_timeout,
+)
+from draco.server.executor import SolverExecutor
+from draco.server.services.clingo import run_clingo_async
+
+# putting 12 pigeons into 11 holes is unsatisfiable, which takes the solver
+# far longer than the tests wait
+PIGEONS = """
+pigeon(1..12). hole(1..11).
+1 { in(P, H) : hole(H) } 1 :- pigeon(P).
+:- in(P, H), in(Q, H), P < Q.
+"""
+
+
+def request(disconnect_after: float | None = None) -> Request:
+    async def receive():
+        if disconnect_after is None:
+            await asyncio.Event().wait()
+        else:
+            await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    return Request({"type": "http", "method": "POST", "headers": []}, receive)
+
+
+def wait_until_free(executor: SolverExecutor, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while executor.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_request_timeout():
+    assert request_timeout() is None
+    assert request_timeout(None, None) is None
+    assert request_timeout(None, 2) == 2
+    assert request_timeout(3, 2) == 2
+
+
+def test_cancellable():
+    cancelled = []
+
+    async def work(seconds: float) -> str:
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            cancelled.append(seconds)
+            raise
+        return "done"
+
+    async def run(seconds: float, **kwargs):
+        return await cancellable(request(**kwargs), work(seconds), timeout=0.2)
+
+    assert asyncio.run(run(0)) == "done"
+    with pytest.raises(DeadlineExceededError) as deadline:
+        asyncio.run(run(10))
+    assert deadline.value.status_code == 504
+    assert deadline.value.reason == "deadline"
+    with pytest.raises(ClientDisconnectedError) as disconnect:
+        asyncio.run(run(5, disconnect_after=0.05))
+    assert disconnect.value.reason == "disconnect"
+    assert cancelled == [10, 5]
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_deadlines(kind):
+    executor = SolverExecutor(Draco(), kind=kind, max_concurrency=1)
+    draco_api = DracoAPI(Draco(), app=FastAPI(), executor=executor)
+    executor.start()
+    # the workers may finish after their requests, so keep a single event loop
+    # that frees their solvers
+    with TestClient(draco_api.app) as client:
+        started = time.monotonic()
+        response = client.post(
+            "/clingo/run",
+            json={"program": PIGEONS, "models": 1},
+            headers={"X-Request-Timeout": "0.5"},
+        )
+        assert response.status_code == 504
+        assert time.monotonic() - started < 5
+        # the solver is free again once the worker has stopped
+        wait_until_free(executor)
+        assert executor.running == executor.waiting == 0
+
+        spec = dict_to_facts({"mark": [{"type": "point"}]})
+        response = client.post(
+            "/draco/complete-spec", json={"spec": spec, "timeout": 0.001}
+        )
+        assert response.status_code == 504
+        response = client.post(
+            "/draco/complete-spec", json={"spec": spec, "timeout": 30}
+        )
+        assert response.status_code == 200
+
+        response = client.post(
+            "/clingo/run", json={"program": "a."}, headers={"X-Request-Timeout": "-1"}
+        )
+        assert response.status_code == 422
+
+        metrics = client.get("/metrics").text
+        for route in ["/clingo/run", "/draco/complete-spec"]:
+            labels = f'route="{route}",reason="deadline"'
+            assert f"draco_request_cancellations_total{{{labels}}} 1.0" in metrics
+    executor.shutdown()
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_disconnects(kind):
+    executor = SolverExecutor(Draco(), kind=kind, max_concurrency=1)
+    executor.start()
+
+    async def run():
+        started = time.monotonic()
+        work = run_clingo_async(PIGEONS, 1, False, [], executor)
+        with pytest.raises(ClientDisconnectedError):
+            await cancellable(request(disconnect_after=0.2), work)
+        # the solve stops, so the next one gets the only solver right away
+        models = await run_clingo_async("a.", 1, False, [], executor)
+        assert time.monotonic() - started < 5
+        assert executor.running == executor.waiting == 0
+        return models
+
+    assert len(asyncio.run(run())) == 1
+    executor.shutdown()
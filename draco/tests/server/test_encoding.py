@@ -0,0 +1,118 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from draco import Draco, dict_to_facts
+from draco.result_cache import ResultCache
+from draco.server import DracoAPI
+from draco.server.encoding import (
+    COMPACT_JSON_MEDIA_TYPE,
+    DEFAULT_ENCODING,
+    MSGPACK_MEDIA_TYPE,
+    Encoding,
+    encode,
+    msgpack,
+    negotiate,
+)
+
+SPEC = dict_to_facts({"number_rows": 10, "field": [{"name": "x", "type": "number"}]})
+
+
+@pytest.mark.parametrize(
+    "accept,expected",
+    [
+        (None, DEFAULT_ENCODING),
+        ("*/*", DEFAULT_ENCODING),
+        ("text/html", DEFAULT_ENCODING),
+        (COMPACT_JSON_MEDIA_TYPE, Encoding(COMPACT_JSON_MEDIA_TYPE, "facts")),
+        (
+            f"{COMPACT_JSON_MEDIA_TYPE}; answer-set=spec",
+            Encoding(COMPACT_JSON_MEDIA_TYPE, "spec"),
+        ),
+        (
+            f"application/json, {COMPACT_JSON_MEDIA_TYPE}",
+            DEFAULT_ENCODING,
+        ),
+        (
+            f"application/json;q=0.5, {COMPACT_JSON_MEDIA_TYPE}",
+            Encoding(COMPACT_JSON_MEDIA_TYPE, "facts"),
+        ),
+        (f"{COMPACT_JSON_MEDIA_TYPE};q=x, */*;q=0.1", DEFAULT_ENCODING),
+    ],
+)
+def test_negotiate(accept: str | None, expected: Encoding):
+    assert negotiate(accept) == expected
+
+
+def test_negotiate_msgpack():
+    encoding = negotiate(f"{MSGPACK_MEDIA_TYPE}, application/json;q=0.9")
+    if msgpack is None:
+        assert encoding == DEFAULT_ENCODING
+    else:
+        assert encoding == Encoding(MSGPACK_MEDIA_TYPE, "facts")
+        content = {"answer_set": ["a."], "cost": [1], "number": 1}
+        assert msgpack.unpackb(encode(content, encoding)) == content
+
+
+def test_encode():
+    content = [{"answer_set": ["attribute(name,root,ü)."], "cost": [], "number": 1}]
+    encoded = encode(content, Encoding(COMPACT_JSON_MEDIA_TYPE, "facts"))
+    assert json.loads(encoded) == content
+    assert b" " not in encoded
+
+
+def test_complete_spec_encodings():
+    client = TestClient(DracoAPI(Draco(), app=FastAPI()).app)
+    body = {"spec": SPEC, "models": 2}
+
+    default = client.post("/draco/complete-spec", json=body)
+    assert default.status_code == 200
+    assert default.headers["content-type"] == "application/json"
+    symbols = default.json()
+    assert {"type": "Function", "value": "attribute(number_rows,root,10)"} in (
+        symbols[0]["answer_set"]
+    )
+
+    headers = {"Accept": COMPACT_JSON_MEDIA_TYPE}
+    facts = client.post("/draco/complete-spec", json=body, headers=headers)
+    assert facts.headers["content-type"] == COMPACT_JSON_MEDIA_TYPE
+    assert facts.headers["vary"] == "Accept"
+    assert facts.headers["etag"] != default.headers["etag"]
+    assert [model["answer_set"] for model in facts.json()] == [
+        [f"{symbol['value']}." for symbol in model["answer_set"]] for model in symbols
+    ]
+    assert [model["cost"] for model in facts.json()] == [
+        model["cost"] for model in symbols
+    ]
+
+    headers = {"Accept": f"{COMPACT_JSON_MEDIA_TYPE}; answer-set=spec"}
+    specs = client.post("/draco/complete-spec", json=body, headers=headers).json()
+    assert specs[0]["answer_set"]["number_rows"] == 10
+    assert specs[0]["answer_set"]["field"][0]["name"] == "x"
+
+    # the encodings are cached apart
+    again = client.post("/draco/complete-spec", json=body)
+    assert again.content == default.content
+
+
+def test_answer_set_endpoints():
+    client = TestClient(
+        DracoAPI(Draco(), app=FastAPI(), response_cache=ResultCache()).app
+    )
+    headers = {"Accept": COMPACT_JSON_MEDIA_TYPE}
+
+    response = client.post(
+        "/clingo/run", json={"program": "fact(a,42).", "models": 1}, headers=headers
+    )
+    assert response.json() == [{"answer_set": ["fact(a,42)."], "cost": [], "number": 1}]
+
+    response = client.post(
+        "/draco/batch/complete-spec",
+        json={"specs": [SPEC, "invalid"]},
+        headers=headers,
+    )
+    first, second = response.json()
+    assert "attribute(number_rows,root,10)." in first["result"][0]["answer_set"]
+    assert second["result"] is None and second["error"]
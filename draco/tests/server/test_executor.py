@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from draco import Draco
+from draco.server import DracoAPI
+from draco.server.executor import ServerOverloadedError, SolverExecutor
+
+SPEC = ["entity(view,root,v).", "entity(mark,v,m)."]
+
+
+def wait(draco: Draco, event: threading.Event) -> bool:
+    return event.wait(5)
+
+
+def test_call_thread():
+    executor = SolverExecutor(Draco(), max_concurrency=2)
+    assert asyncio.run(executor.call("check_spec", SPEC)) is False
+    models = asyncio.run(executor.call("complete_spec", SPEC, models=2))
+    assert len(models) == 2
+    assert executor.running == executor.waiting == 0
+    executor.shutdown()
+
+
+def test_call_process():
+    executor = SolverExecutor(Draco(), kind="process", max_concurrency=1)
+    executor.start()
+    pool = executor._pool
+    executor.start()
+    assert executor._pool is pool
+    assert asyncio.run(executor.call("check_spec", SPEC)) is False
+    executor.shutdown()
+
+
+def test_call_invalid():
+    executor = SolverExecutor(Draco())
+    with pytest.raises(ValueError):
+        asyncio.run(executor.call("render", SPEC))
+
+    with pytest.raises(ValueError):
+        executor = SolverExecutor(Draco(), kind="fiber")  # type: ignore[arg-type]
+        asyncio.run(executor.call("check_spec", SPEC))
+
+    with pytest.raises(ValueError):
+        asyncio.run(SolverExecutor(Draco(), max_queue=-1).call("check_spec", SPEC))
+
+
+def test_overloaded():
+    executor = SolverExecutor(Draco(), max_concurrency=1, max_queue=1, retry_after=3)
+    event = threading.Event()
+
+    async def run():
+        running = asyncio.create_task(executor.call(wait, event))
+        waiting = asyncio.create_task(executor.call(wait, event))
+        await asyncio.sleep(0.1)
+        assert (executor.running, executor.waiting) == (1, 1)
+
+        with pytest.raises(ServerOverloadedError) as info:
+            await executor.call(wait, event)
+        assert info.value.status_code == 503
+        assert info.value.headers == {"Retry-After": "3"}
+
+        event.set()
+        return await asyncio.gather(running, waiting)
+
+    assert asyncio.run(run()) == [True, True]
+    assert executor.running == executor.waiting == 0
+    executor.shutdown()
+
+
+def test_draco_api_shares_executor():
+    executor = SolverExecutor(Draco(), max_concurrency=1)
+    draco_api = DracoAPI(app=FastAPI(), executor=executor)
+    assert all(router.executor is executor for router in draco_api.base_routers)
+
+    client = TestClient(draco_api.app)
+    response = client.post("/draco/check-spec", json={"spec": SPEC})
+    assert response.status_code == 200
+    assert response.json() is False
+
+
+def test_overloaded_response():
+    executor = SolverExecutor(Draco(), max_concurrency=1, max_queue=0)
+    client = TestClient(DracoAPI(app=FastAPI(), executor=executor).app)
+
+    # hold the only solver, as a long solve would
+    executor.running = 1
+    response = client.post("/draco/check-spec", json={"spec": SPEC})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+    response = client.post("/clingo/run", json={"program": "a."})
+    assert response.status_code == 503
+
+    response = client.post("/draco/complete-spec/stream", json={"spec": SPEC})
+    assert response.status_code == 503
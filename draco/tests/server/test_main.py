@@ -1,3 +1,6 @@
+import json
+import time
+import urllib.request
 from multiprocessing import Process
 from runpy import run_module
 
@@ -37,6 +40,21 @@ import draco.server.main as server_main
                 )
             ),
         ),
+        (
+            ["--executor", "process", "--max-concurrency", "2", "--max-queue", "0"],
+            server_main.DracoServerArgs(
+                **(
+                    server_main.__DEFAULT_ARGS__.__dict__
+                    | {"executor": "process", "max_concurrency": 2, "max_queue": 0}
+                )
+            ),
+        ),
+        (
+            ["--workers", "4"],
+            server_main.DracoServerArgs(
+                **(server_main.__DEFAULT_ARGS__.__dict__ | {"workers": 4})
+            ),
+        ),
         (
             ["--show-routes"],
             server_main.DracoServerArgs(
@@ -84,3 +102,36 @@ def test_start_server_via_cli():
     p.join(2.5)
     assert p.is_alive()
     p.terminate()
+
+
+def test_workers_cannot_reload():
+    args = server_main.DracoServerArgs(
+        **(server_main.__DEFAULT_ARGS__.__dict__ | {"workers": 2, "reload": True})
+    )
+    with pytest.raises(ValueError):
+        server_main.main(args=args)
+
+
+def test_start_server_with_workers():
+    args = server_main.DracoServerArgs(
+        **(server_main.__DEFAULT_ARGS__.__dict__ | {"workers": 2, "port": 8123})
+    )
+    p = Process(target=server_main.main, kwargs={"args": args})
+    p.start()
+    try:
+        # wait for a worker to warm up and answer
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                url = "http://127.0.0.1:8123/openapi.json"
+                with urllib.request.urlopen(url) as response:
+                    assert "/draco/check-spec" in json.load(response)["paths"]
+                break
+            except OSError:
+                assert time.monotonic() < deadline
+                time.sleep(0.5)
+        assert p.is_alive()
+    finally:
+        p.terminate()
+        p.join(10)
+    assert not p.is_alive()
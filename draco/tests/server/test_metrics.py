@@ -0,0 +1,102 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from draco import Draco, dict_to_facts
+from draco.profiling import Statistics
+from draco.server import DracoAPI
+from draco.server.executor import SolverExecutor
+from draco.server.metrics import Counter, Histogram, Metrics
+
+SPEC = dict_to_facts({"mark": [{"type": "point"}]})
+
+
+def test_counter():
+    counter = Counter("requests_total", "Requests.", ("route",))
+    counter.inc(("/a",))
+    counter.inc(("/a",), 2)
+    counter.inc(('/"b"',))
+    assert counter.render() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/\\"b\\""} 1.0',
+        'requests_total{route="/a"} 3.0',
+    ]
+
+
+def test_histogram():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), (0.1, 1))
+    for value in (0.05, 0.5, 0.7, 5):
+        histogram.observe(("/a",), value)
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 1.0',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3.0',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4.0',
+        'latency_seconds_sum{route="/a"} 6.25',
+        'latency_seconds_count{route="/a"} 4.0',
+    ]
+
+
+def test_observe_solver():
+    metrics = Metrics()
+    statistics = Statistics(
+        "check_spec", {"ground": 0.5}, atoms=10, rules=20, conflicts=2, solve_time=0.25
+    )
+    metrics.observe_solver("/draco/check-spec", statistics)
+    text = metrics.render()
+    assert (
+        'draco_solver_calls_total{route="/draco/check-spec",call="check_spec"} 1.0'
+        in text
+    )
+    assert 'draco_solver_conflicts_total{route="/draco/check-spec"} 2.0' in text
+    assert 'draco_solver_ground_rules_sum{route="/draco/check-spec"} 20.0' in text
+    assert (
+        'draco_solver_phase_seconds_total{route="/draco/check-spec",phase="ground"} 0.5'
+        in text
+    )
+    # without an executor and caches, their metrics are left out
+    assert "draco_solves_in_flight" not in text
+    assert "draco_cache_hits_total" not in text
+
+
+def test_metrics_endpoint():
+    client = TestClient(DracoAPI(app=FastAPI()).app)
+    for _ in range(2):
+        assert client.post("/draco/check-spec", json={"spec": SPEC}).is_success
+    assert client.post("/draco/check-spec", json={}).status_code == 422
+
+    response = client.get("/metrics")
+    assert response.is_success
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    route = 'route="/draco/check-spec"'
+    assert (
+        f'draco_request_duration_seconds_count{{method="POST",{route},status="200"}} 2.0'
+        in text
+    )
+    assert (
+        f'draco_request_duration_seconds_count{{method="POST",{route},status="422"}} 1.0'
+        in text
+    )
+    # the second request was answered from the response cache
+    assert f'draco_solver_calls_total{{{route},call="check_spec"}} 1.0' in text
+    assert 'draco_cache_hits_total{cache="response"} 1.0' in text
+    assert "draco_solves_in_flight 0.0" in text
+    assert "draco_solve_queue_depth 0.0" in text
+
+
+def test_metrics_process_executor():
+    executor = SolverExecutor(Draco(), kind="process", max_concurrency=1)
+    executor.start()
+    draco_api = DracoAPI(app=FastAPI(), executor=executor, cache_responses=False)
+    client = TestClient(draco_api.app)
+    assert client.post("/draco/check-spec", json={"spec": SPEC}).is_success
+    assert client.post("/clingo/run", json={"program": "a."}).is_success
+    text = client.get("/metrics").text
+    executor.shutdown()
+
+    # the statistics of the solver calls come back from the worker processes
+    route = 'route="/draco/check-spec"'
+    assert f'draco_solver_calls_total{{{route},call="check_spec"}} 1.0' in text
+    route = 'route="/clingo/run"'
+    assert f'draco_solver_calls_total{{{route},call="run_clingo"}} 1.0' in text
@@ -1,3 +1,4 @@
+import json as json_lib
 from typing import Any, Type
 
 import pytest
@@ -33,6 +34,7 @@ def client(app: FastAPI) -> TestClient:
 ROUTER_TYPES = [
     routers.ClingoRouter,
     routers.DracoRouter,
+    routers.MetricsRouter,
     routers.RendererRouter,
     routers.UtilityRouter,
 ]
@@ -104,6 +106,35 @@ def test_draco_complete_spec(client: TestClient, json: dict[str, Any]):
     assert response.is_success
 
 
+def test_draco_complete_spec_stream(client: TestClient):
+    json = {"spec": dict_to_facts({"mark": [{"type": "point"}]}), "models": 3}
+    expected = client.post("/draco/complete-spec", json=json).json()
+
+    response = client.post("/draco/complete-spec/stream", json=json)
+    assert response.is_success
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json_lib.loads(line) for line in lines] == expected
+
+    headers = {"Accept": "text/event-stream"}
+    with client.stream(
+        "POST", "/draco/complete-spec/stream", json=json, headers=headers
+    ) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = "".join(response.iter_text()).split("\n\n")
+    data = [event.removeprefix("data: ") for event in events if event]
+    assert [json_lib.loads(item) for item in data[:-1]] == expected
+    assert data[-1] == "event: end\ndata: "
+
+
+def test_draco_complete_spec_stream_error(app: FastAPI):
+    # errors before the first completion are reported with the status code
+    client = TestClient(app, raise_server_exceptions=False)
+    json = {"spec": ["entity(view,root"], "models": 3}
+    response = client.post("/draco/complete-spec/stream", json=json)
+    assert response.status_code == 500
+
+
 @pytest.mark.parametrize(
     "json",
     [{"spec": dict_to_facts({"mark": [{"type": "point"}]})}],
@@ -124,6 +155,36 @@ def test_draco_get_violations(client: TestClient, json: dict[str, Any]):
     assert response.is_success
 
 
+@pytest.mark.parametrize(
+    "route,json",
+    [
+        ("/draco/batch/check-spec", {}),
+        ("/draco/batch/complete-spec", {"models": 2}),
+        ("/draco/batch/count-preferences", {}),
+        ("/draco/batch/get-violations", {}),
+    ],
+)
+def test_draco_batch(client: TestClient, route: str, json: dict[str, Any]):
+    specs = [dict_to_facts({"mark": [{"type": "point"}]}), ["entity(view,root"]]
+    response = client.post(route, json=json | {"specs": specs})
+    assert response.is_success
+    first, second = response.json()
+    assert first["index"] == 0 and first["error"] is None
+    assert second["index"] == 1 and second["error"] is not None
+
+
+def test_draco_batch_stream(client: TestClient):
+    specs = [dict_to_facts({"mark": [{"type": "point"}]})] * 5
+    json = {"method": "check_spec", "specs": specs}
+    expected = client.post("/draco/batch/check-spec", json=json).json()
+
+    response = client.post("/draco/batch/stream", json=json)
+    assert response.is_success
+    assert response.headers["content-type"] == "application/x-ndjson"
+    items = [json_lib.loads(line) for line in response.text.splitlines()]
+    assert sorted(items, key=lambda item: item["index"]) == expected
+
+
 @pytest.mark.parametrize(
     "json",
     [
@@ -1,4 +1,5 @@
-from typing import Mapping
+import asyncio
+from typing import Any, Mapping
 
 import pytest
 
@@ -7,7 +8,9 @@ import draco.server.services.renderer as renderer_service
 import draco.server.services.utility as utility_service
 import draco.types as draco_types
 from draco import Draco
+from draco.fact_utils import dict_to_facts
 from draco.run import run_clingo
+from draco.server.executor import SolverExecutor
 from draco.server.services.draco import DracoService
 
 
@@ -122,6 +125,46 @@ def test_get_violations(
     assert res == default_draco.get_violations(spec)
 
 
+def test_run_clingo_async():
+    res = asyncio.run(
+        clingo_service.run_clingo_async("{a;b}.", models=0, topK=False, arguments=[])
+    )
+    assert res == clingo_service.run_clingo(
+        "{a;b}.", models=0, topK=False, arguments=[]
+    )
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        """
+        attribute(number_rows,root,100).
+        entity(field,root,temperature).
+        """,
+        ["attribute(number_rows,root,100).", "entity(field,root,temperature)."],
+    ],
+)
+def test_async_methods(
+    spec: draco_types.Specification, default_draco_service: DracoService
+):
+    service = default_draco_service
+
+    async def run():
+        return (
+            await service.check_spec_async(spec),
+            await service.complete_spec_async(spec, 2),
+            await service.count_preferences_async(spec),
+            await service.get_violations_async(spec),
+        )
+
+    assert asyncio.run(run()) == (
+        service.check_spec(spec),
+        service.complete_spec(spec, 2),
+        service.count_preferences(spec),
+        service.get_violations(spec),
+    )
+
+
 @pytest.mark.parametrize(
     "inp,expected",
     [
@@ -309,3 +352,69 @@ def test_answer_set_to_dict(inp: list[str], expected: Mapping):
 def test_render_spec(spec: dict):
     vl_chart = renderer_service.render_spec(spec)
     assert isinstance(vl_chart, dict)
+
+
+def test_complete_spec_stream(default_draco_service: DracoService):
+    service = default_draco_service
+    spec = ["attribute(number_rows,root,100).", "entity(field,root,temperature)."]
+
+    async def run():
+        models = [model async for model in service.complete_spec_stream(spec, 3)]
+        # closing the stream early stops the solve
+        stream = service.complete_spec_stream(spec, 3)
+        first = await anext(stream)
+        await stream.aclose()
+        return models, first
+
+    models, first = asyncio.run(run())
+    assert models == service.complete_spec(spec, 3)
+    assert first == models[0]
+
+
+def test_batch(default_draco: Draco):
+    # two solvers split the batch into chunks
+    service = DracoService(
+        default_draco, SolverExecutor(default_draco, max_concurrency=2)
+    )
+    specs: list[draco_types.Specification] = [
+        dict_to_facts({"mark": [{"type": "point"}]}),
+        dict_to_facts({"mark": [{"type": "pointt"}]}),
+        ["entity(view,root"],
+        dict_to_facts(
+            {
+                "field": [{"name": "temperature", "type": "number"}],
+                "mark": [{"type": "tick", "encoding": [{"field": "temperature"}]}],
+            }
+        ),
+    ]
+
+    def expected(method) -> list:
+        results: list[tuple[int, Any, str | None]] = []
+        for index, spec in enumerate(specs):
+            try:
+                results.append((index, method(spec), None))
+            except RuntimeError as e:
+                results.append((index, None, str(e)))
+        return results
+
+    def unpack(items: list) -> list:
+        return [(item["index"], item["result"], item["error"]) for item in items]
+
+    async def run():
+        return (
+            await service.check_spec_batch(specs),
+            await service.count_preferences_batch(specs),
+            await service.get_violations_batch(specs),
+            await service.complete_spec_batch(specs, 2),
+            [item async for item in service.batch_stream("check_spec", specs)],
+        )
+
+    checks, counts, violations, completions, stream = asyncio.run(run())
+    assert unpack(checks) == expected(service.check_spec)
+    assert checks[2]["error"] is not None
+    assert unpack(counts) == expected(
+        lambda spec: None if (c := service.count_preferences(spec)) is None else dict(c)
+    )
+    assert unpack(violations) == expected(service.get_violations)
+    assert unpack(completions) == expected(lambda spec: service.complete_spec(spec, 2))
+    assert sorted(stream, key=lambda item: item["index"]) == checks
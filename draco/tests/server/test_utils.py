@@ -1,6 +1,9 @@
+import pytest
 from fastapi import FastAPI
 
+import draco.run
 import draco.server.utils as server_utils
+from draco import Draco, answer_set_to_dict, dict_to_facts
 
 
 def test_tabulate_routes():
@@ -22,3 +25,24 @@ def test_tabulate_routes():
     assert "read_item" in output
     assert "/items/{item_id}" in output
     assert "GET" in output
+
+
+@pytest.mark.parametrize("symbol_handles", [True, False])
+def test_model_encoder(monkeypatch, symbol_handles: bool):
+    monkeypatch.setattr(draco.run, "SYMBOL_HANDLES", symbol_handles)
+    spec = dict_to_facts({"number_rows": 10, "field": [{"name": "x"}]})
+    models = list(Draco().complete_spec(spec, 3))
+
+    encoder = server_utils.ModelEncoder()
+    assert list(map(encoder, models)) == list(
+        map(server_utils.model_to_jsonable_model, models)
+    )
+
+    encoder = server_utils.ModelEncoder("facts")
+    for model, encoded in zip(models, map(encoder, models)):
+        assert encoded["answer_set"] == [f"{symbol}." for symbol in model.answer_set]
+        assert (encoded["cost"], encoded["number"]) == (model.cost, model.number)
+
+    encoder = server_utils.ModelEncoder("spec")
+    for model, encoded in zip(models, map(encoder, models)):
+        assert encoded["answer_set"] == answer_set_to_dict(model.answer_set)
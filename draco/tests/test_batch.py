@@ -0,0 +1,153 @@
+import pytest
+
+from draco.batch import (
+    UnsupportedProgramError,
+    check_batch,
+    count_batch,
+    namespace_spec,
+    prepare_batch_program,
+    solve_batch,
+)
+from draco.run import is_satisfiable, run_clingo
+
+KNOWLEDGE_BASE = """
+domain(color,(red;green)).
+violation(invalid_color) :- color(C), not domain(color,C).
+violation(too_many) :- 2 <= #count { C : color(C) }.
+:- violation(_).
+#show violation/1.
+"""
+
+SPECS = [
+    "",
+    "color(red).",
+    "color(blue).",
+    "color(red). color(green).",
+    "{ color(red); color(blue) }.",
+    "{ color(blue) } = 1.",
+    "a :- not a.",
+    ":- a. :- not a.",
+    "-b. :- -b.",
+    "c(1;2). :- c(3).",
+]
+
+
+@pytest.fixture
+def program():
+    return prepare_batch_program(KNOWLEDGE_BASE)
+
+
+def check(spec: str) -> bool:
+    return is_satisfiable([KNOWLEDGE_BASE, spec])
+
+
+def test_check_batch_matches_single_checks(program):
+    assert check_batch(program, SPECS, check) == list(map(check, SPECS))
+
+
+def test_check_batch_fallback(program):
+    specs = ["color(red).", "#const c = 1. color(c)."]
+    checked = []
+
+    def fallback(spec: str) -> bool:
+        checked.append(spec)
+        return check(spec)
+
+    assert check_batch(program, specs, fallback) == [True, False]
+    assert checked == [specs[1]]
+
+
+def test_check_batch_empty(program):
+    assert check_batch(program, [], check) == []
+
+
+def test_check_batch_without_program():
+    assert check_batch(None, SPECS, check) == list(map(check, SPECS))
+
+
+PREFERENCES = """
+preference(red,C) :- color(C), C = red.
+preference(color,C) :- color(C).
+:- color(blue).
+#show preference/2.
+"""
+
+
+def count(spec: str) -> dict[str, int] | None:
+    try:
+        model = next(run_clingo([PREFERENCES, spec], 1))
+    except StopIteration:
+        return None
+
+    result: dict[str, int] = {}
+    for symbol in model.answer_set:
+        name = symbol.arguments[0].name
+        result[name] = result.get(name, 0) + 1
+    return result
+
+
+@pytest.mark.parametrize("with_program", [True, False])
+def test_count_batch(with_program: bool):
+    program = prepare_batch_program(PREFERENCES) if with_program else None
+    specs = [
+        "color(red). color(green).",
+        "color(blue).",
+        "",
+        "{ color(red) }.",
+        "a :- not a.",
+        "#const c = green. color(c).",
+        "color(green).",
+    ]
+    counts, unsatisfiable = count_batch(program, specs, ["color", "red"], count)
+
+    assert list(unsatisfiable) == [False, True, False, False, True, False, False]
+    assert counts.tolist() == [
+        [2, 1],
+        [0, 0],
+        [0, 0],
+        # the choice has more than one answer set, so the first one counts
+        [count(specs[3]).get("color", 0), count(specs[3]).get("red", 0)],  # type: ignore
+        [0, 0],
+        [1, 0],
+        [1, 0],
+    ]
+
+
+def test_solve_batch_unsatisfiable(program):
+    specs = [namespace_spec("color(red).", 0), namespace_spec("a :- not a.", 1)]
+    assert solve_batch(program, specs) == []
+
+
+def test_namespace_spec():
+    spec = namespace_spec("a(1). c. -d((x,y)). b :- not a(2). :- b. e(1;2).", 7)
+    assert spec.facts == ["a(7,1).", "c(7).", "-d(7,(x,y)).", "_draco_spec(7)."]
+    assert list(map(str, spec.statements)) == [
+        "b(7) :- not a(7,2).",
+        "_draco_unsat(7) :- b(7).",
+        "e(7,1;7,2).",
+    ]
+
+
+def test_prepare_batch_program():
+    program = prepare_batch_program("a. b :- a. #show b/0.")
+    assert list(map(str, program.statements)) == [
+        "a(DracoSpecId) :- _draco_spec(DracoSpecId).",
+        "b(DracoSpecId) :- a(DracoSpecId); _draco_spec(DracoSpecId).",
+    ]
+
+
+@pytest.mark.parametrize(
+    "program",
+    ["#const c = 1.", "#external a.", "#program foo.", "a :- &b{}."],
+)
+def test_unsupported(program):
+    with pytest.raises(UnsupportedProgramError):
+        prepare_batch_program(program)
+    with pytest.raises(UnsupportedProgramError):
+        namespace_spec(program, 0)
+
+
+def test_namespace_spec_show():
+    assert namespace_spec("a. #show a/0.", 0).statements == []
+    with pytest.raises(UnsupportedProgramError):
+        namespace_spec("a. #show a/0.", 0, show=False)
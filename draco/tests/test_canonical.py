@@ -0,0 +1,122 @@
+import re
+
+import pytest
+
+from draco import Draco, canonicalize, fingerprint
+from draco.fact_utils import dict_to_facts
+
+spec = dict_to_facts(
+    {
+        "number_rows": 100,
+        "field": [
+            {"name": "temperature", "type": "number"},
+            {"name": "city", "type": "string"},
+        ],
+        "view": [
+            {
+                "coordinates": "cartesian",
+                "mark": [
+                    {
+                        "type": "point",
+                        "encoding": [
+                            {"channel": "x", "field": "temperature"},
+                            {"channel": "y", "field": "city"},
+                        ],
+                    }
+                ],
+                "scale": [
+                    {"channel": "x", "type": "linear"},
+                    {"channel": "y", "type": "ordinal"},
+                ],
+            }
+        ],
+    }
+)
+
+draco = Draco()
+
+
+def rename(facts: list[str], names: str) -> list[str]:
+    """Replace the entity ids 0 to 7 of the spec by the given letters."""
+    return [
+        re.sub(r"(?<=[,(])\d(?=[,)])", lambda m: names[int(m[0])], fact)
+        for fact in facts
+    ]
+
+
+def test_invariant_to_order_whitespace_and_duplicates():
+    expected = fingerprint(spec)
+    assert fingerprint(list(reversed(spec))) == expected
+    assert fingerprint(" \n".join(f"  {fact}" for fact in spec)) == expected
+    assert fingerprint(spec + spec[:3]) == expected
+    assert fingerprint(" ".join(spec)) == expected
+    assert fingerprint("\n".join(spec)) == expected
+
+
+def test_different_specs():
+    other = [fact.replace("point", "tick") for fact in spec]
+    assert fingerprint(other) != fingerprint(spec)
+
+
+def test_renames_entities():
+    renamed = rename(spec, "abcdefgh")
+    assert "entity(mark,c,d)." in renamed
+    assert fingerprint(renamed) == fingerprint(spec)
+    assert "entity(encoding,(e,3),(e,4))." in canonicalize(renamed)
+
+
+def test_renaming_keeps_order():
+    # constraints compare entity ids, so swapping their order is a different spec
+    swapped = rename(spec, "01234576")
+    assert canonicalize(swapped) != canonicalize(spec)
+
+
+def test_keeps_hierarchical_ids():
+    program = """
+    entity(view,root,v).
+    entity(mark,v,(v,m)).
+    attribute((mark,type),(v,m),bar).
+    """
+    assert canonicalize(program) == "\n".join(
+        [
+            "attribute((mark,type),(v,m),bar).",
+            "entity(mark,v,(v,m)).",
+            "entity(view,root,v).",
+        ]
+    )
+
+
+def test_rules_keep_ids():
+    program = "entity(view,root,v). :- entity(view,root,v)."
+    assert "entity(view,root,v)." in canonicalize(program)
+
+
+def test_invalid_spec():
+    with pytest.raises(RuntimeError):
+        fingerprint("entity(view,root")
+
+
+@pytest.mark.parametrize("partial", [spec, spec[:-4]])
+def test_same_results(partial):
+    canonical = canonicalize(partial)
+    assert draco.check_spec(canonical) == draco.check_spec(partial)
+    assert draco.count_preferences(canonical) == draco.count_preferences(partial)
+
+
+def test_batch_deduplicates():
+    renamed = rename(spec, "abcdefgh")
+    invalid = spec + ["attribute((mark,type),3,bar)."]
+    unsatisfiable_spec = ":- a. :- not a."
+    specs = [spec, renamed, invalid, spec, unsatisfiable_spec, "entity(view,root"]
+
+    assert draco.check_specs(specs[:5]) == [True, True, False, True, False]
+    counts, unsatisfiable = draco.count_preferences_batch(specs[:5])
+    assert list(unsatisfiable) == [False, False, True, False, True]
+    assert (counts[0] == counts[1]).all()
+    assert (counts[0] == counts[3]).all()
+    assert counts[0].any()
+    assert not counts[2].any()
+
+    # unparsable specs fall back to their text and fail on their own
+    with pytest.raises(RuntimeError):
+        draco.check_specs(specs)
@@ -1,4 +1,6 @@
 import itertools
+import subprocess
+import sys
 from typing import Iterable
 
 import altair as alt
@@ -52,6 +54,12 @@ def test_init():
     assert type(instance) is DracoDebug
 
 
+def test_lazy_import():
+    # importing draco must not import altair, which takes most of the time
+    code = "import sys, draco; assert 'altair' not in sys.modules; draco.DracoDebug"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
 def test_chart_preferences():
     instance = DracoDebug(specs=specs)
     df = instance.chart_preferences
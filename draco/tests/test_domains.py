@@ -0,0 +1,73 @@
+import re
+from typing import Any
+
+from draco import Draco, dict_to_facts, profile, restrict_domains
+from draco.domains import excluded_values
+
+schema: dict[str, Any] = {
+    "number_rows": 100,
+    "field": [
+        {"name": "temperature", "type": "number", "min": -5, "max": 40},
+        {"name": "wind", "type": "number", "min": 1, "max": 100},
+        {"name": "condition", "type": "string"},
+        {"name": "date", "type": "datetime"},
+    ],
+}
+
+
+def partial(*fields: str) -> list[str]:
+    encodings = [{"field": field} for field in fields]
+    return dict_to_facts(schema | {"view": [{"mark": [{"encoding": encodings}]}]})
+
+
+def encoding(spec: list[str], field: str) -> str:
+    pattern = rf"attribute\(\(encoding,field\),(\w+),{field}\)"
+    return next(m.group(1) for fact in spec if (m := re.match(pattern, fact)))
+
+
+def test_excluded_values():
+    temperature, wind, condition, date = schema["field"]
+    assert excluded_values(temperature) == [("(scale,type)", "log")]
+    assert excluded_values(wind) == []
+    assert ("(encoding,binning)", None) in excluded_values(condition)
+    assert ("(scale,type)", "linear") in excluded_values(condition)
+    assert ("(encoding,aggregate)", "min") not in excluded_values(date)
+    assert ("(encoding,aggregate)", "mean") in excluded_values(date)
+
+
+def test_restrict_domains():
+    spec = partial("temperature", "wind")
+    e = encoding(spec, "temperature")
+    assert restrict_domains(spec) == [f"excluded((scale,type),(s,{e}),log)."]
+
+    spec = partial("condition")
+    e = encoding(spec, "condition")
+    facts = restrict_domains("\n".join(spec))
+    assert f"excluded((encoding,binning),{e})." in facts
+    assert f"excluded((encoding,aggregate),{e},mean)." in facts
+    assert f"excluded((scale,zero),(s,{e}))." in facts
+
+    # encodings without a field, or with an unknown one, keep their domains
+    assert restrict_domains(dict_to_facts(schema)) == []
+    assert restrict_domains(partial("humidity")) == []
+
+
+def test_same_completions():
+    draco = Draco()
+    spec = partial("temperature", "condition", "date")
+    facts = restrict_domains(spec)
+
+    with profile() as result:
+        expected = list(draco.complete_spec(spec, 5))
+        completions = list(draco.complete_spec(spec + facts, 5))
+
+    assert [m.cost for m in completions] == [m.cost for m in expected]
+    temperature = encoding(spec, "temperature")
+    condition = encoding(spec, "condition")
+    for model in expected + completions:
+        atoms = set(map(str, model.answer_set))
+        assert f"attribute((scale,type),(s,{temperature}),log)" not in atoms
+        assert f"attribute((scale,type),(s,{condition}),linear)" not in atoms
+
+    # the excluded choices are not grounded
+    assert result.calls[1].rules < result.calls[0].rules
@@ -1,7 +1,13 @@
+import asyncio
+from pathlib import Path
+
 import pytest
 
-from draco import Draco
+from draco import AsyncDraco, Draco
 from draco.fact_utils import answer_set_to_dict, dict_to_facts
+from draco.program_cache import ProgramCache
+from draco.result_cache import ResultCache, _size
+from draco.run import Budget
 
 default_draco = Draco()
 
@@ -35,6 +41,9 @@ def test_check_spec():
         }
     )
     assert not default_draco.check_spec(prog_invalid)
+    # iterators are only read once
+    assert not default_draco.check_spec(iter(prog_invalid))
+    assert not asyncio.run(AsyncDraco(default_draco).check_spec(iter(prog_invalid)))
 
 
 def test_check_spec_custom_draco():
@@ -121,6 +130,107 @@ def test_weight_mismatch():
         Draco(weights={})
 
 
+@pytest.mark.parametrize(
+    "spec",
+    [
+        "",
+        ":- a. :- not a.",
+        dict_to_facts(
+            {
+                "field": [{"name": "temperature", "type": "number"}],
+                "mark": [
+                    {
+                        "type": "tickk",
+                        "encoding": [{"channel": "x", "field": "temperature"}],
+                    }
+                ],
+                "scale": [{"channel": "x", "type": "linear"}],
+            }
+        ),
+        (Path(__file__).parents[1] / "asp/examples/scatter.lp").read_text(),
+    ],
+)
+def test_prepared_matches_unprepared(spec):
+    d = Draco(prepare=False)
+
+    assert default_draco.check_spec(spec) == d.check_spec(spec)
+    assert default_draco.get_violations(spec) == d.get_violations(spec)
+    assert default_draco.count_preferences(spec) == d.count_preferences(spec)
+
+    prepared_costs = [m.cost for m in default_draco.complete_spec(spec, 3)]
+    unprepared_costs = [m.cost for m in d.complete_spec(spec, 3)]
+    assert prepared_costs == unprepared_costs
+
+
+def test_prepared_reused():
+    cache = ProgramCache()
+    d = Draco(program_cache=cache)
+    d.check_spec("")
+    d.check_spec("")
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 1
+
+    # another instance with the same programs shares the parsed knowledge base
+    Draco(program_cache=cache).check_spec("")
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 2
+
+
+def test_check_specs():
+    scatter = (Path(__file__).parents[1] / "asp/examples/scatter.lp").read_text()
+    specs = [
+        "",
+        ":- a. :- not a.",
+        scatter,
+        scatter + "attribute((mark,type),m,tickk).",
+        scatter.split("\n"),
+        "#const foo = 1.",
+    ]
+    expected = list(map(default_draco.check_spec, specs))
+
+    assert default_draco.check_specs(specs) == expected
+    assert default_draco.check_specs(specs, chunk_size=2) == expected
+
+
+def test_check_specs_custom_draco():
+    d = Draco(hard="violation(no_point) :- attribute((mark,type),_,point),")
+
+    prog_valid = dict_to_facts({"mark": [{"type": "point"}]})
+    assert d.check_specs([prog_valid]) == [True]
+
+
+def test_count_preferences_batch():
+    scatter = (Path(__file__).parents[1] / "asp/examples/scatter.lp").read_text()
+    specs = [
+        "",
+        ":- a. :- not a.",
+        scatter,
+        scatter.split("\n"),
+        "#const foo = 1.",
+    ]
+
+    for chunk_size in [1, 2, 1000]:
+        counts, unsatisfiable = default_draco.count_preferences_batch(
+            specs, chunk_size=chunk_size
+        )
+        assert counts.shape == (len(specs), len(default_draco.soft_constraint_names))
+        assert list(unsatisfiable) == [False, True, False, False, False]
+
+        for spec, row in zip(specs, counts):
+            expected = default_draco.count_preferences(spec) or {}
+            assert {
+                name: count
+                for name, count in zip(default_draco.soft_constraint_names, row)
+                if count
+            } == expected
+
+
+def test_count_preferences_batch_empty():
+    counts, unsatisfiable = default_draco.count_preferences_batch([])
+    assert counts.shape == (0, len(default_draco.soft_constraint_names))
+    assert unsatisfiable.shape == (0,)
+
+
 def test_complete_histogram():
     partial_spec = """
     attribute(number_rows,root,100).
@@ -148,3 +258,178 @@ def test_complete_histogram():
 
     assert len(encodings) == 2
     assert mark["type"] == "bar"
+
+
+def test_async_draco():
+    async_draco = AsyncDraco(default_draco)
+    scatter = (Path(__file__).parents[1] / "asp/examples/scatter.lp").read_text()
+    partial = scatter.replace("#show entity/3.", "").replace("#show attribute/3.", "")
+    invalid = partial + "attribute((mark,type),m,tickk)."
+
+    async def run():
+        return (
+            await async_draco.check_spec(partial),
+            await async_draco.check_spec(invalid),
+            await async_draco.count_preferences(partial),
+            await async_draco.count_preferences(":- a. :- not a."),
+            await async_draco.get_violations(invalid),
+            [model async for model in async_draco.complete_spec(partial, 2)],
+        )
+
+    check, check_invalid, preferences, no_preferences, violations, models = asyncio.run(
+        run()
+    )
+    assert check == default_draco.check_spec(partial)
+    assert not check_invalid
+    assert preferences == default_draco.count_preferences(partial)
+    assert no_preferences is None
+    assert violations == default_draco.get_violations(invalid)
+    assert [(str(m), m.cost) for m in models] == [
+        (str(m), m.cost) for m in default_draco.complete_spec(partial, 2)
+    ]
+
+
+@pytest.mark.parametrize(
+    "budget", [Budget(conflicts=0), Budget(conflicts=20), Budget(gap=10**6)]
+)
+def test_complete_spec_budget(budget: Budget):
+    scatter = (Path(__file__).parents[1] / "asp/examples/scatter.lp").read_text()
+    partial = scatter.replace("#show entity/3.", "").replace("#show attribute/3.", "")
+    optimum = next(default_draco.complete_spec(partial)).cost
+
+    models = list(default_draco.complete_spec(partial, 3, budget))
+    assert len(models) <= 3
+    assert [model.cost for model in models] == sorted(model.cost for model in models)
+    for model in models:
+        assert model.cost >= optimum
+        assert not model.optimality_proven
+        assert default_draco.check_spec(str(model))
+
+
+def test_complete_spec_gap():
+    scatter = (Path(__file__).parents[1] / "asp/examples/scatter.lp").read_text()
+    partial = scatter.replace("#show entity/3.", "").replace("#show attribute/3.", "")
+    optimum = next(default_draco.complete_spec(partial)).cost
+
+    # a model with the cost of the lower bound is optimal
+    models = list(default_draco.complete_spec(partial, 1, Budget(gap=0)))
+    assert [(model.cost, model.optimality_proven) for model in models] == [
+        (optimum, True)
+    ]
+
+    models = list(default_draco.complete_spec(partial, 1, Budget(gap=10**6)))
+    assert len(models) == 1
+    assert models[0].cost >= optimum
+
+
+def test_async_draco_budget():
+    scatter = (Path(__file__).parents[1] / "asp/examples/scatter.lp").read_text()
+    partial = scatter.replace("#show entity/3.", "").replace("#show attribute/3.", "")
+    budget = Budget(conflicts=20)
+
+    async def run():
+        return [
+            model
+            async for model in AsyncDraco(default_draco).complete_spec(
+                partial, 3, budget
+            )
+        ]
+
+    assert [(str(m), m.cost, m.optimality_proven) for m in asyncio.run(run())] == [
+        (str(m), m.cost, m.optimality_proven)
+        for m in default_draco.complete_spec(partial, 3, budget)
+    ]
+
+
+def test_complete_spec_threads():
+    scatter = (Path(__file__).parents[1] / "asp/examples/scatter.lp").read_text()
+    partial = scatter.replace("#show entity/3.", "").replace("#show attribute/3.", "")
+    threaded = Draco(solver_threads=2, parallel_mode="split")
+
+    models = list(threaded.complete_spec(partial, 5))
+    expected = list(default_draco.complete_spec(partial, 5))
+    assert [model.cost for model in models] == [model.cost for model in expected]
+    assert len({str(model) for model in models}) == 5
+
+
+def test_solver_threads_invalid():
+    with pytest.raises(ValueError):
+        Draco(solver_threads=0)
+    with pytest.raises(ValueError):
+        Draco(parallel_mode="together")
+
+
+def test_result_cache():
+    scatter = (Path(__file__).parents[1] / "asp/examples/scatter.lp").read_text()
+    partial = scatter.replace("#show entity/3.", "").replace("#show attribute/3.", "")
+    cache = ResultCache()
+    d = Draco(result_cache=cache)
+
+    expected = list(default_draco.complete_spec(partial, 3))
+    assert list(d.complete_spec(partial, 3)) == expected
+    assert list(d.complete_spec(partial, 3)) == expected
+    assert list(d.complete_spec(partial, 2)) == expected[:2]
+    assert d.check_spec(partial) and d.check_spec(partial)
+    assert d.count_preferences(partial) == default_draco.count_preferences(partial)
+    assert d.count_preferences(":- a. :- not a.") is None
+    assert d.count_preferences(":- a. :- not a.") is None
+    assert cache.stats.hits == 3
+    assert cache.stats.misses == 5
+
+    # the returned counts are copies, so changing them does not change the cache
+    d.count_preferences(partial)["c_d_point"] = 100
+    assert d.count_preferences(partial) == default_draco.count_preferences(partial)
+    next(d.complete_spec(partial, 3)).cost.append(100)
+    assert list(d.complete_spec(partial, 3)) == expected
+
+    # the keys hold a digest of the programs rather than the programs
+    assert _size(d._result_key("check_spec", partial)) < 1024
+
+    # instances with other weights do not share results
+    weights = {name: 1 for name in default_draco.weights}
+    other = Draco(weights=weights, result_cache=cache)
+    assert list(other.complete_spec(partial, 3)) != expected
+
+    # invalidating a spec drops its results for all instances sharing the cache
+    assert d.invalidate_results(partial) == 5
+    assert d.invalidate_results() == 1
+    assert cache.stats.size == 0
+
+
+def test_configuration_hash():
+    d = Draco(weights=dict(default_draco.weights))
+    assert d.configuration_hash == default_draco.configuration_hash
+    assert d.configuration_hash != Draco(hard="").configuration_hash
+
+    # the hash follows changes of the programs and weights
+    d.hard = ""
+    assert d.configuration_hash == Draco(hard="").configuration_hash
+    d.weights[next(iter(d.weights))] += 1
+    assert d.configuration_hash != Draco(hard="").configuration_hash
+
+
+def test_result_cache_budget():
+    cache = ResultCache()
+    d = Draco(result_cache=cache)
+    list(d.complete_spec("", 1, Budget(conflicts=10)))
+    assert cache.stats.size == 0
+
+
+def test_async_draco_result_cache():
+    scatter = (Path(__file__).parents[1] / "asp/examples/scatter.lp").read_text()
+    partial = scatter.replace("#show entity/3.", "").replace("#show attribute/3.", "")
+    cache = ResultCache()
+    async_draco = AsyncDraco(Draco(result_cache=cache))
+
+    async def run():
+        return [
+            await async_draco.check_spec(partial),
+            await async_draco.count_preferences(partial),
+            [model async for model in async_draco.complete_spec(partial, 2)],
+        ]
+
+    first = asyncio.run(run())
+    assert asyncio.run(run()) == first
+    assert first[2] == list(default_draco.complete_spec(partial, 2))
+    assert cache.stats.hits == 3
+    assert cache.stats.misses == 3
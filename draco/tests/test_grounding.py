@@ -0,0 +1,139 @@
+import pytest
+
+from draco import Draco
+from draco.grounding import (
+    GroundingReport,
+    GroundingSize,
+    compare,
+    corpus_path,
+    ground_blocks,
+    load_baseline,
+    main,
+    read_corpus,
+    save_baseline,
+)
+
+histogram = (corpus_path / "histogram.lp").read_text()
+
+
+@pytest.fixture(scope="module")
+def report() -> GroundingReport:
+    return ground_blocks(histogram)
+
+
+def test_ground_blocks(report: GroundingReport):
+    assert "hard:log_non_positive" in report.blocks
+    assert "soft:aggregate" in report.blocks
+    assert "helpers:mark_encoding_scale" in report.blocks
+    assert report.blocks["helpers:mark_encoding_scale"].rules > 0
+
+    # the blocks account for almost all of the ground program
+    rules = sum(size.rules for size in report.blocks.values())
+    assert 0.9 * report.total.rules <= rules <= report.total.rules
+
+
+def test_ground_blocks_custom_draco():
+    draco = Draco(
+        define="% @definition(two) Two numbers.\nnumber(1..2).\n",
+        constraints="",
+        helpers="",
+        generate="",
+        hard="% @hard(pairs) All pairs.\npair(X,Y) :- number(X), number(Y).\n",
+        soft="",
+        weights={},
+    )
+    report = ground_blocks("", draco)
+    assert report.blocks == {
+        "define:two": GroundingSize(2, 2),
+        "hard:pairs": GroundingSize(4, 4),
+    }
+    assert report.total == GroundingSize(6, 6)
+
+
+def test_read_corpus():
+    corpus = read_corpus()
+    # the larger specs are in a subdirectory
+    assert {"histogram", "scatter", "wide_128_fields"} <= corpus.keys()
+    assert read_corpus(corpus_path / "histogram.lp") == {"histogram": histogram}
+
+    # the specs in large directories take the longest to ground
+    small = read_corpus(large=False)
+    assert {"histogram", "wide_16_fields"} <= small.keys()
+    assert "wide_128_fields" not in small
+
+
+def test_baseline(report: GroundingReport):
+    # the checked-in baseline catches changes of the grounding of any block
+    assert load_baseline()["histogram"] == report
+
+
+def test_compare(report: GroundingReport, tmp_path):
+    path = tmp_path / "baseline.json"
+    save_baseline({"histogram": report}, path)
+    baseline = load_baseline(path)
+    assert baseline == {"histogram": report}
+    assert compare(baseline, {"histogram": report}) == []
+
+    blocks = dict(report.blocks)
+    blocks["hard:log_non_positive"] = GroundingSize(100, 1)
+    del blocks["soft:aggregate"]
+    changes = compare(baseline, {"histogram": GroundingReport(report.total, blocks)})
+    assert [change.block for change in changes] == [
+        "hard:log_non_positive",
+        "soft:aggregate",
+    ]
+    assert changes[0].before == report.blocks["hard:log_non_positive"]
+    assert changes[1].after is None
+    assert changes[1].rules == -report.blocks["soft:aggregate"].rules
+
+
+def test_main(report: GroundingReport, tmp_path, capsys):
+    path = tmp_path / "baseline.json"
+    arguments = ["--corpus", str(corpus_path / "histogram.lp"), "--baseline", str(path)]
+    assert main(arguments) == 1
+    assert main(arguments + ["--update"]) == 0
+    assert main(arguments) == 0
+
+    blocks = dict(report.blocks)
+    size = blocks["hard:enforce_order"]
+    blocks["hard:enforce_order"] = GroundingSize(size.rules // 2, size.atoms)
+    save_baseline({"histogram": GroundingReport(report.total, blocks)}, path)
+    capsys.readouterr()
+    assert main(arguments) == 1
+    assert "REGRESSION histogram hard:enforce_order" in capsys.readouterr().out
+    assert main(arguments + ["--tolerance", "1"]) == 0
+
+    # growing by a single rule is within the default tolerance
+    blocks["hard:enforce_order"] = GroundingSize(size.rules - 1, size.atoms)
+    save_baseline({"histogram": GroundingReport(report.total, blocks)}, path)
+    assert main(arguments) == 0
+    assert main(arguments + ["--tolerance", "0"]) == 1
+
+
+def test_main_large(report: GroundingReport, tmp_path):
+    corpus = tmp_path / "corpus"
+    (corpus / "large").mkdir(parents=True)
+    (corpus / "histogram.lp").write_text(histogram)
+    (corpus / "large" / "wide.lp").write_text(histogram)
+    path = tmp_path / "baseline.json"
+    arguments = ["--corpus", str(corpus), "--baseline", str(path)]
+
+    assert main(arguments + ["--large", "--update"]) == 0
+    assert load_baseline(path).keys() == {"histogram", "wide"}
+
+    # updating without the large specs keeps their sizes
+    blocks = dict(report.blocks)
+    blocks["hard:enforce_order"] = GroundingSize(0, 0)
+    save_baseline(
+        {
+            "histogram": GroundingReport(report.total, blocks),
+            "wide": GroundingReport(report.total, blocks),
+        },
+        path,
+    )
+    assert main(arguments) == 1
+    assert main(arguments + ["--update"]) == 0
+    assert load_baseline(path) == {
+        "histogram": report,
+        "wide": GroundingReport(report.total, blocks),
+    }
@@ -0,0 +1,89 @@
+import pytest
+
+from draco import Draco, DracoPool
+from draco.fact_utils import dict_to_facts
+from draco.run import Model
+
+draco = Draco()
+
+
+def spec(mark: str) -> str:
+    return "\n".join(
+        dict_to_facts(
+            {
+                "field": [{"name": "temperature", "type": "number"}],
+                "mark": [
+                    {
+                        "type": mark,
+                        "encoding": [{"channel": "x", "field": "temperature"}],
+                    }
+                ],
+                "scale": [{"channel": "x", "type": "linear"}],
+            }
+        )
+    )
+
+
+valid = spec("tick")
+invalid = spec("tickk")
+partial_spec = """
+    attribute(number_rows,root,100).
+    entity(field,root,(f,0)).
+    attribute((field,name),(f,0),temperature).
+    attribute((field,type),(f,0),number).
+    attribute((field,unique),(f,0),100).
+    entity(view,root,(v,0)).
+    entity(mark,(v,0),(m,0)).
+    entity(encoding,(m,0),(e,0)).
+    attribute((encoding,field),(e,0),temperature).
+"""
+
+
+def count_models(draco: Draco, spec: str, models: int) -> int:
+    return len(list(draco.complete_spec(spec, models)))
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with DracoPool(draco, processes=2) as pool:
+        yield pool
+
+
+def test_pool_map(pool: DracoPool):
+    specs = [valid, invalid] * 3
+    assert pool.map("check_spec", specs) == [True, False] * 3
+    assert pool.map("count_preferences", specs, chunksize=2) == list(
+        map(draco.count_preferences, specs)
+    )
+    assert pool.map("get_violations", specs) == list(map(draco.get_violations, specs))
+
+
+def test_pool_complete_spec(pool: DracoPool):
+    (models,) = pool.map("complete_spec", [partial_spec], models=3)
+    assert all(isinstance(model, Model) for model in models)
+    assert models == list(draco.complete_spec(partial_spec, 3))
+
+
+def test_pool_imap_unordered(pool: DracoPool):
+    specs = [valid, invalid, valid, invalid]
+    results = dict(pool.imap_unordered("check_spec", specs))
+    assert results == {0: True, 1: False, 2: True, 3: False}
+
+
+def test_pool_function(pool: DracoPool):
+    assert pool.map(count_models, [partial_spec] * 2, models=2) == [2, 2]
+
+
+def test_pool_map_items(pool: DracoPool):
+    assert pool.map_items(len, [[1], [1, 2], []]) == [1, 2, 0]
+
+
+def test_pool_invalid():
+    with pytest.raises(ValueError):
+        DracoPool(draco, processes=0)
+
+    with DracoPool(draco, processes=1) as pool:
+        with pytest.raises(ValueError):
+            pool.map("complete_specs", [valid])
+        with pytest.raises(ValueError):
+            pool.map("check_spec", [valid], chunksize=0)
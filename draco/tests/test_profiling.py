@@ -0,0 +1,175 @@
+import asyncio
+import pickle
+
+import draco.profiling as profiling
+from draco import AsyncDraco, Draco, Statistics, profile, run_clingo, run_clingo_async
+from draco.fact_utils import dict_to_facts
+from draco.profiling import PHASES, add_callback, enabled, remove_callback
+from draco.programs import asp_path
+
+spec = dict_to_facts(
+    {
+        "number_rows": 100,
+        "field": [{"name": "temperature", "type": "number"}],
+        "view": [
+            {
+                "coordinates": "cartesian",
+                "mark": [
+                    {
+                        "type": "tick",
+                        "encoding": [{"channel": "x", "field": "temperature"}],
+                    }
+                ],
+                "scale": [{"channel": "x", "type": "linear"}],
+            }
+        ],
+    }
+)
+partial_spec = [fact for fact in spec if "scale" not in fact and "tick" not in fact]
+
+draco = Draco()
+
+
+def test_disabled():
+    assert not enabled()
+    model = next(run_clingo("a."))
+    assert model.statistics is None
+    assert next(draco.complete_spec(partial_spec)).statistics is None
+
+
+def test_run_clingo():
+    model = next(run_clingo("{a; b}. :~ a. [1]", 1, True, statistics=True))
+    statistics = model.statistics
+    assert statistics is not None
+    assert statistics.method == "run_clingo"
+    assert list(statistics.timings) == ["parse", "ground", "solve", "decode"]
+    assert statistics.atoms == 2
+    assert statistics.solve_calls == 1
+    assert statistics.costs == [0]
+    assert statistics.lower == [0]
+
+
+def test_profile():
+    with profile() as result:
+        assert enabled()
+        assert draco.check_spec(spec)
+        draco.count_preferences(spec)
+        assert draco.get_violations(spec) == []
+        completions = list(draco.complete_spec(partial_spec, 2))
+    assert not enabled()
+
+    assert [call.method for call in result.calls] == [
+        "check_spec",
+        "count_preferences",
+        "get_violations",
+        "complete_spec",
+    ]
+    for call in result.calls:
+        assert list(call.timings) == list(PHASES)
+        assert call.atoms > 0
+        assert call.rules > 0
+        assert call.total > 0
+
+    complete = result.calls[-1]
+    assert all(model.statistics is complete for model in completions)
+    assert complete.costs == completions[-1].cost
+    assert complete.choices > 0
+    assert list(result.timings) == list(PHASES)
+    assert result.total >= complete.total
+
+
+def test_profile_closed_early():
+    with profile() as result:
+        completions = draco.complete_spec(partial_spec, 3)
+        next(completions)
+        completions.close()
+
+    assert len(result.calls) == 1
+    assert result.calls[0].solve_calls == 1
+
+
+def test_nested_profiles():
+    with profile() as outer:
+        draco.check_spec(spec)
+        with profile() as inner:
+            draco.check_spec(spec)
+
+    assert len(outer.calls) == 2
+    assert inner.calls == outer.calls[1:]
+
+
+def test_callback():
+    calls: list[Statistics] = []
+    add_callback(calls.append)
+    try:
+        assert enabled()
+        draco.check_spec(spec)
+    finally:
+        remove_callback(calls.append)
+
+    draco.check_spec(spec)
+    assert [call.method for call in calls] == ["check_spec"]
+
+
+def test_draco_statistics():
+    collecting = Draco(statistics=True)
+    model = next(collecting.complete_spec(partial_spec))
+    assert model.statistics is not None
+    assert model.statistics.method == "complete_spec"
+
+    # the statistics are sent along with pickled models
+    copy = pickle.loads(pickle.dumps(model))
+    assert copy.statistics == model.statistics
+
+
+def test_async():
+    async def run():
+        async_draco = AsyncDraco(draco)
+        with profile() as result:
+            assert await async_draco.check_spec(spec)
+            completions = [m async for m in async_draco.complete_spec(partial_spec)]
+            async for _ in run_clingo_async("a."):
+                pass
+        return result, completions
+
+    result, completions = asyncio.run(run())
+    assert [call.method for call in result.calls] == [
+        "check_spec",
+        "complete_spec",
+        "run_clingo",
+    ]
+    assert completions[0].statistics is result.calls[1]
+    assert "solve" in result.calls[1].timings
+    assert result.calls[1].solve_calls == 1
+
+
+def test_solve_call_without_model():
+    # top K solving moves on to the next cost level with a solve call that
+    # finds no model and reports infinite costs
+    scatter = (asp_path / "examples" / "scatter.lp").read_text()
+    completions = list(Draco(statistics=True).complete_spec(scatter, 5))
+    statistics = completions[-1].statistics
+    assert statistics is not None
+    assert statistics.solve_calls == 3
+    assert statistics.costs == completions[-1].cost
+
+
+def test_public_statistics(monkeypatch):
+    # without the private clingo internals, the public statistics are read
+    def counters(statistics: Statistics | None):
+        assert statistics is not None
+        return (
+            statistics.atoms,
+            statistics.rules,
+            statistics.choices,
+            statistics.conflicts,
+            statistics.solve_calls,
+            statistics.costs,
+            statistics.lower,
+        )
+
+    program = "{a; b}. :~ a. [1]"
+    expected = counters(next(run_clingo(program, 1, True, statistics=True)).statistics)
+    monkeypatch.setattr(profiling, "FAST_STATISTICS", False)
+    model = next(run_clingo(program, 1, True, statistics=True))
+    assert counters(model.statistics) == expected
@@ -0,0 +1,104 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import draco.program_cache
+from draco.program_cache import ProgramCache
+from draco.run import PreparedProgram, is_satisfiable, prepare_program
+
+
+def test_get_prepares_once():
+    cache = ProgramCache()
+    first = cache.get(["a.", ":- b."])
+    second = cache.get(["a.", ":- b."])
+
+    assert len(first) == 1
+    assert isinstance(first[0], PreparedProgram)
+    assert first == second
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.hit_rate == 0.5
+
+
+def test_get_prepared_program_is_usable():
+    cache = ProgramCache()
+    assert is_satisfiable(cache.get([":- b."]) + ["a."])
+    assert not is_satisfiable(cache.get([":- b."]) + ["b."])
+
+
+def test_get_unparsable_falls_back_to_text():
+    cache = ProgramCache()
+    parts = cache.get(["a :- b,"])
+
+    assert parts == ["a :- b,"]
+    assert is_satisfiable(parts + ["b."])
+
+
+def test_eviction():
+    cache = ProgramCache(maxsize=2)
+    cache.get(["a."])
+    cache.get(["b."])
+    # `a.` becomes the most recently used program
+    cache.get(["a."])
+    cache.get(["c."])
+
+    assert cache.stats.evictions == 1
+    assert cache.stats.size == 2
+
+    cache.get(["a."])
+    assert cache.stats.hits == 2
+
+    cache.get(["b."])
+    assert cache.stats.misses == 4
+
+
+def test_clear():
+    cache = ProgramCache()
+    cache.get(["a."])
+    cache.clear()
+
+    assert cache.stats == ProgramCache().stats
+    assert cache.stats.hit_rate == 0
+
+
+def test_invalid_maxsize():
+    with pytest.raises(ValueError):
+        ProgramCache(maxsize=0)
+
+
+def test_concurrent_get():
+    cache = ProgramCache()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: cache.get(["a."]), range(64)))
+
+    assert all(result == results[0] for result in results)
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 63
+
+
+def test_get_parses_outside_the_lock(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_prepare_program(texts, logger=None):
+        if texts == ("slow.",):
+            started.set()
+            release.wait(5)
+        return prepare_program(texts, logger=logger)
+
+    monkeypatch.setattr(draco.program_cache, "prepare_program", slow_prepare_program)
+    cache = ProgramCache()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        slow = executor.submit(cache.get, ["slow."])
+        assert started.wait(5)
+        waiting = executor.submit(cache.get, ["slow."])
+
+        # other programs are prepared while the slow one is parsed
+        assert is_satisfiable(cache.get(["a."]))
+        assert not slow.done() and not waiting.done()
+
+        release.set()
+        assert slow.result() == waiting.result()
+
+    assert cache.stats.misses == 2
+    assert cache.stats.hits == 1
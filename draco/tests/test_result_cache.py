@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from draco import run_clingo
+from draco.result_cache import ResultCache, _size
+
+
+def test_get_put():
+    cache = ResultCache()
+    assert cache.get("a") is None
+    assert cache.get("a", 0) == 0
+
+    value = (1, 2)
+    cache.put("a", value)
+    assert cache.get("a") is value
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 2
+    assert cache.stats.size == 1
+    assert cache.stats.memory > 0
+
+
+def test_size_of_slots():
+    model = next(run_clingo(" ".join(f"a({i})." for i in range(1000))))
+    # the handles or symbols of the answer set are counted too
+    assert _size(model) > 8 * 1000
+
+
+def test_none_result():
+    cache = ResultCache()
+    cache.put("a", None)
+    missing = object()
+    assert cache.get("a", missing) is None
+
+
+def test_eviction():
+    cache = ResultCache()
+    cache.put("a", "x" * 100)
+    cache.max_bytes = cache.stats.memory * 2
+    cache.put("b", "x" * 100)
+    # `a` becomes the most recently used result
+    cache.get("a")
+    cache.put("c", "x" * 100)
+
+    assert cache.stats.evictions == 1
+    assert cache.stats.size == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def test_too_large():
+    cache = ResultCache(max_bytes=100)
+    cache.put("a", "x" * 1000)
+    assert cache.stats.size == 0
+
+
+def test_ttl():
+    cache = ResultCache(ttl=0.05)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.stats.expirations == 1
+    assert cache.stats.size == 0
+    assert cache.stats.memory == 0
+
+
+def test_invalidate():
+    cache = ResultCache()
+    cache.put(("check_spec", "a."), True)
+    cache.put(("complete_spec", "a.", 2), ())
+    cache.put(("check_spec", "b."), True)
+
+    assert cache.invalidate("a.") == 2
+    assert cache.stats.size == 1
+    assert cache.invalidate() == 1
+    assert cache.stats.memory == 0
+
+
+def test_clear():
+    cache = ResultCache()
+    cache.put("a", 1)
+    cache.get("a")
+    cache.clear()
+
+    assert cache.stats == ResultCache().stats
+    assert cache.stats.hit_rate == 0
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        ResultCache(max_bytes=0)
+    with pytest.raises(ValueError):
+        ResultCache(ttl=0)
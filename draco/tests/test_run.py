@@ -1,6 +1,28 @@
+import asyncio
+import pickle
+import threading
+import time
+from array import array
 from unittest import TestCase
 
+import clingo
+import pytest
+
+import draco.run
 from draco import run_clingo
+from draco.run import (
+    Budget,
+    Model,
+    handle_to_symbol,
+    is_satisfiable,
+    is_satisfiable_async,
+    prepare_program,
+    run_clingo_async,
+)
+
+
+async def collect_async(*args, **kwargs):
+    return [model async for model in run_clingo_async(*args, **kwargs)]
 
 
 def test_run_all_models():
@@ -39,6 +61,67 @@ def test_model_string():
     assert str(m) == "a.\nb."
 
 
+def test_model_lazy_decoding():
+    m = next(run_clingo("preference(foo,1). preference(foo,2). preference(bar,1)."))
+    assert len(m) == 3
+    assert m.strings == (
+        "preference(foo,1)",
+        "preference(foo,2)",
+        "preference(bar,1)",
+    )
+    assert m.answer_set == tuple(map(clingo.parse_term, m.strings))
+    assert m.answer_set is m.answer_set
+    assert m.preference_counts == {"foo": 2, "bar": 1}
+
+    # the counts are copied, so changing them does not change the model
+    m.preference_counts["foo"] = 0
+    assert m.preference_counts == {"foo": 2, "bar": 1}
+
+
+def test_model_to_dict():
+    m = next(run_clingo("entity(field,root,f). attribute((field,name),f,x)."))
+    assert m.to_dict() == {"field": [{"name": "x"}]}
+    assert m.to_dict() is m.to_dict()
+
+
+def test_model_value():
+    symbols = [clingo.parse_term("a(1)"), clingo.parse_term("b")]
+    m = Model(symbols, [1], 2)
+
+    assert m == Model(symbols, [1], 2)
+    assert m != Model(symbols, [1], 2, optimality_proven=False)
+    assert hash(m) == hash(Model(symbols, [1], 2))
+    assert pickle.loads(pickle.dumps(m)) == m
+    assert repr(m) == (
+        "Model(answer_set=[Function('a', [Number(1)], True), Function('b', [], True)], "
+        "cost=[1], number=2, optimality_proven=True)"
+    )
+
+    with pytest.raises(AttributeError):
+        m.cost = [0]  # type: ignore
+
+
+@pytest.mark.parametrize("symbol_handles", [True, False])
+def test_model_symbol_handles(monkeypatch, symbol_handles: bool):
+    # without the private clingo internals, models keep the symbols instead
+    monkeypatch.setattr(draco.run, "SYMBOL_HANDLES", symbol_handles)
+    m = next(run_clingo("entity(field,root,f). attribute((field,name),f,x)."))
+
+    assert isinstance(m.handles, array) == symbol_handles
+    assert list(map(handle_to_symbol, m.handles)) == list(m.answer_set)
+    assert m.strings == ("entity(field,root,f)", "attribute((field,name),f,x)")
+    assert m.to_dict() == {"field": [{"name": "x"}]}
+    assert m == Model(m.answer_set, m.cost, m.number)
+    assert hash(m) == hash(Model(m.answer_set, m.cost, m.number))
+    assert pickle.loads(pickle.dumps(m)) == m
+
+
+def test_handles_supported(monkeypatch):
+    assert draco.run._handles_supported() == draco.run.SYMBOL_HANDLES
+    monkeypatch.setattr(draco.run, "_ffi", None)
+    assert not draco.run._handles_supported()
+
+
 def test_run_clingo_top_k():
     models = list(
         run_clingo(
@@ -77,6 +160,20 @@ def test_run_clingo_top_k_counts():
         assert len(models) == i
 
 
+@pytest.mark.parametrize("models", [1, 5, 20, 64])
+def test_run_clingo_top_k_order(models: int):
+    # the costs are sums of distinct squares, so they have gaps
+    program = "{a(1..6)}. :~ a(X). [X*X,X]"
+    costs = sorted(
+        sum(x * x for x in range(1, 7) if mask >> (x - 1) & 1) for mask in range(64)
+    )
+    result = list(run_clingo(program, models, True))
+
+    assert [model.cost for model in result] == [[cost] for cost in costs[:models]]
+    assert len({str(model) for model in result}) == models
+    assert all(model.optimality_proven for model in result)
+
+
 def test_run_clingo_arguments():
     for c in [1, 2, 5]:
         model = next(
@@ -106,6 +203,41 @@ def test_run_clingo_top_k_weight_rules():
     assert len(models) == 16
 
 
+def test_run_clingo_prepared():
+    prepared = prepare_program("a(1..3). b(X) :- a(X), not c(X).")
+    for _ in range(2):
+        model = next(run_clingo([prepared, "c(2)."]))
+        assert set(map(str, model.answer_set)) == {
+            "a(1)",
+            "a(2)",
+            "a(3)",
+            "b(1)",
+            "b(3)",
+            "c(2)",
+        }
+
+
+def test_run_clingo_prepared_arguments():
+    prepared = prepare_program("#const foo = 0. a(1..foo).")
+    model = next(run_clingo(prepared, arguments=["-c foo=2"]))
+    assert len(list(model.answer_set)) == 2
+
+
+def test_run_clingo_prepared_top_k():
+    prepared = prepare_program("{ a(1..5) }. #minimize { 1,X : a(X) }.")
+    models = list(run_clingo([prepared, ":- not a(1)."], models=6, topK=True))
+    assert len(models) == 6
+    assert models[0].cost == [1]
+    assert models[4].cost == [2]
+    assert models[5].cost == [3]
+
+
+def test_is_satisfiable_prepared():
+    prepared = prepare_program(":- a.")
+    assert is_satisfiable([prepared, "b."])
+    assert not is_satisfiable([prepared, "a."])
+
+
 class LoggingTest(TestCase):
     def test_run_clingo_top_k_all(self):
         with self.assertLogs() as cm:
@@ -121,3 +253,116 @@ class LoggingTest(TestCase):
                 "Since all models should be computed, topK is ignored.",
             )
             assert len(models) == 2**5
+
+
+def test_run_clingo_async():
+    program = "{a;b;c}."
+    models = asyncio.run(collect_async(program))
+    assert sorted(map(str, models)) == sorted(map(str, run_clingo(program)))
+
+
+def test_run_clingo_async_top_k():
+    program = "{a;b;c}. :~ a. [1] :~ b. [2] :~ c. [3]"
+    models = asyncio.run(collect_async(program, 5, True))
+    assert [model.cost for model in models] == [
+        model.cost for model in run_clingo(program, 5, True)
+    ]
+    assert [model.cost for model in models] == [[0], [1], [2], [3], [3]]
+
+
+def test_run_clingo_async_top_k_order():
+    program = "{a(1..6)}. :~ a(X). [X*X,X]"
+    models = asyncio.run(collect_async(program, 30, True))
+    assert [model.cost for model in models] == [
+        model.cost for model in run_clingo(program, 30, True)
+    ]
+
+
+def test_run_clingo_async_prepared_arguments():
+    program = prepare_program("a(foo).")
+    models = asyncio.run(collect_async([program, "#const foo = 1."], 0))
+    assert [str(model) for model in models] == ["a(1)."]
+
+
+def test_run_clingo_async_cancel():
+    async def first_models():
+        # enumerating all 2^100 models would not finish
+        models = run_clingo_async("{a(1..100)}.")
+        first = [await anext(models) for _ in range(3)]
+        await models.aclose()
+        return first
+
+    assert len(asyncio.run(first_models())) == 3
+
+
+def test_run_clingo_async_concurrent():
+    async def run_all():
+        return await asyncio.gather(
+            *[collect_async(f"{{a(1..{n})}}.") for n in range(1, 6)]
+        )
+
+    assert [len(models) for models in asyncio.run(run_all())] == [2, 4, 8, 16, 32]
+
+
+def test_is_satisfiable_async():
+    assert asyncio.run(is_satisfiable_async("a."))
+    assert not asyncio.run(is_satisfiable_async("a. :- a."))
+
+
+def test_budget_invalid():
+    with pytest.raises(ValueError):
+        Budget(time=-1)
+    with pytest.raises(ValueError):
+        Budget(conflicts=-1)
+
+
+def test_run_clingo_budget_unlimited():
+    program = "{a;b;c}. :~ a. [1] :~ b. [2] :~ c. [3]"
+    models = list(run_clingo(program, 5, True, budget=Budget()))
+    assert [model.cost for model in models] == [[0], [1], [2], [3], [3]]
+    assert all(model.optimality_proven for model in models)
+
+
+def test_run_clingo_time_budget():
+    # enumerating all 2^100 models would not finish
+    models = list(run_clingo("{a(1..100)}.", budget=Budget(time=0.1)))
+    assert len(models) > 0
+    assert all(model.optimality_proven for model in models)
+
+
+def test_run_clingo_async_time_budget():
+    models = asyncio.run(collect_async("{a(1..100)}.", budget=Budget(time=0.1)))
+    assert len(models) > 0
+
+
+def test_run_clingo_cancelled():
+    cancelled = threading.Event()
+    threading.Timer(0.1, cancelled.set).start()
+    started = time.monotonic()
+    # enumerating all 2^100 models would not finish
+    models = list(run_clingo("{a(1..100)}.", budget=Budget(cancelled=cancelled.is_set)))
+    assert len(models) > 0
+    assert time.monotonic() - started < 5
+
+    cancelled = threading.Event()
+    threading.Timer(0.1, cancelled.set).start()
+    budget = Budget(cancelled=cancelled.is_set)
+    models = asyncio.run(collect_async("{a(1..100)}.", budget=budget))
+    assert len(models) > 0
+
+
+@pytest.mark.parametrize("parallel_mode", ["compete", "split"])
+def test_run_clingo_threads_top_k(parallel_mode: str):
+    program = "{a(1..6)}. :~ a(X). [X,X]"
+    expected = list(run_clingo(program, 10, True))
+    models = list(run_clingo(program, 10, True, threads=3, parallel_mode=parallel_mode))
+
+    assert [model.cost for model in models] == [model.cost for model in expected]
+    assert len({str(model) for model in models}) == len(models)
+
+
+def test_run_clingo_threads_invalid():
+    with pytest.raises(ValueError):
+        next(run_clingo("a.", threads=0))
+    with pytest.raises(ValueError):
+        next(run_clingo("a.", threads=2, parallel_mode="together"))